@@ -1,22 +1,116 @@
 from fastapi import Depends
-from app.infra.db import get_db
+from app.infra.db import get_db, ping
+from app.core.settings import settings
+from app.api.responses import catalog_responses
+from app.infra.cache import CachedProductRepo, product_cache
+from app.infra.loader import ProductLoader
+from app.infra.memory import memory_backend
 from app.infra.repos import MongoProductRepo
-from app.services.product_service import ProductService
+from app.infra.search import menu_index
+from app.infra.singleflight import (
+    ORDER_READS, ORDER_WRITES, PRODUCT_READS, PRODUCT_WRITES, SingleFlightRepo, order_flight, product_flight
+)
+from app.services.product_service import ProductService, catalog_version
 
-async def get_product_repo(db = Depends(get_db)):
+async def get_repo_db():
+    """Banco do Mongo, ou None no backend em memória (sem criar o cliente Motor)"""
+    if settings.REPO_BACKEND == "memory":
+        return None
+    return await get_db()
+
+async def get_product_repo(db = Depends(get_repo_db)):
+    if db is None:
+        return memory_backend.products
     col = db["products"]
-    return MongoProductRepo(col)
+    repo = MongoProductRepo(col)
+    if settings.SINGLEFLIGHT_ENABLED:
+        # Abaixo do cache: só os misses concorrentes chegam a ser coalescidos
+        repo = SingleFlightRepo(repo, product_flight, PRODUCT_READS, PRODUCT_WRITES)
+    if settings.PRODUCT_CACHE_ENABLED:
+        return CachedProductRepo(repo, product_cache)
+    return repo
+
+# Escrita no catálogo feita por outro worker: descartar os caches deste processo
+catalog_version.subscribe(product_cache.clear)
+catalog_version.subscribe(product_flight.forget)
+catalog_version.subscribe(menu_index.expire)
+
+def get_product_loader(repo = Depends(get_product_repo)):
+    # Uma instância por requisição (dependências são memorizadas por requisição)
+    return ProductLoader(repo)
+
+def get_product_service(repo = Depends(get_product_loader)):
+    return ProductService(repo, catalog=catalog_version, index=menu_index)
 
-def get_product_service(repo = Depends(get_product_repo)):
-    return ProductService(repo)
+def get_catalog_responses():
+    return catalog_responses
 
 # Atualização para adicionar OrderService
-from app.infra.repos import MongoOrderRepo
+from app.infra.repos import MongoOrderRepo, MongoRollupRepo
+from app.services.analytics_service import RollupService
+from app.services.pricing_service import PricingService
 from app.services.order_service import OrderService
+from app.services.order_events import order_events
+from app.services.order_counters import order_counters
 
-async def get_order_repo(db = Depends(get_db)):
+async def get_order_repo(db = Depends(get_repo_db)):
+    if db is None:
+        return memory_backend.orders
     col = db["orders"]
-    return MongoOrderRepo(col)
+    repo = MongoOrderRepo(col)
+    if settings.SINGLEFLIGHT_ENABLED:
+        return SingleFlightRepo(repo, order_flight, ORDER_READS, ORDER_WRITES)
+    return repo
+
+async def get_rollup_service(db = Depends(get_repo_db)):
+    if db is None:
+        repo = memory_backend.rollups
+    else:
+        repo = MongoRollupRepo(db["sales_rollups"])
+    return RollupService(repo, tz=settings.ANALYTICS_TIMEZONE)
+
+def get_order_events():
+    return order_events
+
+def get_order_counters():
+    return order_counters
+
+def get_order_service(
+    repo = Depends(get_order_repo),
+    events = Depends(get_order_events),
+    rollups = Depends(get_rollup_service),
+    counters = Depends(get_order_counters),
+    products = Depends(get_product_loader)
+):
+    return OrderService(
+        repo,
+        events=events,
+        rollups=rollups,
+        counters=counters,
+        pricing=PricingService(products),
+    )
+
+# Readiness
+from app.infra.health import ReadinessProbe, loop_monitor, pool_stats
+
+readiness_probe = ReadinessProbe(
+    ping,
+    pool_stats,
+    loop_monitor,
+    timeout=settings.HEALTH_PING_TIMEOUT_MS / 1000,
+    cache_seconds=settings.HEALTH_CACHE_SECONDS,
+)
+
+# Backend em memória: não há banco para pingar nem pool para inspecionar
+memory_readiness_probe = ReadinessProbe(None, None, loop_monitor)
+
+def get_readiness_probe():
+    if settings.REPO_BACKEND == "memory":
+        return memory_readiness_probe
+    return readiness_probe
+
+# Monitoramento de comandos
+from app.infra.monitoring import command_monitor
 
-def get_order_service(repo = Depends(get_order_repo)):
-    return OrderService(repo)
\ No newline at end of file
+def get_command_monitor():
+    return command_monitor
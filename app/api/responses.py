@@ -0,0 +1,114 @@
+from functools import lru_cache
+from typing import Any, Optional
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import Response
+from app.infra.cache import TTLCache, catalog_etag_cache
+import hashlib
+import orjson
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse serializada com orjson (classe padrão da aplicação).
+
+    Usada para respostas montadas a partir de dicts (health, erros, admin).
+    Listas e objetos de domínio passam por ``model_response``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+@lru_cache(maxsize=None)
+def adapter(tp: Any) -> TypeAdapter:
+    """TypeAdapter em cache por tipo (criar um adapter compila o schema)"""
+    return TypeAdapter(tp)
+
+def model_response(
+    tp: Any,
+    value: Any,
+    status_code: int = 200,
+    headers: Optional[dict[str, str]] = None
+) -> Response:
+    """Serializar objetos de domínio direto para JSON, sem revalidar.
+
+    ``tp`` é o tipo de domínio (ex: ``list[Product]``); campos de subclasses
+    fora de ``tp`` não são emitidos. Os modelos ``*Out`` dos routers
+    continuam como ``response_model`` para a documentação e espelham esses
+    tipos campo a campo.
+    """
+    return Response(
+        content=adapter(tp).dump_json(value),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+def etag_for(body: bytes) -> str:
+    """ETag forte derivada do conteúdo exato da resposta"""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (c.strip() for c in if_none_match.split(","))
+    return any(c.removeprefix("W/") == etag for c in candidates)
+
+class ConditionalCatalog:
+    """Respostas condicionais (ETag/If-None-Match) para o cardápio.
+
+    A ETag é o hash do corpo, então é a mesma em todos os workers. O par
+    (ETag, headers) fica em cache por (versão do catálogo, URL): enquanto a
+    versão não muda, um ``If-None-Match`` válido é respondido com 304 sem
+    consultar o banco nem serializar. Escritas feitas em outro worker mudam
+    a versão quando ``CatalogVersion`` relê o contador compartilhado (ver
+    CATALOG_VERSION_REFRESH_SECONDS).
+    """
+
+    CACHE_CONTROL = "no-cache"
+
+    def __init__(self, cache: TTLCache):
+        self.cache = cache
+
+    @staticmethod
+    def _key(request: Request, version: int) -> tuple:
+        return (version, request.url.path, request.url.query)
+
+    def not_modified(self, request: Request, version: int) -> Optional[Response]:
+        """304 se o cliente já tem a versão atual desta URL, senão None"""
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return None
+        cached = self.cache.get(self._key(request, version))
+        if cached is None or not etag_matches(if_none_match, cached[0]):
+            return None
+        return self._not_modified(*cached)
+
+    def respond(
+        self,
+        request: Request,
+        version: int,
+        tp: Any,
+        value: Any,
+        headers: Optional[dict[str, str]] = None
+    ) -> Response:
+        body = adapter(tp).dump_json(value)
+        etag = etag_for(body)
+        extra = dict(headers or {})
+        self.cache.set(self._key(request, version), (etag, extra))
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return self._not_modified(etag, extra)
+        return Response(
+            content=body,
+            headers={**extra, "ETag": etag, "Cache-Control": self.CACHE_CONTROL},
+            media_type="application/json",
+        )
+
+    def _not_modified(self, etag: str, headers: dict[str, str]) -> Response:
+        return Response(
+            status_code=304,
+            headers={**headers, "ETag": etag, "Cache-Control": self.CACHE_CONTROL},
+        )
+
+catalog_responses = ConditionalCatalog(catalog_etag_cache)
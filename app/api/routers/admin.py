@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Query
+from app.api.deps import get_command_monitor
+from app.infra.monitoring import CommandMonitor, QueryShapeStats
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+@router.get("/slow-queries", response_model=list[QueryShapeStats])
+async def slow_queries(
+    top: int = Query(10, ge=1, le=100),
+    monitor: CommandMonitor = Depends(get_command_monitor)
+):
+    """Formas de query mais lentas (valores do filtro omitidos)"""
+    return monitor.top(top)
+
+@router.delete("/slow-queries", status_code=204)
+async def reset_slow_queries(monitor: CommandMonitor = Depends(get_command_monitor)):
+    monitor.reset()
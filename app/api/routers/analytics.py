@@ -0,0 +1,46 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.api.deps import get_rollup_service
+from app.services.analytics_service import DailySales, HourlySales, ProductSales, RollupService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+_START = Query(..., description="Primeiro dia (AAAA-MM-DD, fuso da loja)")
+_END = Query(..., description="Último dia, inclusivo")
+
+@router.get("/daily", response_model=list[DailySales])
+async def daily_sales(
+    start: date = _START,
+    end: date = _END,
+    svc: RollupService = Depends(get_rollup_service)
+):
+    """Faturamento, pedidos e ticket médio por dia"""
+    try:
+        return await svc.daily(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/hourly", response_model=list[HourlySales])
+async def hourly_sales(
+    start: date = _START,
+    end: date = _END,
+    svc: RollupService = Depends(get_rollup_service)
+):
+    """Pedidos por hora do dia, somados no intervalo"""
+    try:
+        return await svc.hourly(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/top-products", response_model=list[ProductSales])
+async def top_products(
+    start: date = _START,
+    end: date = _END,
+    limit: int = Query(10, ge=1, le=100),
+    svc: RollupService = Depends(get_rollup_service)
+):
+    """Produtos mais vendidos por quantidade"""
+    try:
+        return await svc.top_products(start, end, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,7 +1,22 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from app.api.deps import get_readiness_probe
+from app.infra.health import ReadinessProbe, ReadinessReport
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 @router.get("")
 async def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@router.get("/live")
+async def live():
+    """Liveness: o processo responde; não consulta dependências"""
+    return {"status": "ok"}
+
+@router.get("/ready", response_model=ReadinessReport, responses={503: {"model": ReadinessReport}})
+async def ready(probe: ReadinessProbe = Depends(get_readiness_probe)):
+    """Readiness: MongoDB responde dentro do prazo (503 caso contrário; backend em memória está sempre pronto)"""
+    report = await probe.check()
+    status_code = 200 if report.status == "ready" else 503
+    return JSONResponse(status_code=status_code, content=report.model_dump(mode="json"))
@@ -1,35 +1,57 @@
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel
-from app.api.deps import get_order_service
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, Literal, Optional
+from app.api.deps import get_order_counters, get_order_events, get_order_service
+from app.api.responses import model_response
+from app.core.settings import settings
 from app.services.order_service import OrderService
-from app.domain.order_entities import Order, OrderStatus, OrderItem
-from datetime import datetime
+from app.services.order_export import stream_orders
+from app.services.order_events import FeedControl, OrderEventBroker
+from app.services.order_counters import OrderStats, OrderStatusCounters
+from app.domain.order_entities import Order, OrderStatus, OrderItem, InvalidTransitionError, OrderNotFoundError
+from app.infra.pagination import InvalidCursorError, order_cursor
+from pymongo.errors import ConnectionFailure
+from app.infra.repos import DUPLICATE, INVALID, DuplicateError
+from app.domain.ids import new_order_id
+from datetime import datetime, timezone
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _next_cursor_headers(items: list[Order], limit: int) -> dict[str, str]:
+    """Expor o cursor da próxima página quando a página atual está cheia"""
+    if len(items) == limit:
+        return {NEXT_CURSOR_HEADER: order_cursor(items[-1])}
+    return {}
+
 class OrderItemIn(BaseModel):
     product_id: str
     name: str
     quantity: int
     price: float
-    notes: str = None
+    notes: Optional[str] = None
+    size_cm: Optional[int] = None
 
 class OrderIn(BaseModel):
-    id: str = None # Opcional, será gerado se não fornecido
+    id: Optional[str] = None # Opcional, será gerado se não fornecido
     customer_name: str
     customer_phone: str
-    customer_address: str = None
+    customer_address: Optional[str] = None
     items: list[OrderItemIn]
     total_price: float
     delivery_type: str = "delivery"
     payment_method: str = "dinheiro"
-    notes: str = None
+    notes: Optional[str] = None
 
+# Espelha Order campo a campo: as respostas são serializadas direto do
+# objeto de domínio (app.api.responses.model_response)
 class OrderOut(BaseModel):
     id: str
     customer_name: str
     customer_phone: str
-    customer_address: str = None
+    customer_address: Optional[str] = None
     items: list[OrderItemIn]
     total_price: float
     status: OrderStatus
@@ -37,45 +59,240 @@ class OrderOut(BaseModel):
     payment_method: str
     created_at: datetime
     updated_at: datetime
-    notes: str = None
+    notes: Optional[str] = None
+
+MAX_BATCH_SIZE = 1000
+
+class OrderBatchItemOut(BaseModel):
+    index: int
+    id: Optional[str] = None
+    status: Literal["created", "duplicate", "invalid"]
+    error: Optional[str] = None
+
+class OrderBatchOut(BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[OrderBatchItemOut]
+
+def _order_from_payload(payload: OrderIn, order_id: str) -> Order:
+    items = [OrderItem(**i.model_dump()) for i in payload.items]
+    return Order(
+        id=order_id,
+        customer_name=payload.customer_name,
+        customer_phone=payload.customer_phone,
+        customer_address=payload.customer_address,
+        items=items,
+        total_price=payload.total_price,
+        delivery_type=payload.delivery_type,
+        payment_method=payload.payment_method,
+        notes=payload.notes
+    )
+
+def _format_validation_error(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+    )
 
 @router.post("", response_model=OrderOut, status_code=201)
 async def create_order(payload: OrderIn, svc: OrderService = Depends(get_order_service)):
     try:
         # Gerar ID se não fornecido
-        order_id = payload.id or f"ORD-{datetime.now().strftime('%Y%m%d%H%M%S')}"
-        
-        items = [OrderItem(**i.dict()) for i in payload.items]
-        o = Order(
-            id=order_id,
-            customer_name=payload.customer_name,
-            customer_phone=payload.customer_phone,
-            customer_address=payload.customer_address,
-            items=items,
-            total_price=payload.total_price,
-            delivery_type=payload.delivery_type,
-            payment_method=payload.payment_method,
-            notes=payload.notes
-        )
+        o = _order_from_payload(payload, payload.id or new_order_id())
         created = await svc.create(o)
-        return OrderOut(**created.dict())
-    except ValueError as e:
+        return model_response(Order, created, status_code=201)
+    except DuplicateError as e:
         raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/batch", response_model=OrderBatchOut)
+async def create_orders_batch(
+    payload: list[Any] = Body(..., max_length=MAX_BATCH_SIZE),
+    svc: OrderService = Depends(get_order_service)
+):
+    """Criar pedidos em lote (sincronização do PDV offline).
+
+    Cada item é validado individualmente; os válidos são gravados com uma
+    única escrita não ordenada. O resultado informa, por posição, se o pedido
+    foi criado, já existia (ID repetido) ou é inválido.
+    """
+    results: list[Optional[OrderBatchItemOut]] = [None] * len(payload)
+    orders: list[Order] = []
+    positions: list[int] = []
+
+    for idx, raw in enumerate(payload):
+        try:
+            data = OrderIn.model_validate(raw)
+            order = _order_from_payload(data, data.id or new_order_id())
+        except ValidationError as e:
+            row_id = str(raw["id"]) if isinstance(raw, dict) and raw.get("id") is not None else None
+            results[idx] = OrderBatchItemOut(
+                index=idx, id=row_id, status=INVALID, error=_format_validation_error(e)
+            )
+            continue
+        orders.append(order)
+        positions.append(idx)
+
+    try:
+        failures = await svc.create_many(orders) if orders else {}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for pos, (idx, order) in enumerate(zip(positions, orders)):
+        if pos in failures:
+            reason, error = failures[pos]
+            results[idx] = OrderBatchItemOut(index=idx, id=order.id, status=reason, error=error)
+        else:
+            results[idx] = OrderBatchItemOut(index=idx, id=order.id, status="created")
+
+    return OrderBatchOut(
+        created=sum(r.status == "created" for r in results),
+        duplicates=sum(r.status == DUPLICATE for r in results),
+        invalid=sum(r.status == INVALID for r in results),
+        results=results,
+    )
+
+def _naive_utc(moment: datetime) -> datetime:
+    """Converter para UTC sem tzinfo, como ``created_at`` é gravado no banco"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+@router.get("/stats", response_model=OrderStats)
+async def order_stats(counters: OrderStatusCounters = Depends(get_order_counters)):
+    """Pedidos por status agora (contadores em memória, sem consultar o banco)"""
+    return counters.snapshot()
+
+@router.get("/export")
+async def export_orders(
+    start: datetime = Query(..., description="Início (inclusivo) do intervalo de created_at"),
+    end: datetime = Query(..., description="Fim (exclusivo) do intervalo de created_at"),
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    gzip: bool = Query(False, description="Comprimir a resposta com gzip"),
+    batch_size: int = Query(500, ge=50, le=5000),
+    svc: OrderService = Depends(get_order_service)
+):
+    """Exportar pedidos de um intervalo em streaming (NDJSON ou CSV).
+
+    Os documentos são lidos do cursor do MongoDB em lotes de ``batch_size`` e
+    enviados à medida que chegam, sem materializar o resultado em memória.
+    Datas sem fuso são interpretadas como UTC.
+    """
+    start, end = _naive_utc(start), _naive_utc(end)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="Intervalo de datas inválido")
+
+    filename = f"orders_{start:%Y%m%d}_{end:%Y%m%d}.{format}" + (".gz" if gzip else "")
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    media_type = EXPORT_MEDIA_TYPES[format]
+    if gzip:
+        media_type = "application/gzip"
+
+    body = stream_orders(svc.export(start, end, batch_size=batch_size), fmt=format, gzip=gzip, chunk_size=batch_size)
+    return StreamingResponse(body, media_type=media_type, headers=headers)
 
 @router.get("", response_model=list[OrderOut])
-async def list_orders(svc: OrderService = Depends(get_order_service)):
-    items = await svc.list_all()
-    return [OrderOut(**i.dict()) for i in items]
+async def list_orders(
+    svc: OrderService = Depends(get_order_service),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Cursor opaco retornado no header {NEXT_CURSOR_HEADER}")
+):
+    try:
+        items = await svc.list_all(limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_response(list[Order], items, headers=_next_cursor_headers(items, limit))
 
 @router.get("/status/{status}", response_model=list[OrderOut])
-async def list_by_status(status: OrderStatus, svc: OrderService = Depends(get_order_service)):
-    items = await svc.list_by_status(status)
-    return [OrderOut(**i.dict()) for i in items]
+async def list_by_status(
+    status: OrderStatus,
+    svc: OrderService = Depends(get_order_service),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description=f"Cursor opaco retornado no header {NEXT_CURSOR_HEADER}")
+):
+    try:
+        items = await svc.list_by_status(status, limit=limit, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return model_response(list[Order], items, headers=_next_cursor_headers(items, limit))
 
 @router.patch("/{order_id}/status/{new_status}", response_model=OrderOut)
 async def update_order_status(order_id: str, new_status: OrderStatus, svc: OrderService = Depends(get_order_service)):
     try:
         updated = await svc.update_status(order_id, new_status)
-        return OrderOut(**updated.dict())
+        return model_response(Order, updated)
+    except OrderNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except InvalidTransitionError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ConnectionFailure:
+        raise
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+# ============== FEED DA COZINHA (KDS) ==============
+
+def _sse(item) -> str:
+    if isinstance(item, FeedControl):
+        return f"event: {item.type}\ndata: {item.model_dump_json()}\n\n"
+    return f"id: {item.seq}\nevent: {item.type}\ndata: {item.model_dump_json()}\n\n"
+
+@router.get("/feed")
+async def order_feed(
+    since: Optional[int] = Query(None, ge=0, description="Retomar após esta sequência"),
+    last_event_id: Optional[int] = Header(None, description="Enviado automaticamente pelo EventSource ao reconectar"),
+    events: OrderEventBroker = Depends(get_order_events)
+):
+    """Feed de pedidos em tempo real via Server-Sent Events.
+
+    Publica ``order_created`` e ``order_status_changed``. Um evento de controle
+    ``lagged`` ou ``resync`` encerra o stream; o cliente deve reconectar com
+    ``since`` (ou Last-Event-ID) igual à última sequência processada.
+    """
+    sub = events.subscribe(since if since is not None else last_event_id)
+
+    async def stream():
+        try:
+            while True:
+                item = await sub.get(timeout=settings.KDS_HEARTBEAT_SECONDS)
+                if item is None:
+                    yield ": heartbeat\n\n"
+                    continue
+                yield _sse(item)
+                if isinstance(item, FeedControl):
+                    break
+        finally:
+            sub.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def order_feed_ws(
+    websocket: WebSocket,
+    since: Optional[int] = None,
+    events: OrderEventBroker = Depends(get_order_events)
+):
+    """Feed de pedidos em tempo real via WebSocket (mesmas mensagens do SSE)"""
+    await websocket.accept()
+    sub = events.subscribe(since)
+    try:
+        while True:
+            item = await sub.get(timeout=settings.KDS_HEARTBEAT_SECONDS)
+            if item is None:
+                await websocket.send_json({"type": "heartbeat", "last_seq": events.seq})
+                continue
+            await websocket.send_text(item.model_dump_json())
+            if isinstance(item, FeedControl):
+                await websocket.close()
+                break
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sub.close()
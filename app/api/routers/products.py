@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel, Field, field_validator
 from typing import Optional
-from app.api.deps import get_product_service
-from app.services.product_service import ProductService
+from app.api.deps import get_catalog_responses, get_product_service
+from app.api.responses import ConditionalCatalog, model_response
+from app.services.product_service import MAX_BATCH_IDS, MAX_SEARCH_RESULTS, ProductService, CatalogImportReport, parse_catalog_payload
 from app.domain.entities import Product, ProductCategory, Pizza, PizzaSize
+from app.infra.pagination import InvalidCursorError, product_cursor
+from pymongo.errors import ConnectionFailure
+from app.infra.repos import DuplicateError
 import re
 
 router = APIRouter(prefix="/products", tags=["products"])
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _next_cursor_headers(items: list[Product], limit: int) -> dict[str, str]:
+    """Expor o cursor da próxima página quando a página atual está cheia"""
+    if len(items) == limit:
+        return {NEXT_CURSOR_HEADER: product_cursor(items[-1])}
+    return {}
+
+_SKIP_QUERY = Query(0, ge=0, deprecated=True, description="Use cursor para paginar")
+_CURSOR_QUERY = Query(None, description=f"Cursor opaco retornado no header {NEXT_CURSOR_HEADER}")
+
 class PizzaSizeIn(BaseModel):
     size_cm: int = Field(..., gt=0, description="Tamanho da pizza em cm")
     price: float = Field(..., gt=0, description="Preço para este tamanho")
@@ -70,6 +85,8 @@ class PizzaIn(BaseModel):
             raise ValueError('URL da imagem deve começar com http:// ou https://')
         return v
 
+# Os modelos de saída espelham Product/Pizza campo a campo: as respostas são
+# serializadas direto dos objetos de domínio (app.api.responses.model_response)
 class ProductOut(BaseModel):
     id: str
     name: str
@@ -92,44 +109,154 @@ async def create_product(
     try:
         p = Product(**payload.model_dump())
         created = await svc.create(p)
-        return ProductOut(**created.model_dump())
+        return model_response(Product, created, status_code=201)
+    except DuplicateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro ao criar produto")
 
 @router.get("", response_model=list[ProductOut])
 async def list_products(
+    request: Request,
     svc: ProductService = Depends(get_product_service),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    conditional: ConditionalCatalog = Depends(get_catalog_responses),
+    skip: int = _SKIP_QUERY,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = _CURSOR_QUERY
 ):
-    """Listar todos os produtos ativos"""
+    """Listar todos os produtos ativos (suporta If-None-Match)"""
+    version = svc.catalog.value
+    if (cached := conditional.not_modified(request, version)) is not None:
+        return cached
     try:
-        items = await svc.list_active(skip=skip, limit=limit)
-        return [ProductOut(**i.model_dump()) for i in items]
+        items = await svc.list_active(skip=skip, limit=limit, cursor=cursor)
+        return conditional.respond(
+            request, version, list[Product], items, headers=_next_cursor_headers(items, limit)
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro ao listar produtos")
 
 @router.get("/category/{category}", response_model=list[ProductOut])
 async def list_by_category(
     category: ProductCategory,
+    request: Request,
     svc: ProductService = Depends(get_product_service),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    conditional: ConditionalCatalog = Depends(get_catalog_responses),
+    skip: int = _SKIP_QUERY,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = _CURSOR_QUERY
 ):
-    """Listar produtos por categoria (exceto pizzas)"""
+    """Listar produtos por categoria (exceto pizzas; suporta If-None-Match)"""
     if category == ProductCategory.PIZZA:
         raise HTTPException(
             status_code=400,
             detail="Use o endpoint /pizzas para listar pizzas"
         )
+    version = svc.catalog.value
+    if (cached := conditional.not_modified(request, version)) is not None:
+        return cached
     try:
-        items = await svc.list_by_category(category, skip=skip, limit=limit)
-        return [ProductOut(**i.model_dump()) for i in items]
+        items = await svc.list_by_category(category, skip=skip, limit=limit, cursor=cursor)
+        return conditional.respond(
+            request, version, list[Product], items, headers=_next_cursor_headers(items, limit)
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro ao listar produtos")
 
+MAX_IMPORT_ROWS = 5000
+
+@router.get("/search", response_model=list[PizzaOut | ProductOut])
+async def search_products(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="Termos de busca (nome ou descrição)"),
+    limit: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS),
+    svc: ProductService = Depends(get_product_service),
+    conditional: ConditionalCatalog = Depends(get_catalog_responses)
+):
+    """Buscar produtos ativos por nome/descrição, ignorando acentos e com tolerância a erros de digitação"""
+    version = svc.catalog.value
+    if (cached := conditional.not_modified(request, version)) is not None:
+        return cached
+    try:
+        items = await svc.search(q, limit=limit)
+        return conditional.respond(request, version, list[Pizza | Product], items)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Erro ao buscar produtos")
+
+MISSING_IDS_HEADER = "X-Missing-Ids"
+
+def _parse_ids(ids: list[str]) -> list[str]:
+    """Aceitar ?ids=a&ids=b e ?ids=a,b (ordem preservada, sem repetidos)"""
+    parsed = [pid.strip() for raw in ids for pid in raw.split(",")]
+    return list(dict.fromkeys(pid for pid in parsed if pid))
+
+@router.get("/batch", response_model=list[PizzaOut | ProductOut])
+async def get_products_batch(
+    request: Request,
+    ids: list[str] = Query(..., description=f"IDs repetidos ou separados por vírgula (máx. {MAX_BATCH_IDS})"),
+    svc: ProductService = Depends(get_product_service),
+    conditional: ConditionalCatalog = Depends(get_catalog_responses)
+):
+    """Obter vários produtos em uma consulta, na ordem dos IDs (suporta If-None-Match).
+
+    IDs inexistentes são omitidos da lista e informados no header X-Missing-Ids.
+    """
+    version = svc.catalog.value
+    if (cached := conditional.not_modified(request, version)) is not None:
+        return cached
+    try:
+        wanted = _parse_ids(ids)
+        found = await svc.get_many(wanted)
+        missing = [pid for pid in wanted if pid not in found]
+        headers = {MISSING_IDS_HEADER: ",".join(missing)} if missing else {}
+        return conditional.respond(
+            request, version, list[Pizza | Product], list(found.values()), headers=headers
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="Erro ao obter produtos")
+
+@router.post("/import", response_model=CatalogImportReport)
+async def import_products(
+    request: Request,
+    dry_run: bool = Query(False, description="Apenas validar, sem gravar"),
+    svc: ProductService = Depends(get_product_service)
+):
+    """Importar cardápio em lote (JSON ou NDJSON de ProductIn/PizzaIn).
+
+    Todas as linhas são validadas e as válidas são gravadas com um único
+    bulk_write de upserts.
+    """
+    try:
+        rows = parse_catalog_payload(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Arquivo inválido: {e}")
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"Máximo de {MAX_IMPORT_ROWS} linhas por importação")
+    try:
+        return await svc.import_products(rows, dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Endpoints Específicos para Pizzas
 @router.post("/pizzas", response_model=PizzaOut, status_code=201)
 async def create_pizza(
@@ -149,37 +276,60 @@ async def create_pizza(
             sizes=sizes
         )
         created = await svc.create(pizza)
-        return PizzaOut(**created.model_dump())
+        return model_response(Pizza, created, status_code=201)
+    except DuplicateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro ao criar pizza")
 
 @router.get("/pizzas", response_model=list[PizzaOut])
 async def list_pizzas(
+    request: Request,
     svc: ProductService = Depends(get_product_service),
-    skip: int = Query(0, ge=0),
-    limit: int = Query(10, ge=1, le=100)
+    conditional: ConditionalCatalog = Depends(get_catalog_responses),
+    skip: int = _SKIP_QUERY,
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[str] = _CURSOR_QUERY
 ):
-    """Listar todas as pizzas com seus tamanhos e preços"""
+    """Listar todas as pizzas com seus tamanhos e preços (suporta If-None-Match)"""
+    version = svc.catalog.value
+    if (cached := conditional.not_modified(request, version)) is not None:
+        return cached
     try:
-        items = await svc.list_by_category(ProductCategory.PIZZA, skip=skip, limit=limit)
-        return [PizzaOut(**i.model_dump()) for i in items]
+        items = await svc.list_by_category(ProductCategory.PIZZA, skip=skip, limit=limit, cursor=cursor)
+        return conditional.respond(
+            request, version, list[Pizza], items, headers=_next_cursor_headers(items, limit)
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ConnectionFailure:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro ao listar pizzas")
 
 @router.get("/pizzas/{pizza_id}", response_model=PizzaOut)
 async def get_pizza(
     pizza_id: str,
-    svc: ProductService = Depends(get_product_service)
+    request: Request,
+    svc: ProductService = Depends(get_product_service),
+    conditional: ConditionalCatalog = Depends(get_catalog_responses)
 ):
-    """Obter detalhes de uma pizza específica com seus tamanhos"""
+    """Obter detalhes de uma pizza específica com seus tamanhos (suporta If-None-Match)"""
+    version = svc.catalog.value
+    if (cached := conditional.not_modified(request, version)) is not None:
+        return cached
     try:
         item = await svc.get_by_id(pizza_id)
         if not item or item.category != ProductCategory.PIZZA:
             raise HTTPException(status_code=404, detail="Pizza não encontrada")
-        return PizzaOut(**item.model_dump())
+        return conditional.respond(request, version, Pizza, item)
     except HTTPException:
         raise
+    except ConnectionFailure:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail="Erro ao obter pizza")
\ No newline at end of file
@@ -1,9 +1,203 @@
-import logging, sys
+"""Logging sem bloquear o event loop.
+
+Os registros são enfileirados por um ``QueueHandler`` e escritos em stdout
+por uma thread (``QueueListener``), como linhas JSON com o ID da requisição.
+Mensagens usam %-style (``logger.info("Pedido %s", oid)``): a formatação só
+acontece para registros que passam do nível e da amostragem.
+"""
+
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from app.core.settings import settings
+import atexit
+import json
+import logging
+import queue
+import re
+import sys
+import uuid
+
+REQUEST_ID_HEADER = "x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+class RequestIdFilter(logging.Filter):
+    """Anotar o registro com o ID da requisição corrente (na thread que loga)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Manter 1 de cada N registros até INFO; avisos e erros passam sempre.
+
+    É aplicado no logger, antes de qualquer handler: registros descartados
+    não são formatados nem enfileirados.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        if not 0 < rate <= 1:
+            raise ValueError("Taxa de amostragem deve estar em (0, 1]")
+        self.rate = rate
+        self.every = round(1 / rate)
+        self.seen = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        self.seen += 1
+        return (self.seen - 1) % self.every == 0
+
+class JsonFormatter(logging.Formatter):
+    """Uma linha JSON por registro"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not hasattr(record, "request_id"):
+            record.request_id = None
+        return super().format(record)
+
+class _QueueHandler(QueueHandler):
+    """QueueHandler que descarta (e conta) quando a fila está cheia"""
+
+    def __init__(self, q: queue.SimpleQueue, max_size: int):
+        super().__init__(q)
+        self.max_size = max_size
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolver a mensagem e a exceção aqui: args e traceback podem não
+        # ser seguros de usar em outra thread; o JSON é montado no listener
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # SimpleQueue (implementada em C) é bem mais barata que queue.Queue;
+        # o limite é verificado aqui, de forma aproximada
+        if self.queue.qsize() >= self.max_size:
+            self.dropped += 1
+        else:
+            self.queue.put_nowait(record)
+
+_handler: Optional[_QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_sampled: list[tuple[logging.Logger, SamplingFilter]] = []
+
+def parse_sampling(spec: str) -> dict[str, float]:
+    """"app.infra.repos.writes=0.1,outro=0.5" -> {logger: taxa}"""
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+def setup_logging(
+    level: Optional[str] = None,
+    fmt: Optional[str] = None,
+    sampling: Optional[dict[str, float]] = None,
+    stream=None
+) -> None:
+    """Configurar o pipeline de logging (idempotente: reconfigura sem duplicar)"""
+    global _handler, _listener
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if (fmt or settings.LOG_FORMAT) == "json" else TextFormatter())
+    q: queue.SimpleQueue = queue.SimpleQueue()
+    _handler = _QueueHandler(q, settings.LOG_QUEUE_SIZE)
+    _handler.addFilter(RequestIdFilter())
+    _listener = QueueListener(q, output, respect_handler_level=True)
+    _listener.start()
 
-def setup_logging():
     root = logging.getLogger()
-    root.setLevel(logging.INFO)
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(logging.Formatter(
-    ))
-    root.addHandler(handler)
\ No newline at end of file
+    root.setLevel(level or settings.LOG_LEVEL)
+    root.addHandler(_handler)
+
+    rates = parse_sampling(settings.LOG_SAMPLING) if sampling is None else sampling
+    for name, rate in rates.items():
+        log = logging.getLogger(name)
+        sampler = SamplingFilter(rate)
+        log.addFilter(sampler)
+        _sampled.append((log, sampler))
+
+def shutdown_logging() -> None:
+    """Remover o pipeline e escrever o que ainda estiver na fila"""
+    global _handler, _listener
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for log, sampler in _sampled:
+        log.removeFilter(sampler)
+    _sampled.clear()
+
+atexit.register(shutdown_logging)
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+class RequestIdMiddleware:
+    """Middleware ASGI: ID da requisição no contexto dos logs e no header X-Request-ID.
+
+    Reaproveita o X-Request-ID recebido (se for um identificador simples) ou
+    gera um novo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == REQUEST_ID_HEADER.encode():
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        request_id = request_id or uuid.uuid4().hex
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", ()))
+                headers.append((REQUEST_ID_HEADER.encode(), request_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
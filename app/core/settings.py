@@ -1,10 +1,72 @@
 # app/core/settings.py (compatível com Pydantic v2)
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     APP_NAME: str = "Veneto API"
     MONGO_URI: str = "mongodb://localhost:27017"
     MONGO_DB: str = "veneto_db"
+    MONGO_ENSURE_INDEXES: bool = True
+
+    # Logging (ver app/core/logging.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["json", "text"] = "json"
+    # Amostragem por logger: "logger=taxa,..." (avisos e erros nunca são descartados)
+    LOG_SAMPLING: str = "app.infra.repos.writes=0.1"
+    LOG_QUEUE_SIZE: int = 10000
+    # "mongo" ou "memory" (repositórios em memória, ver app/infra/memory.py)
+    REPO_BACKEND: Literal["mongo", "memory"] = "mongo"
+
+    # Pool de conexões do MongoDB
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 10
+    MONGO_MAX_IDLE_TIME_MS: Optional[int] = 300000
+    # Tempo máximo esperando uma conexão livre antes de falhar com 503
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = 2000
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5000
+    # Ex: "zstd,snappy,zlib" (zstd/snappy exigem os pacotes opcionais)
+    MONGO_COMPRESSORS: str = ""
+
+    # Reconstruir produtos do schema atual sem revalidar (ver app/infra/hydration.py)
+    TRUSTED_HYDRATION: bool = True
+
+    # Leituras idênticas e concorrentes compartilham uma única query (ver app/infra/singleflight.py)
+    SINGLEFLIGHT_ENABLED: bool = True
+
+    # Cache do cardápio (em memória, por processo)
+    PRODUCT_CACHE_ENABLED: bool = True
+    PRODUCT_CACHE_TTL_SECONDS: float = 60.0
+    PRODUCT_CACHE_MAX_ENTRIES: int = 1024
+    # ETags das respostas do cardápio (If-None-Match -> 304)
+    CATALOG_ETAG_TTL_SECONDS: float = 60.0
+    CATALOG_ETAG_MAX_ENTRIES: int = 1024
+    # Os caches acima são por processo; escritas em outro worker chegam pela
+    # versão compartilhada em counters/catalog, relida a cada N segundos
+    CATALOG_VERSION_REFRESH_SECONDS: float = 1.0
+    # Busca no cardápio (/products/search): recarga completa do índice após este tempo
+    SEARCH_INDEX_TTL_SECONDS: float = 300.0
+
+    # Monitoramento de comandos (/admin/slow-queries)
+    MONGO_SLOW_QUERY_MS: float = 100.0
+    # Rodar explain na primeira ocorrência lenta de cada forma de query
+    MONGO_EXPLAIN_SLOW_QUERIES: bool = False
+    MONGO_EXPLAIN_INTERVAL_SECONDS: float = 300.0
+
+    # Contadores de pedidos por status (GET /orders/stats)
+    ORDER_COUNTERS_REFRESH_SECONDS: float = 5.0
+
+    # Rollups de vendas: fuso usado para definir o dia/hora das vendas
+    ANALYTICS_TIMEZONE: str = "America/Sao_Paulo"
+
+    # Readiness (/health/ready)
+    HEALTH_PING_TIMEOUT_MS: int = 500
+    HEALTH_CACHE_SECONDS: float = 2.0
+
+    # Feed da cozinha (KDS)
+    KDS_QUEUE_SIZE: int = 100
+    KDS_HISTORY_SIZE: int = 1000
+    KDS_HEARTBEAT_SECONDS: float = 15.0
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+import os
+import secrets
+import threading
+import time
+
+class OrderIdGenerator:
+    """Gerador de IDs de pedido ordenados no tempo e sem colisão.
+
+    Formato: ``ORD-<AAAAMMDDhhmmssmmm UTC>-<nó><contador>``, onde o nó é
+    aleatório por processo (renovado após fork) e o contador desambigua IDs
+    gerados no mesmo milissegundo. Dentro de um processo os IDs são
+    estritamente crescentes, mesmo se o relógio voltar.
+    """
+
+    COUNTER_MAX = 0xFFFF
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reseed()
+
+    def _reseed(self) -> None:
+        self._node = secrets.token_hex(4)
+        self._last_ms = 0
+        self._counter = 0
+
+    def new(self) -> str:
+        with self._lock:
+            ms = time.time_ns() // 1_000_000
+            if ms <= self._last_ms:
+                ms = self._last_ms
+                self._counter += 1
+                if self._counter > self.COUNTER_MAX:
+                    # Contador esgotado no mesmo milissegundo: avançar o relógio lógico
+                    ms += 1
+                    self._counter = 0
+            else:
+                self._counter = 0
+            self._last_ms = ms
+            counter = self._counter
+        ts = datetime.fromtimestamp(ms // 1000, tz=timezone.utc)
+        return f"ORD-{ts:%Y%m%d%H%M%S}{ms % 1000:03d}-{self._node}{counter:04x}"
+
+_order_ids = OrderIdGenerator()
+os.register_at_fork(after_in_child=_order_ids._reseed)
+
+def new_order_id() -> str:
+    return _order_ids.new()
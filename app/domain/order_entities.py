@@ -2,6 +2,7 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from enum import Enum
 from datetime import datetime
+from app.domain.ids import new_order_id
 
 class OrderStatus(str, Enum):
     RECEBIDO = "recebido"
@@ -11,15 +12,36 @@ class OrderStatus(str, Enum):
     ENTREGUE = "entregue"
     CANCELADO = "cancelado"
 
+# Transições de status permitidas (origem -> destinos possíveis)
+ORDER_TRANSITIONS: dict[OrderStatus, frozenset[OrderStatus]] = {
+    OrderStatus.RECEBIDO: frozenset({OrderStatus.EM_PREPARO, OrderStatus.CANCELADO}),
+    OrderStatus.EM_PREPARO: frozenset({OrderStatus.PRONTO, OrderStatus.CANCELADO}),
+    OrderStatus.PRONTO: frozenset({OrderStatus.SAIU_ENTREGA, OrderStatus.ENTREGUE, OrderStatus.CANCELADO}),
+    OrderStatus.SAIU_ENTREGA: frozenset({OrderStatus.ENTREGUE, OrderStatus.CANCELADO}),
+    OrderStatus.ENTREGUE: frozenset(),
+    OrderStatus.CANCELADO: frozenset(),
+}
+
+def allowed_previous(status: OrderStatus) -> list[OrderStatus]:
+    """Status a partir dos quais é permitido ir para ``status``"""
+    return [origin for origin, targets in ORDER_TRANSITIONS.items() if status in targets]
+
+class InvalidTransitionError(ValueError):
+    """Transição de status não permitida a partir do status atual"""
+
+class OrderNotFoundError(ValueError):
+    """Pedido inexistente"""
+
 class OrderItem(BaseModel):
     product_id: str
     name: str
     quantity: int
     price: float
     notes: Optional[str] = None  # Observações (ex: "sem cebola")
+    size_cm: Optional[int] = None  # Tamanho escolhido (obrigatório para pizzas)
 
 class Order(BaseModel):
-    id: str = Field(default_factory=lambda: f"ORD-{datetime.now().strftime('%Y%m%d%H%M%S')}", description="Order ID (auto-generated)")
+    id: str = Field(default_factory=new_order_id, description="Order ID (auto-generated)")
     customer_name: str
     customer_phone: str
     customer_address: Optional[str] = None
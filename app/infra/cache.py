@@ -0,0 +1,235 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, List, Optional
+from app.domain.entities import Product, ProductCategory
+from app.core.settings import settings
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class TTLCache:
+    """Cache LRU em memória com TTL, limite de tamanho e invalidação por tags.
+
+    Cada entrada pode ser marcada com tags (ex: ``product:pizza_001``,
+    ``category:pizza``); ``invalidate_tags`` remove apenas as entradas
+    afetadas por uma escrita.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        if max_entries < 1:
+            raise ValueError("max_entries deve ser positivo")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any, frozenset]]" = OrderedDict()
+        self._tags: dict[str, set] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[str] = ()) -> None:
+        if key in self._data:
+            self._remove(key)
+        tags = frozenset(tags)
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._data) > self.max_entries:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Ler uma entrada sem afetar contadores nem a ordem LRU"""
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._data:
+            self._remove(key)
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Remover todas as entradas marcadas com qualquer uma das tags"""
+        removed = 0
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+                removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._tags.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, _, tags = self._data.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+# ============== PRODUCT CACHE ==============
+
+def _product_tag(pid: str) -> str:
+    return f"product:{pid}"
+
+def _category_tag(cat: Any) -> str:
+    return f"category:{getattr(cat, 'value', cat)}"
+
+_ACTIVE_TAG = "active"
+
+class CachedProductRepo:
+    """ProductRepo com cache de leitura e invalidação write-through.
+
+    Listas são marcadas com a tag de cada produto que contêm, além da tag da
+    categoria (ou ``active``), de modo que salvar um produto remove apenas as
+    listas onde ele aparece ou poderia passar a aparecer.
+
+    O cache é local ao processo. Em deploys com vários workers, uma edição
+    feita em outro worker limpa este cache quando ``CatalogVersion`` relê o
+    contador compartilhado (ver ``deps``); o TTL só limita a defasagem se
+    esse contador não puder ser lido.
+    """
+
+    def __init__(self, inner: Any, cache: TTLCache):
+        self.inner = inner
+        self.cache = cache
+
+    async def by_id(self, pid: str) -> Optional[Product]:
+        key = ("by_id", pid)
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return cached
+        product = await self.inner.by_id(pid)
+        if product is not None:
+            self.cache.set(key, product, tags=(_product_tag(pid),))
+        return product
+
+    async def by_ids(self, pids: List[str]) -> dict[str, Product]:
+        """Servir do cache o que houver e buscar o resto em uma única consulta"""
+        found: dict[str, Product] = {}
+        missing: list[str] = []
+        for pid in dict.fromkeys(pids):
+            cached = self.cache.get(("by_id", pid), _MISSING)
+            if cached is _MISSING:
+                missing.append(pid)
+            elif cached is not None:
+                found[pid] = cached
+        if missing:
+            fetched = await self.inner.by_ids(missing)
+            for pid, product in fetched.items():
+                self.cache.set(("by_id", pid), product, tags=(_product_tag(pid),))
+            found.update(fetched)
+        return {pid: found[pid] for pid in dict.fromkeys(pids) if pid in found}
+
+    async def save(self, p: Product) -> None:
+        previous = self.cache.peek(("by_id", p.id))
+        await self.inner.save(p)
+        self.invalidate_product(p, previous)
+
+    async def insert(self, p: Product) -> None:
+        await self.inner.insert(p)
+        # Produto novo: só as listas da sua categoria e as de ativos mudam
+        self.invalidate_product(p, previous=p)
+
+    async def bulk_upsert(self, products: List[Product]) -> dict[str, int]:
+        try:
+            return await self.inner.bulk_upsert(products)
+        finally:
+            # Uma importação pode tocar qualquer lista: descartar tudo
+            self.cache.clear()
+
+    async def list_by_category(
+        self,
+        cat: ProductCategory,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[Product]:
+        key = ("list_by_category", getattr(cat, "value", cat), skip, limit, cursor)
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return list(cached)
+        items = await self.inner.list_by_category(cat, skip=skip, limit=limit, cursor=cursor)
+        self.cache.set(key, tuple(items), tags=self._list_tags(items, _category_tag(cat)))
+        return items
+
+    async def list_active(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[Product]:
+        key = ("list_active", skip, limit, cursor)
+        cached = self.cache.get(key, _MISSING)
+        if cached is not _MISSING:
+            return list(cached)
+        items = await self.inner.list_active(skip=skip, limit=limit, cursor=cursor)
+        self.cache.set(key, tuple(items), tags=self._list_tags(items, _ACTIVE_TAG))
+        return items
+
+    def invalidate_product(self, p: Product, previous: Optional[Product] = None) -> None:
+        """Invalidar entradas afetadas por uma escrita no produto.
+
+        Se a versão anterior não estiver em cache, a categoria antiga é
+        desconhecida e as listas de todas as categorias são descartadas.
+        """
+        if previous is not None:
+            categories = {p.category, previous.category}
+        else:
+            categories = set(ProductCategory)
+        removed = self.cache.invalidate_tags(
+            _product_tag(p.id),
+            _ACTIVE_TAG,
+            *(_category_tag(c) for c in categories),
+        )
+        logger.debug("Cache de produtos invalidado para %s (%s entradas)", p.id, removed)
+
+    @staticmethod
+    def _list_tags(items: List[Product], scope_tag: str) -> list[str]:
+        return [scope_tag, *(_product_tag(i.id) for i in items)]
+
+product_cache = TTLCache(
+    max_entries=settings.PRODUCT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+# (versão do catálogo, caminho?query) -> (ETag, headers) das respostas do cardápio
+catalog_etag_cache = TTLCache(
+    max_entries=settings.CATALOG_ETAG_MAX_ENTRIES,
+    ttl_seconds=settings.CATALOG_ETAG_TTL_SECONDS,
+)
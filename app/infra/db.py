@@ -1,14 +1,83 @@
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from app.core.settings import settings
+from app.infra.health import pool_stats
+from app.infra.monitoring import command_monitor
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 _client: AsyncIOMotorClient | None = None
 
+def client_options() -> dict:
+    """Opções do pool de conexões a partir de Settings"""
+    options = {
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "event_listeners": [pool_stats, command_monitor],
+    }
+    if settings.MONGO_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGO_MAX_IDLE_TIME_MS
+    if settings.MONGO_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGO_COMPRESSORS:
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+def create_client() -> AsyncIOMotorClient:
+    client = AsyncIOMotorClient(settings.MONGO_URI, **client_options())
+    try:
+        command_monitor.bind(asyncio.get_running_loop(), client)
+    except RuntimeError:
+        # Sem loop rodando (uso síncrono): explains de queries lentas desligados
+        pass
+    return client
+
+async def connect() -> AsyncIOMotorClient:
+    """Criar o cliente e aquecer o pool (chamado no startup da aplicação).
+
+    O ping força a seleção do servidor; em seguida ``minPoolSize`` pings
+    concorrentes abrem as conexões mínimas, para que as primeiras requisições
+    após o deploy não paguem handshake/TLS.
+    """
+    global _client
+    if _client is None:
+        _client = create_client()
+    start = time.perf_counter()
+    await _client.admin.command("ping")
+    warm = settings.MONGO_MIN_POOL_SIZE
+    if warm > 1:
+        await asyncio.gather(*(_client.admin.command("ping") for _ in range(warm)))
+    logger.info(
+        "MongoDB conectado em %.0fms (pool min=%s, max=%s)",
+        (time.perf_counter() - start) * 1000,
+        settings.MONGO_MIN_POOL_SIZE,
+        settings.MONGO_MAX_POOL_SIZE,
+    )
+    return _client
+
+async def close() -> None:
+    """Fechar o cliente e todas as conexões do pool (shutdown)"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
+        logger.info("Conexões com o MongoDB encerradas")
+
 async def get_client() -> AsyncIOMotorClient:
     global _client
     if _client is None:
-        _client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+        # Fallback para uso fora do lifespan (scripts, testes)
+        _client = create_client()
     return _client
 
 async def get_db() -> AsyncIOMotorDatabase:
     client = await get_client()
-    return client[settings.MONGO_DB]
\ No newline at end of file
+    return client[settings.MONGO_DB]
+
+async def ping() -> None:
+    client = await get_client()
+    await client.admin.command("ping")
@@ -0,0 +1,195 @@
+from typing import Awaitable, Callable, Optional
+from pydantic import BaseModel
+from pymongo import monitoring
+from app.core.metrics import REGISTRY, Histogram
+from app.core.settings import settings
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MONGO_POOL_WAIT = REGISTRY.register(Histogram(
+    "mongo_pool_wait_seconds", "Espera por uma conexão livre no pool do MongoDB"
+))
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Contadores do pool de conexões a partir dos eventos do driver.
+
+    Os eventos chegam das threads do driver, por isso os contadores são
+    protegidos por lock. ``available`` são conexões abertas e ociosas.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open = 0
+        self.checked_out = 0
+        self.checkout_failures = 0
+        # Início do checkout por thread do driver (para medir a espera no pool)
+        self._local = threading.local()
+        self._wait = MONGO_POOL_WAIT.labels()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open": self.open,
+                "checked_out": self.checked_out,
+                "available": max(self.open - self.checked_out, 0),
+                "max_size": settings.MONGO_MAX_POOL_SIZE,
+                "checkout_failures": self.checkout_failures,
+            }
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open = max(self.open - 1, 0)
+
+    def _observe_wait(self) -> None:
+        start = getattr(self._local, "start", None)
+        if start is not None:
+            self._local.start = None
+            self._wait.observe(time.perf_counter() - start)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self._observe_wait()
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+            self._observe_wait()
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        self._local.start = time.perf_counter()
+
+class LoopLagMonitor:
+    """Mede o atraso do event loop: quanto um ``sleep(interval)`` excede o pedido"""
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self.lag_ms = 0.0
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max((time.perf_counter() - start - self.interval) * 1000, 0.0)
+            self.lag_ms = lag
+            self.max_lag_ms = max(self.max_lag_ms, lag)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+class MongoCheck(BaseModel):
+    ok: bool
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+class ReadinessReport(BaseModel):
+    status: str
+    mongo: Optional[MongoCheck] = None
+    pool: Optional[dict] = None
+    loop_lag_ms: float
+    loop_max_lag_ms: float
+    checked_at: float
+    cached: bool = False
+
+class ReadinessProbe:
+    """Verificação de prontidão com ping de prazo curto e resultado em cache.
+
+    O resultado do ping vale por ``cache_seconds``; probes concorrentes
+    compartilham o mesmo ping, então o balanceador não gera carga no banco.
+    Sem ``ping`` (backend em memória), só o atraso do event loop é reportado.
+    """
+
+    def __init__(
+        self,
+        ping: Optional[Callable[[], Awaitable]],
+        pool: Optional[PoolStats],
+        loop: LoopLagMonitor,
+        timeout: float = 0.5,
+        cache_seconds: float = 2.0
+    ):
+        self.ping = ping
+        self.pool = pool
+        self.loop = loop
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self._lock = asyncio.Lock()
+        self._last: Optional[MongoCheck] = None
+        self._checked_at = 0.0
+
+    async def _check_mongo(self) -> MongoCheck:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.ping(), self.timeout)
+        except asyncio.TimeoutError:
+            return MongoCheck(ok=False, error=f"ping excedeu {self.timeout * 1000:.0f}ms")
+        except Exception as e:
+            return MongoCheck(ok=False, error=str(e))
+        return MongoCheck(ok=True, latency_ms=round((time.perf_counter() - start) * 1000, 2))
+
+    async def check(self) -> ReadinessReport:
+        if self.ping is None:
+            return ReadinessReport(
+                status="ready",
+                loop_lag_ms=round(self.loop.lag_ms, 2),
+                loop_max_lag_ms=round(self.loop.max_lag_ms, 2),
+                checked_at=time.time(),
+            )
+        cached = True
+        async with self._lock:
+            if self._last is None or time.monotonic() - self._checked_at >= self.cache_seconds:
+                self._last = await self._check_mongo()
+                self._checked_at = time.monotonic()
+                cached = False
+                if not self._last.ok:
+                    logger.warning("Readiness: MongoDB indisponível (%s)", self._last.error)
+        return ReadinessReport(
+            status="ready" if self._last.ok else "unavailable",
+            mongo=self._last,
+            pool=self.pool.snapshot() if self.pool is not None else None,
+            loop_lag_ms=round(self.loop.lag_ms, 2),
+            loop_max_lag_ms=round(self.loop.max_lag_ms, 2),
+            checked_at=time.time(),
+            cached=cached,
+        )
+
+pool_stats = PoolStats()
+loop_monitor = LoopLagMonitor()
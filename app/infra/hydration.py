@@ -0,0 +1,125 @@
+from typing import Optional
+from pydantic import BaseModel
+from app.core.settings import settings
+from app.domain.entities import Product, ProductCategory, Pizza, PizzaSize
+from app.domain.order_entities import Order
+
+# Versão do formato dos documentos gravados pela API. Produtos com esta
+# versão já passaram pela validação do domínio na escrita e podem ser
+# reconstruídos sem revalidação (pedidos são sempre validados). Incrementar
+# ao mudar campos ou regras de validação de Product/Pizza/Order.
+SCHEMA_VERSION = 1
+
+_CATEGORIES = {c.value: c for c in ProductCategory}
+
+def _slot_setters() -> Optional[tuple]:
+    """Descritores dos __slots__ de BaseModel, se esta versão do pydantic os tiver"""
+    try:
+        return tuple(
+            BaseModel.__dict__[name].__set__
+            for name in ("__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__")
+        )
+    except (KeyError, AttributeError):
+        return None
+
+_SLOTS = _slot_setters()
+
+def _construct(cls, values: dict):
+    """Instanciar um modelo Pydantic v2 sem validação, com ``values`` trazendo todos os campos.
+
+    Atribui pelos descritores dos slots de BaseModel, evitando o
+    processamento de defaults/aliases que deixa o ``model_construct`` mais
+    caro que a própria validação no pydantic-core. Se o pydantic mudar esses
+    slots, cai no ``model_construct`` (mais lento, mesmo resultado).
+    """
+    if _SLOTS is None:
+        return cls.model_construct(**values)
+    set_fields_set, set_extra, set_private = _SLOTS
+    m = object.__new__(cls)
+    object.__setattr__(m, "__dict__", values)
+    set_fields_set(m, set(values))
+    set_extra(m, None)
+    set_private(m, None)
+    return m
+
+def is_trusted(doc: dict, trusted: Optional[bool] = None) -> bool:
+    if trusted is None:
+        trusted = settings.TRUSTED_HYDRATION
+    return trusted and doc.get("schema_version") == SCHEMA_VERSION
+
+# ============== PRODUCTS ==============
+
+def product_to_doc(p: Product) -> dict:
+    """Converter Product/Pizza para o documento gravado no MongoDB"""
+    doc = p.model_dump()
+    doc["_id"] = p.id
+    doc["schema_version"] = SCHEMA_VERSION
+    return doc
+
+def product_from_doc(doc: dict, trusted: Optional[bool] = None) -> Product:
+    """Converter documento MongoDB para Product/Pizza.
+
+    Documentos gravados pela versão atual do schema são reconstruídos sem
+    validadores; os demais passam pela validação completa do domínio.
+    """
+    category = doc.get("category")
+    is_pizza = category == ProductCategory.PIZZA.value and "sizes" in doc
+
+    if is_trusted(doc, trusted):
+        fields = {
+            "id": doc["_id"],
+            "name": doc["name"],
+            "category": _CATEGORIES[category],
+            "description": doc.get("description"),
+            "price": doc.get("price", 0.0),
+            "active": doc.get("active", True),
+            "image_url": doc.get("image_url"),
+        }
+        if is_pizza:
+            fields["sizes"] = [
+                _construct(PizzaSize, {"size_cm": s["size_cm"], "price": s["price"]})
+                for s in doc["sizes"]
+            ]
+            return _construct(Pizza, fields)
+        return _construct(Product, fields)
+
+    # Se for pizza, retornar instância de Pizza
+    if is_pizza:
+        return Pizza(
+            id=doc["_id"],
+            name=doc["name"],
+            category=category,
+            description=doc.get("description"),
+            price=doc.get("price", 0.0),
+            active=doc.get("active", True),
+            image_url=doc.get("image_url"),
+            sizes=doc.get("sizes", [])
+        )
+
+    # Caso contrário, retornar Product
+    return Product(
+        id=doc["_id"],
+        name=doc["name"],
+        category=category,
+        description=doc.get("description"),
+        price=doc.get("price", 0.0),
+        active=doc.get("active", True),
+        image_url=doc.get("image_url")
+    )
+
+# ============== ORDERS ==============
+
+def order_to_doc(o: Order) -> dict:
+    """Converter Order para o documento gravado no MongoDB"""
+    doc = o.model_dump()
+    doc["_id"] = o.id
+    doc["schema_version"] = SCHEMA_VERSION
+    return doc
+
+def order_from_doc(doc: dict) -> Order:
+    """Converter documento MongoDB para Order (sempre validado).
+
+    Sem validadores em Python a pular, a reconstrução sem validação ganhava
+    ~1.1x em pedidos; não compensa depender de detalhes internos do pydantic.
+    """
+    return Order(**doc)
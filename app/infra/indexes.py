@@ -0,0 +1,144 @@
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field
+from pymongo import IndexModel
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Opções que diferenciam dois índices com as mesmas chaves
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds")
+
+class IndexSpec(BaseModel):
+    """Declaração de um índice esperado em uma collection"""
+    collection: str
+    keys: List[tuple[str, int]]
+    name: Optional[str] = None
+    options: dict = Field(default_factory=dict)
+
+    @property
+    def index_name(self) -> str:
+        # Mesmo formato de nome gerado pelo MongoDB/pymongo
+        return self.name or "_".join(f"{k}_{d}" for k, d in self.keys)
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(self.keys, name=self.index_name, **self.options)
+
+# ============== REGISTRO DE ÍNDICES ==============
+# Os índices compostos terminam em _id para atender a paginação por cursor
+# (ver app/infra/pagination.py) sem etapa de SORT em memória.
+
+INDEXES: List[IndexSpec] = [
+    # list_by_category: {category, active} ordenado por (name, _id)
+    IndexSpec(collection="products", keys=[("category", 1), ("active", 1), ("name", 1), ("_id", 1)]),
+    # list_active: {active} ordenado por (name, _id)
+    IndexSpec(collection="products", keys=[("active", 1), ("name", 1), ("_id", 1)]),
+    IndexSpec(collection="products", keys=[("name", 1)]),
+    # list_by_status: {status} ordenado por (created_at desc, _id desc)
+    IndexSpec(collection="orders", keys=[("status", 1), ("created_at", -1), ("_id", -1)]),
+    # list_all: ordenado por (created_at desc, _id desc)
+    IndexSpec(collection="orders", keys=[("created_at", -1), ("_id", -1)]),
+]
+
+class IndexConflict(BaseModel):
+    collection: str
+    name: str
+    expected: dict
+    actual: dict
+
+class IndexReport(BaseModel):
+    """Diferença entre os índices declarados e os existentes no banco"""
+    missing: List[str] = Field(default_factory=list)
+    created: List[str] = Field(default_factory=list)
+    extra: List[str] = Field(default_factory=list)
+    conflicting: List[IndexConflict] = Field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.conflicting and set(self.missing) <= set(self.created)
+
+def _direction(d: Any) -> Any:
+    # O servidor pode devolver 1.0 em vez de 1; índices "text"/"2dsphere" são strings
+    return int(d) if isinstance(d, (int, float)) else d
+
+def _describe(keys: List[tuple[str, Any]], options: dict) -> dict:
+    return {
+        "key": [[k, _direction(d)] for k, d in keys],
+        **{o: options[o] for o in _COMPARED_OPTIONS if o in options},
+    }
+
+def _same_keys(a: List[tuple[str, Any]], b: List[tuple[str, Any]]) -> bool:
+    return [(k, _direction(d)) for k, d in a] == [(k, _direction(d)) for k, d in b]
+
+async def ensure_indexes(
+    db: Any,
+    specs: Optional[List[IndexSpec]] = None,
+    dry_run: bool = False
+) -> IndexReport:
+    """Comparar o registro com o banco e criar os índices ausentes.
+
+    A operação é idempotente: índices já existentes com a mesma definição
+    são ignorados. Conflitos (mesmo nome com definição diferente, ou mesmas
+    chaves com outro nome/opções) e índices extras são apenas reportados;
+    removê-los fica a cargo de uma migração explícita.
+    """
+    specs = INDEXES if specs is None else specs
+    report = IndexReport()
+
+    by_collection: dict[str, List[IndexSpec]] = {}
+    for spec in specs:
+        by_collection.setdefault(spec.collection, []).append(spec)
+
+    for collection, col_specs in by_collection.items():
+        col = db[collection]
+        existing = await col.index_information()
+        existing.pop("_id_", None)
+        matched: set[str] = set()
+        to_create: List[IndexSpec] = []
+
+        for spec in col_specs:
+            expected = _describe(spec.keys, spec.options)
+            name = spec.index_name
+            if name in existing:
+                info = existing[name]
+                actual = _describe(info["key"], info)
+                matched.add(name)
+                if actual != expected:
+                    report.conflicting.append(IndexConflict(
+                        collection=collection, name=name, expected=expected, actual=actual
+                    ))
+                continue
+
+            same_keys = [n for n, info in existing.items() if _same_keys(info["key"], spec.keys)]
+            if same_keys:
+                info = existing[same_keys[0]]
+                matched.add(same_keys[0])
+                report.conflicting.append(IndexConflict(
+                    collection=collection,
+                    name=name,
+                    expected=expected,
+                    actual={"name": same_keys[0], **_describe(info["key"], info)},
+                ))
+                continue
+
+            report.missing.append(f"{collection}.{name}")
+            to_create.append(spec)
+
+        report.extra.extend(f"{collection}.{n}" for n in existing if n not in matched)
+
+        if to_create and not dry_run:
+            await col.create_indexes([s.to_model() for s in to_create])
+            report.created.extend(f"{collection}.{s.index_name}" for s in to_create)
+
+    for name in report.created:
+        logger.info("Índice criado: %s", name)
+    for name in report.extra:
+        logger.info("Índice não declarado no registro: %s", name)
+    for conflict in report.conflicting:
+        logger.warning(
+            "Índice em conflito %s.%s: esperado %s, encontrado %s",
+            conflict.collection, conflict.name, conflict.expected, conflict.actual,
+        )
+    if dry_run and report.missing:
+        logger.warning("Índices ausentes: %s", ', '.join(report.missing))
+
+    return report
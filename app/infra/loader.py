@@ -0,0 +1,87 @@
+from typing import Any, List, Optional
+from app.domain.entities import Product
+import asyncio
+
+class ProductLoader:
+    """ProductRepo por requisição que agrupa chamadas concorrentes de ``by_id``.
+
+    As chamadas feitas no mesmo ciclo do event loop (ex: ``asyncio.gather``)
+    viram um único ``by_ids`` no repositório interno. Resultados ficam
+    memorizados até o fim da requisição; escritas pelo loader descartam a
+    entrada do produto. Os demais métodos são repassados ao repositório.
+
+    Entre requisições, a deduplicação fica com as camadas de baixo: o
+    ``by_ids`` de cada lote passa pelo cache e pelo single-flight (ver
+    ``deps.get_product_repo``).
+
+    Não compartilhe uma instância entre requisições: a memorização não tem TTL.
+    """
+
+    def __init__(self, repo: Any):
+        self.repo = repo
+        self._loaded: dict[str, Optional[Product]] = {}
+        self._pending: dict[str, asyncio.Future] = {}
+        self._scheduled = False
+        # O event loop só guarda referências fracas às tasks
+        self._tasks: set[asyncio.Task] = set()
+        self.batches = 0
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.repo, name)
+
+    async def by_id(self, pid: str) -> Optional[Product]:
+        if pid in self._loaded:
+            return self._loaded[pid]
+        fut = self._pending.get(pid)
+        if fut is None:
+            loop = asyncio.get_running_loop()
+            fut = self._pending[pid] = loop.create_future()
+            if not self._scheduled:
+                # Despachar depois que as outras corrotinas prontas registrarem seus IDs
+                self._scheduled = True
+                loop.call_soon(self._dispatch)
+        return await asyncio.shield(fut)
+
+    def _dispatch(self) -> None:
+        batch, self._pending, self._scheduled = self._pending, {}, False
+        task = asyncio.ensure_future(self._load(batch))
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._settle(t, batch))
+
+    async def _load(self, batch: dict[str, asyncio.Future]) -> None:
+        self.batches += 1
+        found = await self.repo.by_ids(list(batch))
+        for pid, fut in batch.items():
+            product = found.get(pid)
+            self._loaded[pid] = product
+            if not fut.done():
+                fut.set_result(product)
+
+    def _settle(self, task: asyncio.Task, batch: dict[str, asyncio.Future]) -> None:
+        """Repassar a falha (ou o cancelamento) do lote a quem ainda espera"""
+        self._tasks.discard(task)
+        for fut in batch.values():
+            if fut.done():
+                continue
+            if task.cancelled():
+                fut.cancel()
+            else:
+                fut.set_exception(task.exception())
+
+    async def by_ids(self, pids: List[str]) -> dict[str, Product]:
+        """Na ordem dos IDs; apenas os ainda não carregados vão ao repositório"""
+        missing = [pid for pid in dict.fromkeys(pids) if pid not in self._loaded]
+        if missing:
+            found = await self.repo.by_ids(missing)
+            self.batches += 1
+            for pid in missing:
+                self._loaded[pid] = found.get(pid)
+        return {pid: self._loaded[pid] for pid in dict.fromkeys(pids) if self._loaded.get(pid) is not None}
+
+    async def save(self, p: Product) -> None:
+        self._loaded.pop(p.id, None)
+        await self.repo.save(p)
+
+    async def insert(self, p: Product) -> None:
+        self._loaded.pop(p.id, None)
+        await self.repo.insert(p)
@@ -0,0 +1,399 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from enum import Enum
+from itertools import islice
+from typing import Any, AsyncIterator, Hashable, Iterator, List, Optional
+from app.domain.entities import Product, ProductCategory
+from app.domain.order_entities import Order, OrderStatus, allowed_previous
+from app.infra.hydration import product_from_doc, product_to_doc, order_from_doc, order_to_doc
+from app.infra.pagination import decode_cursor, PRODUCT_SORT, ORDER_SORT
+from app.infra.repos import DUPLICATE, INVALID, DuplicateError, MongoOrderRepo, MongoProductRepo
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _bson(value: Any) -> Any:
+    """Copiar um documento como o MongoDB o devolveria.
+
+    Enums viram seus valores, datas perdem a precisão abaixo de milissegundo
+    e dicts/listas são recriados (o chamador não altera o que foi gravado).
+    """
+    if isinstance(value, dict):
+        return {k: _bson(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_bson(v) for v in value]
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+def _check_page(skip: int, limit: int, cursor: Optional[str]) -> None:
+    if skip < 0 or limit < 1 or limit > 100 or (cursor and skip):
+        raise ValueError("Parâmetros de paginação inválidos")
+
+class SortedIndex:
+    """Índice secundário: partição -> chaves de ordenação em ordem crescente.
+
+    As chaves são tuplas com os campos do sort e o ``_id`` como desempate,
+    então a posição de um cursor (keyset) sai de uma busca binária.
+    """
+
+    def __init__(self):
+        self._parts: dict[Hashable, list[tuple]] = {}
+
+    def add(self, part: Hashable, key: tuple) -> None:
+        insort(self._parts.setdefault(part, []), key)
+
+    def remove(self, part: Hashable, key: tuple) -> None:
+        keys = self._parts.get(part)
+        if not keys:
+            return
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+            if not keys:
+                del self._parts[part]
+
+    def scan(self, part: Hashable, after: Optional[tuple] = None, descending: bool = False) -> Iterator[tuple]:
+        """Chaves da partição estritamente após ``after`` na direção pedida"""
+        keys = self._parts.get(part, [])
+        if descending:
+            end = bisect_left(keys, after) if after is not None else len(keys)
+            return (keys[i] for i in range(end - 1, -1, -1))
+        start = bisect_right(keys, after) if after is not None else 0
+        return (keys[i] for i in range(start, len(keys)))
+
+    def between(self, part: Hashable, lo: tuple, hi: tuple) -> Iterator[tuple]:
+        """Chaves em [lo, hi) em ordem crescente"""
+        keys = self._parts.get(part, [])
+        return (keys[i] for i in range(bisect_left(keys, lo), bisect_left(keys, hi)))
+
+    def count(self, part: Hashable) -> int:
+        return len(self._parts.get(part, ()))
+
+# ============== PRODUCT REPO ==============
+
+_ALL = "*"
+
+class MemoryProductRepo:
+    """ProductRepo em memória com a mesma semântica do MongoProductRepo.
+
+    Índices: produtos ativos e ativos por categoria, ordenados por
+    PRODUCT_SORT (nome, _id). Os documentos são gravados no formato do
+    banco (``product_to_doc``) e lidos com a mesma hidratação.
+    """
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+        self._active = SortedIndex()
+
+    @staticmethod
+    def _key(doc: dict) -> tuple:
+        return tuple(doc.get(f) for f, _ in PRODUCT_SORT)
+
+    def _index(self, doc: dict) -> None:
+        if doc.get("active"):
+            self._active.add(_ALL, self._key(doc))
+            self._active.add(doc.get("category"), self._key(doc))
+
+    def _unindex(self, doc: dict) -> None:
+        if doc.get("active"):
+            self._active.remove(_ALL, self._key(doc))
+            self._active.remove(doc.get("category"), self._key(doc))
+
+    def _write(self, doc: dict) -> bool:
+        """Upsert com $set; retorna se o documento mudou"""
+        previous = self.docs.get(doc["_id"])
+        merged = {**(previous or {}), **doc}
+        if merged == previous:
+            return False
+        if previous is not None:
+            self._unindex(previous)
+        self.docs[doc["_id"]] = merged
+        self._index(merged)
+        return True
+
+    async def by_id(self, pid: str) -> Optional[Product]:
+        if not pid or len(pid.strip()) == 0:
+            logger.warning("ID de produto vazio")
+            return None
+        doc = self.docs.get(pid)
+        return product_from_doc(doc) if doc else None
+
+    async def by_ids(self, pids: List[str]) -> dict[str, Product]:
+        unique = dict.fromkeys(p for p in pids if p and p.strip())
+        return {pid: product_from_doc(self.docs[pid]) for pid in unique if pid in self.docs}
+
+    async def save(self, p: Product) -> None:
+        try:
+            MongoProductRepo._validate(p)
+        except Exception as e:
+            raise ValueError(f"Erro ao salvar produto: {str(e)}")
+        self._write(_bson(product_to_doc(p)))
+
+    async def insert(self, p: Product) -> None:
+        try:
+            MongoProductRepo._validate(p)
+        except Exception as e:
+            raise ValueError(f"Erro ao salvar produto: {str(e)}")
+        if p.id in self.docs:
+            raise DuplicateError(f"Produto {p.id} já existe")
+        self._write(_bson(product_to_doc(p)))
+
+    async def bulk_upsert(self, products: List[Product]) -> dict[str, int]:
+        counts = {"inserted": 0, "updated": 0, "unchanged": 0}
+        for p in products:
+            existed = p.id in self.docs
+            changed = self._write(_bson(product_to_doc(p)))
+            if not existed:
+                counts["inserted"] += 1
+            else:
+                counts["updated" if changed else "unchanged"] += 1
+        return counts
+
+    def _page(self, part: Any, skip: int, limit: int, cursor: Optional[str]) -> List[Product]:
+        try:
+            _check_page(skip, limit, cursor)
+            after = tuple(decode_cursor(cursor, len(PRODUCT_SORT))) if cursor else None
+        except Exception as e:
+            raise ValueError(f"Erro ao listar produtos: {str(e)}")
+        keys = islice(self._active.scan(part, after), skip, skip + limit)
+        return [product_from_doc(self.docs[key[-1]]) for key in keys]
+
+    async def list_by_category(
+        self,
+        cat: ProductCategory,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[Product]:
+        return self._page(cat.value, skip, limit, cursor)
+
+    async def list_active(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[Product]:
+        return self._page(_ALL, skip, limit, cursor)
+
+# ============== ORDER REPO ==============
+
+class MemoryOrderRepo:
+    """OrderRepo em memória com a mesma semântica do MongoOrderRepo.
+
+    Índices: todos os pedidos e pedidos por status, ordenados por
+    (created_at, _id); listagens percorrem o índice de trás para frente
+    (ORDER_SORT é decrescente) e o export em ordem crescente.
+    """
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+        self._created = SortedIndex()
+
+    @staticmethod
+    def _key(doc: dict) -> tuple:
+        # Como no MongoDB, created_at nulo fica antes de qualquer data
+        return (doc.get("created_at") or datetime.min, doc["_id"])
+
+    def _index(self, doc: dict) -> None:
+        self._created.add(_ALL, self._key(doc))
+        self._created.add(doc.get("status"), self._key(doc))
+
+    def _unindex(self, doc: dict) -> None:
+        self._created.remove(_ALL, self._key(doc))
+        self._created.remove(doc.get("status"), self._key(doc))
+
+    def _write(self, doc: dict) -> None:
+        previous = self.docs.get(doc["_id"])
+        if previous is not None:
+            self._unindex(previous)
+        merged = {**(previous or {}), **doc}
+        self.docs[doc["_id"]] = merged
+        self._index(merged)
+
+    async def by_id(self, oid: str) -> Optional[Order]:
+        if not oid or len(oid.strip()) == 0:
+            logger.warning("ID de pedido vazio")
+            return None
+        doc = self.docs.get(oid)
+        return order_from_doc(doc) if doc else None
+
+    async def save(self, o: Order) -> None:
+        try:
+            MongoOrderRepo._validate(o)
+        except Exception as e:
+            raise ValueError(f"Erro ao salvar pedido: {str(e)}")
+        self._write(_bson(order_to_doc(o)))
+
+    async def insert(self, o: Order) -> None:
+        try:
+            MongoOrderRepo._validate(o)
+        except Exception as e:
+            raise ValueError(f"Erro ao salvar pedido: {str(e)}")
+        if o.id in self.docs:
+            raise DuplicateError(f"Pedido {o.id} já existe")
+        self._write(_bson(order_to_doc(o)))
+
+    async def insert_many(self, orders: List[Order]) -> dict[int, tuple[str, str]]:
+        failures: dict[int, tuple[str, str]] = {}
+        for idx, o in enumerate(orders):
+            try:
+                MongoOrderRepo._validate(o)
+            except ValueError as e:
+                failures[idx] = (INVALID, str(e))
+                continue
+            if o.id in self.docs:
+                failures[idx] = (DUPLICATE, f"Pedido {o.id} já existe")
+                continue
+            self._write(_bson(order_to_doc(o)))
+        return failures
+
+    def _page(self, part: Any, skip: int, limit: int, cursor: Optional[str]) -> List[Order]:
+        try:
+            _check_page(skip, limit, cursor)
+            after = self._cursor_key(cursor) if cursor else None
+        except Exception as e:
+            raise ValueError(f"Erro ao listar pedidos: {str(e)}")
+        keys = islice(self._created.scan(part, after, descending=True), skip, skip + limit)
+        return [order_from_doc(self.docs[key[-1]]) for key in keys]
+
+    @staticmethod
+    def _cursor_key(cursor: str) -> tuple:
+        created_at, oid = decode_cursor(cursor, len(ORDER_SORT))
+        return (created_at or datetime.min, oid)
+
+    async def list_by_status(
+        self,
+        status: OrderStatus,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[Order]:
+        return self._page(status.value, skip, limit, cursor)
+
+    async def list_all(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> List[Order]:
+        return self._page(_ALL, skip, limit, cursor)
+
+    async def iter_created_between(
+        self,
+        start: datetime,
+        end: datetime,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        if start >= end:
+            raise ValueError("Intervalo de datas inválido")
+        # Materializar as chaves: escritas durante a iteração não invalidam o scan
+        for key in list(self._created.between(_ALL, (start,), (end,))):
+            doc = self.docs.get(key[-1])
+            if doc is not None:
+                yield {k: v for k, v in _bson(doc).items() if k != "schema_version"}
+
+    async def count_by_status(self) -> dict[OrderStatus, int]:
+        return {s: self._created.count(s.value) for s in OrderStatus}
+
+    async def update_status(self, oid: str, status: OrderStatus) -> None:
+        if not oid or len(oid.strip()) == 0:
+            raise ValueError("Erro ao atualizar pedido: ID do pedido é obrigatório")
+        if oid not in self.docs:
+            raise ValueError(f"Erro ao atualizar pedido: Pedido {oid} não encontrado")
+        self._write(_bson({"_id": oid, "status": status, "updated_at": datetime.utcnow()}))
+
+    async def transition_status(
+        self,
+        oid: str,
+        status: OrderStatus
+    ) -> Optional[tuple[Order, OrderStatus]]:
+        if not oid or len(oid.strip()) == 0:
+            raise ValueError("Erro ao atualizar pedido: ID do pedido é obrigatório")
+        # Sem await entre a leitura e a escrita: atômico no event loop
+        doc = self.docs.get(oid)
+        origins = {s.value for s in allowed_previous(status)}
+        if doc is None or doc.get("status") not in origins:
+            return None
+        before = order_from_doc(doc)
+        now = _bson(datetime.utcnow())
+        self._write({"_id": oid, "status": status.value, "updated_at": now})
+        return before.model_copy(update={"status": status, "updated_at": now}), before.status
+
+# ============== ROLLUPS E CONTADORES ==============
+
+def _node(doc: dict, path: str) -> tuple[dict, str]:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    return doc, leaf
+
+class MemoryRollupRepo:
+    """RollupRepo em memória com a semântica de $inc/$set do MongoDB"""
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+
+    async def apply(self, updates: List[tuple[str, dict, dict]]) -> None:
+        now = _bson(datetime.utcnow())
+        for day, inc, fields in updates:
+            doc = self.docs.setdefault(day, {"_id": day})
+            for path, value in inc.items():
+                node, leaf = _node(doc, path)
+                node[leaf] = node.get(leaf, 0) + value
+            for path, value in {**fields, "updated_at": now}.items():
+                node, leaf = _node(doc, path)
+                node[leaf] = _bson(value)
+
+    async def replace_days(self, docs: List[dict]) -> None:
+        now = _bson(datetime.utcnow())
+        for d in docs:
+            self.docs[d["_id"]] = _bson({**d, "updated_at": now})
+
+    async def delete_days_except(self, start_day: str, end_day: str, keep: List[str]) -> int:
+        keep = set(keep)
+        stale = [d for d in self.docs if start_day <= d <= end_day and d not in keep]
+        for d in stale:
+            del self.docs[d]
+        return len(stale)
+
+    async def days(self, start_day: str, end_day: str, fields: Optional[List[str]] = None) -> List[dict]:
+        docs = [self.docs[d] for d in sorted(self.docs) if start_day <= d <= end_day]
+        if fields:
+            docs = [{k: v for k, v in d.items() if k == "_id" or k in fields} for d in docs]
+        return _bson(docs)
+
+class MemoryCounterRepo:
+    """CounterRepo em memória (um dict por contador)"""
+
+    def __init__(self):
+        self.docs: dict[str, dict[str, int]] = {}
+
+    async def increment(self, name: str, deltas: dict[str, int]) -> None:
+        doc = self.docs.setdefault(name, {})
+        for k, v in deltas.items():
+            if v:
+                doc[k] = doc.get(k, 0) + v
+
+    async def get(self, name: str) -> dict[str, int]:
+        return dict(self.docs.get(name, {}))
+
+    async def replace(self, name: str, values: dict[str, int]) -> None:
+        self.docs[name] = dict(values)
+
+class MemoryBackend:
+    """Repositórios em memória compartilhados pelo processo (REPO_BACKEND=memory).
+
+    Os dados não são persistidos nem vistos por outros workers; use em
+    testes, benchmarks sem MongoDB ou como réplica de leitura local.
+    """
+
+    def __init__(self):
+        self.products = MemoryProductRepo()
+        self.orders = MemoryOrderRepo()
+        self.rollups = MemoryRollupRepo()
+        self.counters = MemoryCounterRepo()
+
+memory_backend = MemoryBackend()
@@ -0,0 +1,246 @@
+from typing import Any, Optional
+from pydantic import BaseModel, computed_field
+from pymongo import monitoring
+from app.core.metrics import REGISTRY, Histogram
+from app.core.settings import settings
+import asyncio
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+MONGO_COMMAND_LATENCY = REGISTRY.register(Histogram(
+    "mongo_command_duration_seconds", "Duração dos comandos no MongoDB", ("command", "collection")
+))
+
+# Comando -> campo com o nome da collection
+_TRACKED = {
+    "find": "find",
+    "aggregate": "aggregate",
+    "count": "count",
+    "distinct": "distinct",
+    "findAndModify": "findAndModify",
+    "insert": "insert",
+    "update": "update",
+    "delete": "delete",
+    "getMore": "collection",
+}
+_EXPLAINABLE = {"find", "aggregate", "count", "distinct", "findAndModify"}
+_SESSION_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+def redact(value: Any) -> Any:
+    """Forma do filtro: mantém campos e operadores, troca valores por "?"."""
+    if isinstance(value, dict):
+        return {k: redact(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $and/$or mantêm a estrutura; listas de valores ($in) viram um só "?"
+        if value and all(isinstance(v, dict) for v in value):
+            return [redact(v) for v in value]
+        return ["?"]
+    return "?"
+
+def _filter_and_sort(name: str, cmd: dict) -> tuple[Optional[dict], Optional[dict]]:
+    if name in ("find", "count", "distinct"):
+        return cmd.get("filter", cmd.get("query")), cmd.get("sort")
+    if name == "findAndModify":
+        return cmd.get("query"), cmd.get("sort")
+    if name == "aggregate":
+        match = sort = None
+        for stage in cmd.get("pipeline", []):
+            if "$match" in stage and match is None:
+                match = stage["$match"]
+            if "$sort" in stage and sort is None:
+                sort = stage["$sort"]
+        return match, sort
+    if name in ("update", "delete"):
+        ops = cmd.get("updates") or cmd.get("deletes") or []
+        return (ops[0].get("q") if ops else None), None
+    return None, None
+
+def _plan_stages(plan: Any) -> list[str]:
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for v in plan.values():
+            stages.extend(_plan_stages(v))
+    elif isinstance(plan, list):
+        for v in plan:
+            stages.extend(_plan_stages(v))
+    return stages
+
+def _winning_plan(explain: Any) -> Optional[dict]:
+    if isinstance(explain, dict):
+        if "winningPlan" in explain:
+            return explain["winningPlan"]
+        for v in explain.values():
+            found = _winning_plan(v)
+            if found is not None:
+                return found
+    elif isinstance(explain, list):
+        for v in explain:
+            found = _winning_plan(v)
+            if found is not None:
+                return found
+    return None
+
+class QueryShapeStats(BaseModel):
+    command: str
+    collection: str
+    filter: Optional[dict] = None
+    sort: Optional[dict] = None
+    count: int = 0
+    slow_count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    plan: Optional[list[str]] = None
+    collscan: Optional[bool] = None
+
+    @computed_field
+    @property
+    def avg_ms(self) -> float:
+        return round(self.total_ms / self.count, 3) if self.count else 0.0
+
+class CommandMonitor(monitoring.CommandListener):
+    """Duração por comando/collection e log de queries lentas por forma.
+
+    Os eventos chegam das threads do driver; o estado é protegido por lock.
+    Com ``explain_slow`` ligado, a primeira execução lenta de cada forma (e
+    depois no máximo uma vez por ``explain_interval``) roda um ``explain``
+    no event loop da aplicação para marcar COLLSCANs.
+    """
+
+    def __init__(
+        self,
+        slow_ms: float = 100.0,
+        explain_slow: bool = False,
+        explain_interval: float = 300.0,
+        max_shapes: int = 500
+    ):
+        self.slow_ms = slow_ms
+        self.explain_slow = explain_slow
+        self.explain_interval = explain_interval
+        self.max_shapes = max_shapes
+        self._lock = threading.Lock()
+        self._pending: dict[tuple, tuple] = {}
+        self._shapes: dict[tuple, QueryShapeStats] = {}
+        self._explained_at: dict[tuple, float] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._client = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop, client) -> None:
+        """Loop e cliente usados para rodar os explains"""
+        self._loop = loop
+        self._client = client
+
+    def started(self, event):
+        name = event.command_name
+        field = _TRACKED.get(name)
+        if field is None:
+            return
+        cmd = event.command
+        filt, sort = _filter_and_sort(name, cmd)
+        collection = str(cmd.get(field, ""))
+        filter_shape = redact(filt) if filt else None
+        key = (name, collection, json.dumps(filter_shape, sort_keys=True), json.dumps(sort, default=str))
+        original = None
+        if self.explain_slow and name in _EXPLAINABLE:
+            original = {
+                k: v for k, v in cmd.items()
+                if not k.startswith("$") and k not in _SESSION_FIELDS
+            }
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                key, filter_shape, sort, event.database_name, original
+            )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        key, filter_shape, sort, database, original = pending
+        command, collection = key[0], key[1]
+        ms = event.duration_micros / 1000
+        slow = ms >= self.slow_ms
+        explain = False
+        with self._lock:
+            MONGO_COMMAND_LATENCY.labels(command, collection).observe(ms / 1000)
+            stats = self._shapes.get(key)
+            if stats is None and len(self._shapes) < self.max_shapes:
+                stats = self._shapes[key] = QueryShapeStats(
+                    command=command,
+                    collection=collection,
+                    filter=filter_shape,
+                    sort=dict(sort) if sort else None,
+                )
+            if stats is not None:
+                stats.count += 1
+                stats.total_ms += ms
+                stats.max_ms = max(stats.max_ms, ms)
+                if slow:
+                    stats.slow_count += 1
+                    now = time.monotonic()
+                    last = self._explained_at.get(key)
+                    if original is not None and (last is None or now - last >= self.explain_interval):
+                        self._explained_at[key] = now
+                        explain = True
+
+        if slow:
+            logger.warning(
+                "Query lenta (%.1fms): %s %s filtro=%s sort=%s",
+                ms, command, collection, key[2], key[3],
+            )
+        if explain:
+            self._schedule_explain(key, database, original)
+
+    def _schedule_explain(self, key: tuple, database: str, original: dict) -> None:
+        if self._loop is None or self._client is None or self._loop.is_closed():
+            return
+        coro = self._explain(key, database, original)
+        try:
+            asyncio.run_coroutine_threadsafe(coro, self._loop)
+        except RuntimeError:
+            coro.close()
+
+    async def _explain(self, key: tuple, database: str, original: dict) -> None:
+        try:
+            result = await self._client[database].command(
+                {"explain": original, "verbosity": "queryPlanner"}
+            )
+        except Exception as e:
+            logger.warning("Falha no explain de %s %s: %s", key[0], key[1], e)
+            return
+        stages = _plan_stages(_winning_plan(result))
+        with self._lock:
+            stats = self._shapes.get(key)
+            if stats is not None:
+                stats.plan = stages
+                stats.collscan = "COLLSCAN" in stages
+        if "COLLSCAN" in stages:
+            logger.warning("COLLSCAN em query lenta: %s %s filtro=%s sort=%s", key[0], key[1], key[2], key[3])
+
+    def top(self, n: int = 10) -> list[QueryShapeStats]:
+        """As ``n`` formas mais lentas (pelo pior tempo observado)"""
+        with self._lock:
+            shapes = [s.model_copy() for s in self._shapes.values()]
+        return sorted(shapes, key=lambda s: s.max_ms, reverse=True)[:n]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._explained_at.clear()
+
+command_monitor = CommandMonitor(
+    slow_ms=settings.MONGO_SLOW_QUERY_MS,
+    explain_slow=settings.MONGO_EXPLAIN_SLOW_QUERIES,
+    explain_interval=settings.MONGO_EXPLAIN_INTERVAL_SECONDS,
+)
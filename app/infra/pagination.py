@@ -0,0 +1,73 @@
+from typing import Any, Optional, Sequence
+from datetime import datetime
+import base64
+import json
+
+# Ordenações estáveis usadas pela paginação por cursor (keyset).
+# O _id entra como desempate para que o cursor seja único.
+PRODUCT_SORT = [("name", 1), ("_id", 1)]
+ORDER_SORT = [("created_at", -1), ("_id", -1)]
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginação malformado ou de outra listagem"""
+
+def encode_cursor(*values: Any) -> str:
+    """Gerar um cursor opaco a partir dos valores de ordenação do último item"""
+    payload = [{"$dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str, size: int) -> list:
+    """Decodificar um cursor gerado por encode_cursor"""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != size:
+            raise ValueError
+        return [
+            datetime.fromisoformat(v["$dt"]) if isinstance(v, dict) else v
+            for v in payload
+        ]
+    except Exception:
+        raise InvalidCursorError("Cursor de paginação inválido")
+
+def keyset_filter(sort: Sequence[tuple[str, int]], values: Sequence[Any]) -> dict:
+    """Montar o filtro que retorna os itens estritamente após o cursor.
+
+    Para sort [(a, 1), (b, 1)] e valores (x, y) gera
+    {"$or": [{a: {"$gt": x}}, {a: x, b: {"$gt": y}}]}.
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {f: values[j] for j, (f, _) in enumerate(sort[:i])}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+def paginate_query(
+    query: dict,
+    sort: Sequence[tuple[str, int]],
+    cursor: Optional[str]
+) -> dict:
+    """Combinar o filtro base com a condição de keyset do cursor"""
+    if not cursor:
+        return query
+    after = keyset_filter(sort, decode_cursor(cursor, len(sort)))
+    return {"$and": [query, after]} if query else after
+
+def validate_cursor(
+    cursor: Optional[str],
+    sort: Sequence[tuple[str, int]],
+    skip: int = 0
+) -> None:
+    """Falhar cedo (antes de ir ao banco) se o cursor não for utilizável"""
+    if cursor:
+        if skip:
+            raise InvalidCursorError("Use skip ou cursor, não ambos")
+        decode_cursor(cursor, len(sort))
+
+def product_cursor(p: Any) -> str:
+    return encode_cursor(p.name, p.id)
+
+def order_cursor(o: Any) -> str:
+    return encode_cursor(o.created_at, o.id)
@@ -1,19 +1,37 @@
-from typing import Optional, List, Protocol, Any
+from typing import Optional, List, Protocol, Any, AsyncIterator
 from app.domain.entities import Product, ProductCategory, Pizza
-from app.domain.order_entities import Order, OrderStatus
+from app.domain.order_entities import Order, OrderStatus, allowed_previous
+from app.core.metrics import instrument_repo
+from app.infra.pagination import PRODUCT_SORT, ORDER_SORT, paginate_query
+from app.infra.hydration import product_from_doc, product_to_doc, order_from_doc, order_to_doc
 from datetime import datetime
+from pymongo import ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, ConnectionFailure, DuplicateKeyError
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Os repositórios convertem erros do driver em ValueError, exceto
+# ConnectionFailure (banco indisponível, pool esgotado), que é relançada
+# para chegar ao handler da aplicação e virar 503 com Retry-After.
+# Um registro por escrita (alto volume): amostrável via LOG_SAMPLING
+write_logger = logging.getLogger(f"{__name__}.writes")
+
+class DuplicateError(ValueError):
+    """Já existe um documento com o mesmo _id"""
+
 # ============== PRODUCT REPO ==============
 
 class ProductRepo(Protocol):
     async def by_id(self, pid: str) -> Optional[Product]: ...
+    async def by_ids(self, pids: List[str]) -> dict[str, Product]: ...
     async def save(self, p: Product) -> None: ...
-    async def list_by_category(self, cat: ProductCategory, skip: int = 0, limit: int = 10) -> List[Product]: ...
-    async def list_active(self, skip: int = 0, limit: int = 10) -> List[Product]: ...
+    async def insert(self, p: Product) -> None: ...
+    async def list_by_category(self, cat: ProductCategory, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Product]: ...
+    async def list_active(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Product]: ...
+    async def bulk_upsert(self, products: List[Product]) -> dict[str, int]: ...
 
+@instrument_repo("products")
 class MongoProductRepo:
     def __init__(self, col: Any):
         self.col = col
@@ -30,31 +48,38 @@ class MongoProductRepo:
                 return None
             
             return self._doc_to_product(doc)
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao buscar produto {pid}: {e}")
+            logger.error("Erro ao buscar produto %s: %s", pid, e)
             raise ValueError(f"Erro ao buscar produto: {str(e)}")
 
+    async def by_ids(self, pids: List[str]) -> dict[str, Product]:
+        """Obter vários produtos com uma única consulta ($in), na ordem dos IDs.
+
+        IDs repetidos são consultados uma vez; IDs ausentes ficam de fora.
+        """
+        unique = list(dict.fromkeys(p for p in pids if p and p.strip()))
+        if not unique:
+            return {}
+        try:
+            cur = self.col.find({"_id": {"$in": unique}})
+            found = {doc["_id"]: self._doc_to_product(doc) async for doc in cur}
+            # $in não garante ordem: devolver na ordem pedida
+            return {pid: found[pid] for pid in unique if pid in found}
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao buscar produtos %s: %s", unique, e)
+            raise ValueError(f"Erro ao buscar produtos: {str(e)}")
+
     async def save(self, p: Product) -> None:
         """Salvar produto com validações e tratamento de erros"""
         try:
-            # Validações
-            if not p.id or len(p.id.strip()) == 0:
-                raise ValueError("ID do produto é obrigatório")
-            
-            if not p.name or len(p.name.strip()) == 0:
-                raise ValueError("Nome do produto é obrigatório")
-            
-            if p.price <= 0:
-                raise ValueError("Preço deve ser positivo")
-            
-            # Validação específica para pizzas
-            if isinstance(p, Pizza):
-                if not p.sizes or len(p.sizes) == 0:
-                    raise ValueError("Pizza deve ter pelo menos um tamanho")
+            self._validate(p)
             
             # Preparar documento para salvar
-            doc = p.model_dump()
-            doc["_id"] = p.id
+            doc = product_to_doc(p)
             
             result = await self.col.update_one(
                 {"_id": p.id},
@@ -63,98 +88,151 @@ class MongoProductRepo:
             )
             
             if result.upserted_id:
-                logger.info(f"Produto criado: {p.id}")
+                write_logger.info("Produto criado: %s", p.id)
             else:
-                logger.info(f"Produto atualizado: {p.id}")
+                write_logger.info("Produto atualizado: %s", p.id)
                 
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao salvar produto %s: %s", p.id, e)
+            raise ValueError(f"Erro ao salvar produto: {str(e)}")
+
+    async def insert(self, p: Product) -> None:
+        """Criar produto com um único insert; DuplicateError se o ID já existir"""
+        try:
+            self._validate(p)
+            await self.col.insert_one(product_to_doc(p))
+            write_logger.info("Produto criado: %s", p.id)
+        except DuplicateKeyError:
+            raise DuplicateError(f"Produto {p.id} já existe")
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao salvar produto {p.id}: {e}")
+            logger.error("Erro ao criar produto %s: %s", p.id, e)
             raise ValueError(f"Erro ao salvar produto: {str(e)}")
 
+    async def bulk_upsert(self, products: List[Product]) -> dict[str, int]:
+        """Inserir/atualizar produtos em um único bulk_write de upserts.
+
+        Retorna contagens de ``inserted``, ``updated`` e ``unchanged``
+        (documentos encontrados cujo conteúdo já era idêntico).
+        """
+        if not products:
+            return {"inserted": 0, "updated": 0, "unchanged": 0}
+        try:
+            ops = [
+                UpdateOne({"_id": p.id}, {"$set": product_to_doc(p)}, upsert=True)
+                for p in products
+            ]
+            result = await self.col.bulk_write(ops, ordered=False)
+            counts = {
+                "inserted": result.upserted_count,
+                "updated": result.modified_count,
+                "unchanged": result.matched_count - result.modified_count,
+            }
+            logger.info("Importação de produtos: %s", counts)
+            return counts
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao importar produtos em lote: %s", e)
+            raise ValueError(f"Erro ao importar produtos: {str(e)}")
+
     async def list_by_category(
         self,
         cat: ProductCategory,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> List[Product]:
-        """Listar produtos por categoria com paginação"""
+        """Listar produtos por categoria com paginação (skip ou cursor)"""
         try:
-            if skip < 0 or limit < 1 or limit > 100:
+            if skip < 0 or limit < 1 or limit > 100 or (cursor and skip):
                 raise ValueError("Parâmetros de paginação inválidos")
             
-            query = {"category": cat.value, "active": True}
-            cur = self.col.find(query).skip(skip).limit(limit)
+            query = paginate_query({"category": cat.value, "active": True}, PRODUCT_SORT, cursor)
+            cur = self.col.find(query).sort(PRODUCT_SORT).skip(skip).limit(limit)
             
             items = []
             async for doc in cur:
                 items.append(self._doc_to_product(doc))
             
-            logger.debug(f"Listados {len(items)} produtos da categoria {cat.value}")
+            logger.debug("Listados %s produtos da categoria %s", len(items), cat.value)
             return items
             
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao listar produtos por categoria: {e}")
+            logger.error("Erro ao listar produtos por categoria: %s", e)
             raise ValueError(f"Erro ao listar produtos: {str(e)}")
 
     async def list_active(
         self,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> List[Product]:
-        """Listar todos os produtos ativos com paginação"""
+        """Listar todos os produtos ativos com paginação (skip ou cursor)"""
         try:
-            if skip < 0 or limit < 1 or limit > 100:
+            if skip < 0 or limit < 1 or limit > 100 or (cursor and skip):
                 raise ValueError("Parâmetros de paginação inválidos")
             
-            cur = self.col.find({"active": True}).skip(skip).limit(limit)
+            query = paginate_query({"active": True}, PRODUCT_SORT, cursor)
+            cur = self.col.find(query).sort(PRODUCT_SORT).skip(skip).limit(limit)
             items = []
             async for doc in cur:
                 items.append(self._doc_to_product(doc))
             
-            logger.debug(f"Listados {len(items)} produtos ativos")
+            logger.debug("Listados %s produtos ativos", len(items))
             return items
             
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao listar produtos ativos: {e}")
+            logger.error("Erro ao listar produtos ativos: %s", e)
             raise ValueError(f"Erro ao listar produtos: {str(e)}")
 
     def _doc_to_product(self, doc: dict) -> Product:
         """Converter documento MongoDB para objeto Product/Pizza"""
-        category = doc.get("category")
+        return product_from_doc(doc)
+
+    @staticmethod
+    def _validate(p: Product) -> None:
+        if not p.id or len(p.id.strip()) == 0:
+            raise ValueError("ID do produto é obrigatório")
         
-        # Se for pizza, retornar instância de Pizza
-        if category == ProductCategory.PIZZA.value and "sizes" in doc:
-            return Pizza(
-                id=doc["_id"],
-                name=doc["name"],
-                category=category,
-                description=doc.get("description"),
-                price=doc.get("price", 0.0),
-                active=doc.get("active", True),
-                image_url=doc.get("image_url"),
-                sizes=doc.get("sizes", [])
-            )
+        if not p.name or len(p.name.strip()) == 0:
+            raise ValueError("Nome do produto é obrigatório")
+        
+        if p.price <= 0:
+            raise ValueError("Preço deve ser positivo")
         
-        # Caso contrário, retornar Product
-        return Product(
-            id=doc["_id"],
-            name=doc["name"],
-            category=category,
-            description=doc.get("description"),
-            price=doc.get("price", 0.0),
-            active=doc.get("active", True),
-            image_url=doc.get("image_url")
-        )
+        # Validação específica para pizzas
+        if isinstance(p, Pizza):
+            if not p.sizes or len(p.sizes) == 0:
+                raise ValueError("Pizza deve ter pelo menos um tamanho")
 
 # ============== ORDER REPO ==============
 
 class OrderRepo(Protocol):
     async def by_id(self, oid: str) -> Optional[Order]: ...
     async def save(self, o: Order) -> None: ...
-    async def list_by_status(self, status: OrderStatus, skip: int = 0, limit: int = 10) -> List[Order]: ...
-    async def list_all(self, skip: int = 0, limit: int = 10) -> List[Order]: ...
+    async def insert(self, o: Order) -> None: ...
+    async def list_by_status(self, status: OrderStatus, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Order]: ...
+    async def list_all(self, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> List[Order]: ...
     async def update_status(self, oid: str, status: OrderStatus) -> None: ...
+    async def transition_status(self, oid: str, status: OrderStatus) -> Optional[tuple[Order, OrderStatus]]: ...
+    async def insert_many(self, orders: List[Order]) -> dict[int, tuple[str, str]]: ...
+    def iter_created_between(self, start: datetime, end: datetime, batch_size: int = 500) -> AsyncIterator[dict]: ...
+    async def count_by_status(self) -> dict[OrderStatus, int]: ...
 
+# Motivos de falha por item em escritas em lote
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+DUPLICATE_KEY_CODE = 11000
+
+@instrument_repo("orders")
 class MongoOrderRepo:
     def __init__(self, col: Any):
         self.col = col
@@ -169,26 +247,19 @@ class MongoOrderRepo:
             doc = await self.col.find_one({"_id": oid})
             if not doc:
                 return None
-            return Order(**doc)
+            return order_from_doc(doc)
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao buscar pedido {oid}: {e}")
+            logger.error("Erro ao buscar pedido %s: %s", oid, e)
             raise ValueError(f"Erro ao buscar pedido: {str(e)}")
 
     async def save(self, o: Order) -> None:
         """Salvar pedido com validações"""
         try:
-            # Validações
-            if not o.id or len(o.id.strip()) == 0:
-                raise ValueError("ID do pedido é obrigatório")
+            self._validate(o)
             
-            if not o.items or len(o.items) == 0:
-                raise ValueError("Pedido deve ter pelo menos um item")
-            
-            if o.total_price <= 0:
-                raise ValueError("Preço total deve ser positivo")
-            
-            doc = o.model_dump()
-            doc["_id"] = o.id
+            doc = order_to_doc(o)
             
             result = await self.col.update_one(
                 {"_id": o.id},
@@ -197,59 +268,156 @@ class MongoOrderRepo:
             )
             
             if result.upserted_id:
-                logger.info(f"Pedido criado: {o.id}")
+                write_logger.info("Pedido criado: %s", o.id)
             else:
-                logger.info(f"Pedido atualizado: {o.id}")
+                write_logger.info("Pedido atualizado: %s", o.id)
                 
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao salvar pedido %s: %s", o.id, e)
+            raise ValueError(f"Erro ao salvar pedido: {str(e)}")
+
+    async def insert(self, o: Order) -> None:
+        """Criar pedido com um único insert; DuplicateError se o ID já existir"""
+        try:
+            self._validate(o)
+            await self.col.insert_one(order_to_doc(o))
+            write_logger.info("Pedido criado: %s", o.id)
+        except DuplicateKeyError:
+            raise DuplicateError(f"Pedido {o.id} já existe")
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao salvar pedido {o.id}: {e}")
+            logger.error("Erro ao criar pedido %s: %s", o.id, e)
             raise ValueError(f"Erro ao salvar pedido: {str(e)}")
 
+    async def insert_many(self, orders: List[Order]) -> dict[int, tuple[str, str]]:
+        """Inserir pedidos em lote com um único insert_many não ordenado.
+
+        Retorna as falhas por índice da lista de entrada, como
+        ``{índice: (DUPLICATE | INVALID, mensagem)}``; os demais foram criados.
+        """
+        failures: dict[int, tuple[str, str]] = {}
+        docs = []
+        positions = []
+        for idx, o in enumerate(orders):
+            try:
+                self._validate(o)
+            except ValueError as e:
+                failures[idx] = (INVALID, str(e))
+                continue
+            docs.append(order_to_doc(o))
+            positions.append(idx)
+
+        if not docs:
+            return failures
+
+        try:
+            await self.col.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                idx = positions[err["index"]]
+                if err.get("code") == DUPLICATE_KEY_CODE:
+                    failures[idx] = (DUPLICATE, f"Pedido {orders[idx].id} já existe")
+                else:
+                    failures[idx] = (INVALID, err.get("errmsg", "Erro ao inserir pedido"))
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao inserir pedidos em lote: %s", e)
+            raise ValueError(f"Erro ao inserir pedidos: {str(e)}")
+
+        logger.info("Lote de pedidos: %s criados, %s falhas", len(docs) - len(failures), len(failures))
+        return failures
+
     async def list_by_status(
         self,
         status: OrderStatus,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> List[Order]:
-        """Listar pedidos por status com paginação"""
+        """Listar pedidos por status com paginação (skip ou cursor)"""
         try:
-            if skip < 0 or limit < 1 or limit > 100:
+            if skip < 0 or limit < 1 or limit > 100 or (cursor and skip):
                 raise ValueError("Parâmetros de paginação inválidos")
             
-            cur = self.col.find({"status": status.value}).skip(skip).limit(limit).sort("created_at", -1)
+            query = paginate_query({"status": status.value}, ORDER_SORT, cursor)
+            cur = self.col.find(query).sort(ORDER_SORT).skip(skip).limit(limit)
             items = []
             async for doc in cur:
-                items.append(Order(**doc))
+                items.append(order_from_doc(doc))
             
-            logger.debug(f"Listados {len(items)} pedidos com status {status.value}")
+            logger.debug("Listados %s pedidos com status %s", len(items), status.value)
             return items
             
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao listar pedidos por status: {e}")
+            logger.error("Erro ao listar pedidos por status: %s", e)
             raise ValueError(f"Erro ao listar pedidos: {str(e)}")
 
     async def list_all(
         self,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> List[Order]:
-        """Listar todos os pedidos com paginação"""
+        """Listar todos os pedidos com paginação (skip ou cursor)"""
         try:
-            if skip < 0 or limit < 1 or limit > 100:
+            if skip < 0 or limit < 1 or limit > 100 or (cursor and skip):
                 raise ValueError("Parâmetros de paginação inválidos")
             
-            cur = self.col.find({}).skip(skip).limit(limit).sort("created_at", -1)
+            query = paginate_query({}, ORDER_SORT, cursor)
+            cur = self.col.find(query).sort(ORDER_SORT).skip(skip).limit(limit)
             items = []
             async for doc in cur:
-                items.append(Order(**doc))
+                items.append(order_from_doc(doc))
             
-            logger.debug(f"Listados {len(items)} pedidos")
+            logger.debug("Listados %s pedidos", len(items))
             return items
             
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao listar pedidos: {e}")
+            logger.error("Erro ao listar pedidos: %s", e)
             raise ValueError(f"Erro ao listar pedidos: {str(e)}")
 
+    async def iter_created_between(
+        self,
+        start: datetime,
+        end: datetime,
+        batch_size: int = 500
+    ) -> AsyncIterator[dict]:
+        """Iterar documentos brutos criados em [start, end) em ordem cronológica.
+
+        O cursor busca ``batch_size`` documentos por vez no servidor, então a
+        memória usada não depende do tamanho do intervalo.
+        """
+        if start >= end:
+            raise ValueError("Intervalo de datas inválido")
+        cur = self.col.find(
+            {"created_at": {"$gte": start, "$lt": end}},
+            projection={"schema_version": 0},
+        ).sort([("created_at", 1), ("_id", 1)]).batch_size(batch_size)
+        async for doc in cur:
+            yield doc
+
+    async def count_by_status(self) -> dict[OrderStatus, int]:
+        """Contagem exata de pedidos por status (usada na reconciliação)"""
+        try:
+            counts = {s: 0 for s in OrderStatus}
+            async for row in self.col.aggregate([{"$group": {"_id": "$status", "n": {"$sum": 1}}}]):
+                if row["_id"] in OrderStatus._value2member_map_:
+                    counts[OrderStatus(row["_id"])] = row["n"]
+            return counts
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao contar pedidos por status: %s", e)
+            raise ValueError(f"Erro ao contar pedidos: {str(e)}")
+
     async def update_status(self, oid: str, status: OrderStatus) -> None:
         """Atualizar status do pedido"""
         try:
@@ -267,8 +435,166 @@ class MongoOrderRepo:
             if result.matched_count == 0:
                 raise ValueError(f"Pedido {oid} não encontrado")
             
-            logger.info(f"Status do pedido {oid} atualizado para {status.value}")
+            write_logger.info("Status do pedido %s atualizado para %s", oid, status.value)
+            
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao atualizar status do pedido %s: %s", oid, e)
+            raise ValueError(f"Erro ao atualizar pedido: {str(e)}")
+
+    async def transition_status(
+        self,
+        oid: str,
+        status: OrderStatus
+    ) -> Optional[tuple[Order, OrderStatus]]:
+        """Mudar o status atomicamente, respeitando ORDER_TRANSITIONS.
+
+        Um único find_one_and_update cujo filtro exige um status de origem
+        permitido; cliques concorrentes não conseguem aplicar a mesma
+        transição duas vezes. Retorna ``(pedido atualizado, status anterior)``
+        ou None se o pedido não existe ou a transição não é permitida.
+        """
+        try:
+            if not oid or len(oid.strip()) == 0:
+                raise ValueError("ID do pedido é obrigatório")
+            
+            origins = allowed_previous(status)
+            if not origins:
+                return None
+            
+            now = datetime.utcnow()
+            doc = await self.col.find_one_and_update(
+                {"_id": oid, "status": {"$in": [s.value for s in origins]}},
+                {"$set": {"status": status.value, "updated_at": now}},
+                return_document=ReturnDocument.BEFORE,
+            )
+            if doc is None:
+                return None
+            
+            before = order_from_doc(doc)
+            write_logger.info("Status do pedido %s: %s -> %s", oid, before.status.value, status.value)
+            return before.model_copy(update={"status": status, "updated_at": now}), before.status
             
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao atualizar status do pedido %s: %s", oid, e)
+            raise ValueError(f"Erro ao atualizar pedido: {str(e)}")
+
+    @staticmethod
+    def _validate(o: Order) -> None:
+        if not o.id or len(o.id.strip()) == 0:
+            raise ValueError("ID do pedido é obrigatório")
+        
+        if not o.items or len(o.items) == 0:
+            raise ValueError("Pedido deve ter pelo menos um item")
+        
+        if o.total_price <= 0:
+            raise ValueError("Preço total deve ser positivo")
+
+class RollupRepo(Protocol):
+    async def apply(self, updates: List[tuple[str, dict, dict]]) -> None: ...
+    async def replace_days(self, docs: List[dict]) -> None: ...
+    async def delete_days_except(self, start_day: str, end_day: str, keep: List[str]) -> int: ...
+    async def days(self, start_day: str, end_day: str, fields: Optional[List[str]] = None) -> List[dict]: ...
+
+@instrument_repo("sales_rollups")
+class MongoRollupRepo:
+    """Documentos de vendas pré-agregados, um por dia (``_id`` = "AAAA-MM-DD").
+
+    Como o ``_id`` é a data, consultas por intervalo usam o índice padrão.
+    """
+
+    def __init__(self, col: Any):
+        self.col = col
+
+    async def apply(self, updates: List[tuple[str, dict, dict]]) -> None:
+        """Aplicar incrementos (dia, $inc, $set) com upsert em uma única escrita"""
+        if not updates:
+            return
+        ops = [
+            UpdateOne({"_id": day}, {"$inc": inc, "$set": {**fields, "updated_at": datetime.utcnow()}}, upsert=True)
+            for day, inc, fields in updates
+        ]
+        try:
+            await self.col.bulk_write(ops, ordered=False)
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao atualizar rollups de vendas: %s", e)
+            raise ValueError(f"Erro ao atualizar rollups: {str(e)}")
+
+    async def replace_days(self, docs: List[dict]) -> None:
+        """Substituir dias inteiros (reconstrução a partir dos pedidos)"""
+        if not docs:
+            return
+        now = datetime.utcnow()
+        ops = [ReplaceOne({"_id": d["_id"]}, {**d, "updated_at": now}, upsert=True) for d in docs]
+        try:
+            await self.col.bulk_write(ops, ordered=False)
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao reconstruir rollups de vendas: %s", e)
+            raise ValueError(f"Erro ao reconstruir rollups: {str(e)}")
+
+    async def delete_days_except(self, start_day: str, end_day: str, keep: List[str]) -> int:
+        """Remover dias do intervalo que não têm mais pedidos"""
+        result = await self.col.delete_many({"_id": {"$gte": start_day, "$lte": end_day, "$nin": keep}})
+        return result.deleted_count
+
+    async def days(self, start_day: str, end_day: str, fields: Optional[List[str]] = None) -> List[dict]:
+        """Rollups dos dias em [start_day, end_day], em ordem cronológica"""
+        projection = {f: 1 for f in fields} if fields else None
+        try:
+            cur = self.col.find({"_id": {"$gte": start_day, "$lte": end_day}}, projection=projection).sort("_id", 1)
+            return [doc async for doc in cur]
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao ler rollups de vendas: %s", e)
+            raise ValueError(f"Erro ao ler rollups: {str(e)}")
+
+class CounterRepo(Protocol):
+    async def increment(self, name: str, deltas: dict[str, int]) -> None: ...
+    async def get(self, name: str) -> dict[str, int]: ...
+    async def replace(self, name: str, values: dict[str, int]) -> None: ...
+
+@instrument_repo("counters")
+class MongoCounterRepo:
+    """Contadores compartilhados entre workers (um documento por contador)"""
+
+    def __init__(self, col: Any):
+        self.col = col
+
+    async def increment(self, name: str, deltas: dict[str, int]) -> None:
+        inc = {k: v for k, v in deltas.items() if v}
+        if not inc:
+            return
+        try:
+            await self.col.update_one({"_id": name}, {"$inc": inc}, upsert=True)
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao incrementar contador %s: %s", name, e)
+            raise ValueError(f"Erro ao incrementar contador: {str(e)}")
+
+    async def get(self, name: str) -> dict[str, int]:
+        try:
+            doc = await self.col.find_one({"_id": name}) or {}
+        except ConnectionFailure:
+            raise
+        except Exception as e:
+            logger.error("Erro ao ler contador %s: %s", name, e)
+            raise ValueError(f"Erro ao ler contador: {str(e)}")
+        return {k: v for k, v in doc.items() if k != "_id"}
+
+    async def replace(self, name: str, values: dict[str, int]) -> None:
+        try:
+            await self.col.replace_one({"_id": name}, values, upsert=True)
+        except ConnectionFailure:
+            raise
         except Exception as e:
-            logger.error(f"Erro ao atualizar status do pedido {oid}: {e}")
-            raise ValueError(f"Erro ao atualizar pedido: {str(e)}")
\ No newline at end of file
+            logger.error("Erro ao gravar contador %s: %s", name, e)
+            raise ValueError(f"Erro ao gravar contador: {str(e)}")
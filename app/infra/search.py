@@ -0,0 +1,191 @@
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import Iterable, Optional
+from app.core.settings import settings
+from app.domain.entities import Product
+import asyncio
+import re
+import time
+import unicodedata
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# Pontuação por tipo de casamento do termo e por campo onde o token aparece
+EXACT, PREFIX, FUZZY = 3.0, 2.0, 1.0
+NAME_WEIGHT, DESCRIPTION_WEIGHT = 2.0, 1.0
+
+def fold(text: str) -> str:
+    """Minúsculas e sem acentos ("Açaí" -> "acai")"""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return _TOKEN.findall(fold(text)) if text else []
+
+def max_typos(term: str) -> int:
+    """Erros tolerados pelo tamanho do termo (termos curtos só casam exato/prefixo)"""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+def _deletes(word: str, depth: int) -> set[str]:
+    """Variações de ``word`` com até ``depth`` letras removidas"""
+    found = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        found |= frontier
+    return found
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Distância de edição com transposição (OSA); para em ``limit + 1``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: list[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+class MenuSearchIndex:
+    """Índice invertido em memória sobre nome e descrição dos produtos ativos.
+
+    Cada termo da busca casa tokens por igualdade, por prefixo (vocabulário
+    ordenado + bisect) ou com poucos erros de digitação (dicionário de
+    deleções, como no SymSpell: só os candidatos que compartilham uma
+    deleção têm a distância calculada). Todos os termos precisam casar; o
+    resultado é ordenado pela pontuação e depois pelo nome.
+
+    As escritas do ProductService atualizam o índice na hora; a carga
+    completa (``rebuild``) cobre a partida e as escritas de outros workers.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl_seconds = ttl_seconds
+        self.built_at: Optional[float] = None
+        self._products: dict[str, Product] = {}
+        self._names: dict[str, tuple[str, str]] = {}
+        self._postings: dict[str, dict[str, float]] = {}
+        self._vocabulary: list[str] = []
+        self._vocabulary_dirty = False
+        self._deletes: dict[str, set[str]] = {}
+        # Recargas concorrentes (índice vencido) esperam a mesma leitura
+        self.lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def stale(self) -> bool:
+        return self.built_at is None or time.monotonic() - self.built_at > self.ttl_seconds
+
+    def expire(self) -> None:
+        """Forçar a recarga completa na próxima busca"""
+        self.built_at = None
+
+    def rebuild(self, products: Iterable[Product]) -> None:
+        self._products.clear()
+        self._names.clear()
+        self._postings.clear()
+        self._deletes.clear()
+        self._vocabulary = []
+        for p in products:
+            self._add(p)
+        self.built_at = time.monotonic()
+
+    def upsert(self, p: Product) -> None:
+        """Refletir uma escrita (produtos inativos saem do índice)"""
+        self.remove(p.id)
+        self._add(p)
+
+    def remove(self, pid: str) -> None:
+        previous = self._products.pop(pid, None)
+        if previous is None:
+            return
+        del self._names[pid]
+        for token in self._fields(previous):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(pid, None)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary_dirty = True
+                for variant in _deletes(token, max_typos(token)):
+                    words = self._deletes.get(variant)
+                    if words is not None:
+                        words.discard(token)
+                        if not words:
+                            del self._deletes[variant]
+
+    def _add(self, p: Product) -> None:
+        if not p.active:
+            return
+        self._products[p.id] = p
+        self._names[p.id] = (fold(p.name), p.id)
+        for token, weight in self._fields(p).items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                self._vocabulary_dirty = True
+                for variant in _deletes(token, max_typos(token)):
+                    self._deletes.setdefault(variant, set()).add(token)
+            postings[p.id] = weight
+
+    @staticmethod
+    def _fields(p: Product) -> dict[str, float]:
+        weights = {t: DESCRIPTION_WEIGHT for t in tokenize(p.description)}
+        weights.update((t, NAME_WEIGHT) for t in tokenize(p.name))
+        return weights
+
+    def _matches(self, term: str) -> dict[str, float]:
+        """Tokens do vocabulário que casam com o termo e sua pontuação"""
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._postings)
+            self._vocabulary_dirty = False
+        found: dict[str, float] = {}
+        i = bisect_left(self._vocabulary, term)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(term):
+            token = self._vocabulary[i]
+            found[token] = EXACT if token == term else PREFIX
+            i += 1
+        limit = max_typos(term)
+        if limit:
+            candidates = set()
+            for variant in _deletes(term, limit):
+                candidates |= self._deletes.get(variant, set())
+            for token in candidates - found.keys():
+                if edit_distance(term, token, limit) <= limit:
+                    found[token] = FUZZY
+        return found
+
+    def search(self, query: str, limit: int = 10) -> list[Product]:
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        scores: Optional[dict[str, float]] = None
+        for term in terms:
+            term_scores: dict[str, float] = {}
+            for token, kind in self._matches(term).items():
+                for pid, weight in self._postings[token].items():
+                    score = kind * weight
+                    if score > term_scores.get(pid, 0.0):
+                        term_scores[pid] = score
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+            if not scores:
+                return []
+        names = self._names
+        ranked = nsmallest(limit, scores, key=lambda pid: (-scores[pid], names[pid]))
+        return [self._products[pid] for pid in ranked]
+
+menu_index = MenuSearchIndex(ttl_seconds=settings.SEARCH_INDEX_TTL_SECONDS)
@@ -0,0 +1,135 @@
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Mapping, Optional
+from app.core.metrics import REGISTRY, Counter
+import asyncio
+
+SINGLEFLIGHT_CALLS = REGISTRY.register(Counter(
+    "singleflight_calls", "Leituras por grupo de single-flight e resultado (leader/shared)", ("group", "result")
+))
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    """Compartilhar uma única execução entre chamadas concorrentes com a mesma chave.
+
+    A primeira chamada (leader) cria uma task; as que chegam enquanto ela
+    está em andamento aguardam a mesma task e recebem o mesmo resultado ou a
+    mesma exceção. Cada chamador aguarda via ``shield``: cancelar um deles
+    não afeta os demais, e a task só é cancelada quando o último desiste.
+    Terminada a task, a chave é liberada (não há cache de resultados).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._leader = SINGLEFLIGHT_CALLS.labels(name, "leader")
+        self._shared = SINGLEFLIGHT_CALLS.labels(name, "shared")
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _Call(asyncio.ensure_future(fn()))
+            call.task.add_done_callback(lambda _: self._release(key, call))
+            self._leader.inc()
+        else:
+            self._shared.inc()
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Ninguém mais espera por esta leitura
+                self._release(key, call)
+                call.task.cancel()
+
+    def forget(self) -> None:
+        """Fazer as próximas chamadas iniciarem novas execuções (ex: após uma escrita)"""
+        self._calls.clear()
+
+    def _release(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+KeyFn = Callable[[tuple, dict], Hashable]
+
+def _args_key(args: tuple, kwargs: dict) -> Hashable:
+    return (args, tuple(sorted(kwargs.items())))
+
+def _ids_key(args: tuple, kwargs: dict) -> Hashable:
+    """Mesma chave para os mesmos IDs em qualquer ordem"""
+    ids = args[0] if args else kwargs["pids"]
+    return tuple(sorted(set(ids)))
+
+class SingleFlightRepo:
+    """Repositório com leituras coalescidas por ``SingleFlight``.
+
+    Os métodos em ``reads`` são compartilhados por nome e chave (por padrão,
+    os argumentos); listas e dicts são copiados para cada chamador. Os
+    métodos em ``writes``, após concluírem, fazem com que leituras em
+    andamento deixem de ser compartilhadas com novos chamadores, que assim
+    veem a escrita. Os demais atributos são repassados sem alteração.
+    """
+
+    def __init__(
+        self,
+        inner: Any,
+        flight: SingleFlight,
+        reads: Mapping[str, Optional[KeyFn]],
+        writes: Iterable[str]
+    ):
+        self.inner = inner
+        self.flight = flight
+        self.reads = dict(reads)
+        self.writes = frozenset(writes)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.inner, name)
+        if name in self.reads:
+            return self._read(name, attr, self.reads[name] or _args_key)
+        if name in self.writes:
+            return self._write(attr)
+        return attr
+
+    def _read(
+        self,
+        name: str,
+        method: Callable[..., Awaitable[Any]],
+        key_fn: KeyFn
+    ) -> Callable[..., Awaitable[Any]]:
+        async def read(*args, **kwargs):
+            key = (name, key_fn(args, kwargs))
+            result = await self.flight.do(key, lambda: method(*args, **kwargs))
+            if isinstance(result, (list, dict)):
+                return result.copy()
+            return result
+        return read
+
+    def _write(self, method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def write(*args, **kwargs):
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.flight.forget()
+        return write
+
+PRODUCT_READS: dict[str, Optional[KeyFn]] = {
+    "by_id": None,
+    "by_ids": _ids_key,
+    "list_by_category": None,
+    "list_active": None,
+}
+PRODUCT_WRITES = ("save", "insert", "bulk_upsert")
+
+ORDER_READS: dict[str, Optional[KeyFn]] = {"list_by_status": None}
+ORDER_WRITES = ("save", "insert", "insert_many", "update_status", "transition_status")
+
+product_flight = SingleFlight("products")
+order_flight = SingleFlight("orders")
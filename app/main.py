@@ -1,33 +1,76 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from pymongo.errors import ConnectionFailure, WaitQueueTimeoutError
 from app.core.settings import settings
-from app.core.logging import setup_logging
-from app.api.routers import health, products
+from app.core.logging import RequestIdMiddleware, setup_logging
+from app.api.routers import admin, analytics, health, metrics, products, orders
+from app.api.responses import ORJSONResponse
+from app.core.metrics import MetricsMiddleware
+from app.infra import db
+from app.infra.health import loop_monitor
+from app.infra.indexes import ensure_indexes
+from app.infra.memory import memory_backend
+from app.infra.repos import MongoCounterRepo
+from app.services.order_counters import order_counters
+from app.services.product_service import catalog_version
+import logging
 
-setup_logging()
-app = FastAPI(title=settings.APP_NAME)
-
-app.include_router(health.router)
-app.include_router(products.router)
+logger = logging.getLogger(__name__)
 
-from fastapi import FastAPI
-app = FastAPI()
-
-@app.get("/")
-async def root():
-    return {"message": "Veneto API online"}
-
-# Atualização dos router de orders
-from fastapi import FastAPI
-from app.core.settings import settings
-from app.core.logging import setup_logging
-from app.api.routers import health, products, orders
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_monitor.start()
+    if settings.REPO_BACKEND == "memory":
+        logger.warning("REPO_BACKEND=memory: dados em memória, sem persistência")
+        order_counters.bind(memory_backend.counters)
+        order_counters.start()
+        yield
+        await order_counters.stop()
+        await loop_monitor.stop()
+        return
+    try:
+        await db.connect()
+    except Exception as e:
+        # Subir mesmo assim; o driver reconecta na primeira requisição
+        logger.error("Falha ao conectar ao MongoDB no startup: %s", e)
+    if settings.MONGO_ENSURE_INDEXES:
+        try:
+            await ensure_indexes(await db.get_db())
+        except Exception as e:
+            logger.error("Falha ao verificar índices do MongoDB: %s", e)
+    database = await db.get_db()
+    order_counters.bind(MongoCounterRepo(database["counters"]))
+    order_counters.start()
+    catalog_version.bind(MongoCounterRepo(database["counters"]))
+    catalog_version.start()
+    yield
+    await catalog_version.stop()
+    await order_counters.stop()
+    await loop_monitor.stop()
+    await db.close()
 
 setup_logging()
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(MetricsMiddleware)
+# Adicionado por último = mais externo: o ID já vale para os logs de todas as camadas
+app.add_middleware(RequestIdMiddleware)
+
+@app.exception_handler(ConnectionFailure)
+async def database_unavailable(request: Request, exc: ConnectionFailure):
+    if isinstance(exc, WaitQueueTimeoutError):
+        logger.warning("Pool de conexões do MongoDB esgotado em %s", request.url.path)
+        detail = "Pool de conexões com o banco esgotado; tente novamente"
+    else:
+        logger.error("MongoDB indisponível em %s: %s", request.url.path, exc)
+        detail = "Banco de dados indisponível"
+    return ORJSONResponse(status_code=503, content={"detail": detail}, headers={"Retry-After": "1"})
 
 app.include_router(health.router)
+app.include_router(metrics.router)
 app.include_router(products.router)
 app.include_router(orders.router)
+app.include_router(analytics.router)
+app.include_router(admin.router)
 
 @app.get("/")
 async def root():
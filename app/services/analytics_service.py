@@ -0,0 +1,236 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from typing import AsyncIterator, Iterable, Optional
+from zoneinfo import ZoneInfo
+from pydantic import BaseModel
+from app.domain.order_entities import Order, OrderStatus
+from app.infra.hydration import order_from_doc
+from app.infra.repos import RollupRepo
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_RANGE_DAYS = 366
+
+class DailySales(BaseModel):
+    date: date
+    orders: int
+    revenue: float
+    cancelled_orders: int
+    cancelled_revenue: float
+    average_ticket: float
+
+class HourlySales(BaseModel):
+    hour: int
+    orders: int
+    revenue: float
+
+class ProductSales(BaseModel):
+    product_id: str
+    name: str
+    quantity: int
+    revenue: float
+
+class RebuildReport(BaseModel):
+    orders: int = 0
+    days_written: int = 0
+    days_deleted: int = 0
+
+def _cents(value: float) -> int:
+    return round(value * 100)
+
+def _product_key(product_id: str) -> str:
+    """Chave de campo segura para o MongoDB (sem "." nem "$")"""
+    return product_id.replace("%", "%25").replace(".", "%2E").replace("$", "%24")
+
+def _expand(dotted: dict) -> dict:
+    """{"a.b": 1} -> {"a": {"b": 1}}"""
+    doc: dict = {}
+    for path, value in dotted.items():
+        node = doc
+        *parents, leaf = path.split(".")
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[leaf] = value
+    return doc
+
+class _DayDelta:
+    """Incrementos acumulados de um dia ($inc e $set em notação de ponto)"""
+
+    def __init__(self):
+        self.inc: dict[str, int] = defaultdict(int)
+        self.set: dict[str, str] = {}
+
+    def add(self, order: Order, hour: int, sign: int) -> None:
+        cents = _cents(order.total_price)
+        bucket = f"hours.{hour:02d}"
+        self.inc["orders"] += sign
+        self.inc["revenue_cents"] += sign * cents
+        self.inc[f"{bucket}.orders"] += sign
+        self.inc[f"{bucket}.revenue_cents"] += sign * cents
+        if sign < 0:
+            self.inc["cancelled_orders"] += 1
+            self.inc["cancelled_revenue_cents"] += cents
+        for item in order.items:
+            key = f"products.{_product_key(item.product_id)}"
+            self.inc[f"{key}.quantity"] += sign * item.quantity
+            self.inc[f"{key}.revenue_cents"] += sign * _cents(item.price * item.quantity)
+            self.set[f"{key}.product_id"] = item.product_id
+            self.set[f"{key}.name"] = item.name
+
+    def add_cancelled(self, order: Order) -> None:
+        """Pedido já cancelado (reconstrução): conta só como cancelamento"""
+        self.inc["cancelled_orders"] += 1
+        self.inc["cancelled_revenue_cents"] += _cents(order.total_price)
+
+    def to_doc(self, day: str) -> dict:
+        base = {"orders": 0, "revenue_cents": 0, "cancelled_orders": 0, "cancelled_revenue_cents": 0}
+        return {"_id": day, **base, **_expand({**self.inc, **self.set})}
+
+class RollupService:
+    """Rollups de vendas mantidos incrementalmente (um documento por dia).
+
+    Cada documento guarda totais do dia, buckets por hora e totais por
+    produto, em centavos para não acumular erro de ponto flutuante. Criar um
+    pedido soma; cancelar subtrai e conta o cancelamento. Os dias seguem o
+    fuso ``tz`` (``created_at`` é gravado em UTC).
+    """
+
+    def __init__(self, repo: RollupRepo, tz: str = "UTC"):
+        self.repo = repo
+        self.tz = ZoneInfo(tz)
+
+    def _local(self, moment: datetime) -> datetime:
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return moment.astimezone(self.tz)
+
+    def day_bounds(self, start: date, end: date) -> tuple[datetime, datetime]:
+        """Intervalo UTC (sem tzinfo, como no banco) dos dias locais [start, end]"""
+        lo = datetime.combine(start, time.min, self.tz).astimezone(timezone.utc)
+        hi = datetime.combine(end + timedelta(days=1), time.min, self.tz).astimezone(timezone.utc)
+        return lo.replace(tzinfo=None), hi.replace(tzinfo=None)
+
+    def _deltas(self, orders: Iterable[Order], sign: int) -> list[tuple[str, dict, dict]]:
+        by_day: dict[str, _DayDelta] = defaultdict(_DayDelta)
+        for o in orders:
+            local = self._local(o.created_at)
+            by_day[local.date().isoformat()].add(o, local.hour, sign)
+        return [(day, dict(d.inc), d.set) for day, d in by_day.items()]
+
+    async def record_created(self, orders: Iterable[Order]) -> None:
+        await self.repo.apply(self._deltas(orders, 1))
+
+    async def record_cancelled(self, order: Order) -> None:
+        await self.repo.apply(self._deltas([order], -1))
+
+    async def rebuild(
+        self,
+        docs: AsyncIterator[dict],
+        start: date,
+        end: date,
+        batch_days: int = 30
+    ) -> RebuildReport:
+        """Reconstruir os dias [start, end] a partir dos pedidos brutos.
+
+        ``docs`` deve vir em ordem cronológica (``iter_created_between``):
+        cada dia é gravado assim que o stream passa dele, então a memória
+        usada é a de um lote de dias, não a do intervalo.
+        """
+        report = RebuildReport()
+        written: list[str] = []
+        pending: list[dict] = []
+        current_day: Optional[str] = None
+        current = _DayDelta()
+
+        async def flush() -> None:
+            await self.repo.replace_days(pending)
+            report.days_written += len(pending)
+            pending.clear()
+
+        async for doc in docs:
+            order = order_from_doc(doc)
+            local = self._local(order.created_at)
+            day = local.date().isoformat()
+            if day != current_day:
+                if current_day is not None:
+                    pending.append(current.to_doc(current_day))
+                    written.append(current_day)
+                    if len(pending) >= batch_days:
+                        await flush()
+                current_day, current = day, _DayDelta()
+            if order.status == OrderStatus.CANCELADO:
+                current.add_cancelled(order)
+            else:
+                current.add(order, local.hour, 1)
+            report.orders += 1
+
+        if current_day is not None:
+            pending.append(current.to_doc(current_day))
+            written.append(current_day)
+        await flush()
+        report.days_deleted = await self.repo.delete_days_except(
+            start.isoformat(), end.isoformat(), written
+        )
+        logger.info(
+            "Rollups reconstruídos de %s a %s: %s pedidos, %s dias gravados, %s removidos",
+            start, end, report.orders, report.days_written, report.days_deleted,
+        )
+        return report
+
+    @staticmethod
+    def _check_range(start: date, end: date) -> None:
+        if start > end:
+            raise ValueError("Data inicial deve ser anterior à final")
+        if (end - start).days >= MAX_RANGE_DAYS:
+            raise ValueError(f"Intervalo máximo de {MAX_RANGE_DAYS} dias")
+
+    async def daily(self, start: date, end: date) -> list[DailySales]:
+        self._check_range(start, end)
+        docs = await self.repo.days(
+            start.isoformat(), end.isoformat(),
+            fields=["orders", "revenue_cents", "cancelled_orders", "cancelled_revenue_cents"],
+        )
+        result = []
+        for doc in docs:
+            orders = doc.get("orders", 0)
+            revenue = doc.get("revenue_cents", 0)
+            result.append(DailySales(
+                date=date.fromisoformat(doc["_id"]),
+                orders=orders,
+                revenue=revenue / 100,
+                cancelled_orders=doc.get("cancelled_orders", 0),
+                cancelled_revenue=doc.get("cancelled_revenue_cents", 0) / 100,
+                average_ticket=round(revenue / orders / 100, 2) if orders else 0.0,
+            ))
+        return result
+
+    async def hourly(self, start: date, end: date) -> list[HourlySales]:
+        """Pedidos e faturamento por hora do dia, somados no intervalo"""
+        self._check_range(start, end)
+        orders = [0] * 24
+        cents = [0] * 24
+        for doc in await self.repo.days(start.isoformat(), end.isoformat(), fields=["hours"]):
+            for hour, bucket in doc.get("hours", {}).items():
+                orders[int(hour)] += bucket.get("orders", 0)
+                cents[int(hour)] += bucket.get("revenue_cents", 0)
+        return [HourlySales(hour=h, orders=orders[h], revenue=cents[h] / 100) for h in range(24)]
+
+    async def top_products(self, start: date, end: date, limit: int = 10) -> list[ProductSales]:
+        """Produtos mais vendidos (por quantidade) no intervalo"""
+        self._check_range(start, end)
+        totals: dict[str, dict] = {}
+        for doc in await self.repo.days(start.isoformat(), end.isoformat(), fields=["products"]):
+            for entry in doc.get("products", {}).values():
+                pid = entry.get("product_id")
+                if pid is None:
+                    continue
+                t = totals.setdefault(pid, {"name": entry.get("name", pid), "quantity": 0, "revenue_cents": 0})
+                t["quantity"] += entry.get("quantity", 0)
+                t["revenue_cents"] += entry.get("revenue_cents", 0)
+        ranked = sorted(totals.items(), key=lambda kv: kv[1]["quantity"], reverse=True)
+        return [
+            ProductSales(product_id=pid, name=t["name"], quantity=t["quantity"], revenue=t["revenue_cents"] / 100)
+            for pid, t in ranked[:limit]
+            if t["quantity"] > 0
+        ]
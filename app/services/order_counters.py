@@ -0,0 +1,115 @@
+from datetime import datetime
+from typing import Optional
+from pydantic import BaseModel
+from app.core.settings import settings
+from app.domain.order_entities import ORDER_TRANSITIONS, OrderStatus
+from app.infra.repos import CounterRepo, OrderRepo
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+COUNTER_NAME = "order_status"
+
+class OrderStats(BaseModel):
+    counts: dict[OrderStatus, int]
+    active: int
+    refreshed_at: Optional[datetime] = None
+    reconciled_at: Optional[datetime] = None
+
+class OrderStatusCounters:
+    """Contagem de pedidos por status, mantida em memória e no banco.
+
+    Cada escrita aplica o delta na memória (leitura O(1) em ``snapshot``) e
+    com ``$inc`` no documento ``counters/order_status``, compartilhado entre
+    workers. Periodicamente a memória é recarregada do documento, para ver
+    as escritas dos outros workers. A reconciliação com uma contagem exata
+    da collection de pedidos não roda nos workers: é feita por
+    ``scripts/reconcile_order_counters.py`` (cron/job único).
+    """
+
+    ACTIVE = [s for s, targets in ORDER_TRANSITIONS.items() if targets]
+
+    def __init__(self, repo: Optional[CounterRepo] = None):
+        self.repo = repo
+        self.counts: dict[OrderStatus, int] = {s: 0 for s in OrderStatus}
+        self.refreshed_at: Optional[datetime] = None
+        self.reconciled_at: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def bind(self, repo: CounterRepo) -> None:
+        self.repo = repo
+
+    def snapshot(self) -> OrderStats:
+        counts = dict(self.counts)
+        return OrderStats(
+            counts=counts,
+            active=sum(counts[s] for s in self.ACTIVE),
+            refreshed_at=self.refreshed_at,
+            reconciled_at=self.reconciled_at,
+        )
+
+    async def apply(self, deltas: dict[OrderStatus, int]) -> None:
+        for status, delta in deltas.items():
+            self.counts[status] = self.counts.get(status, 0) + delta
+        if self.repo is not None:
+            await self.repo.increment(COUNTER_NAME, {s.value: d for s, d in deltas.items()})
+
+    def _load(self, values: dict[str, int]) -> None:
+        self.counts = {s: int(values.get(s.value, 0)) for s in OrderStatus}
+
+    async def refresh(self) -> None:
+        """Recarregar a memória a partir do documento compartilhado"""
+        if self.repo is None:
+            return
+        self._load(await self.repo.get(COUNTER_NAME))
+        self.refreshed_at = datetime.utcnow()
+
+    async def reconcile(self, orders: OrderRepo) -> Optional[dict[OrderStatus, int]]:
+        """Recontar os pedidos e corrigir o documento com ``$inc`` do desvio.
+
+        O documento é lido antes e depois da contagem; se mudou no meio
+        (escritas concorrentes), a correção é adiada e retorna None. Aplicar
+        só o desvio, em vez de regravar o documento, não apaga incrementos
+        feitos por outros workers.
+        """
+        if self.repo is None:
+            return None
+        before = await self.repo.get(COUNTER_NAME)
+        exact = await orders.count_by_status()
+        after = await self.repo.get(COUNTER_NAME)
+        if before != after:
+            logger.info("Contadores de pedidos mudaram durante a contagem; reconciliação adiada")
+            return None
+        drift = {s: exact.get(s, 0) - int(after.get(s.value, 0)) for s in OrderStatus}
+        drift = {s: d for s, d in drift.items() if d}
+        if drift:
+            await self.repo.increment(COUNTER_NAME, {s.value: d for s, d in drift.items()})
+            logger.warning("Contadores de pedidos corrigidos: %s", {s.value: d for s, d in drift.items()})
+        await self.refresh()
+        self.reconciled_at = self.refreshed_at
+        return drift
+
+    async def _run(self, refresh_seconds: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Falha ao sincronizar contadores de pedidos: %s", e)
+            await asyncio.sleep(refresh_seconds)
+
+    def start(self, refresh_seconds: float = settings.ORDER_COUNTERS_REFRESH_SECONDS) -> None:
+        """Iniciar o job periódico que recarrega a memória a partir do documento"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(refresh_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+order_counters = OrderStatusCounters()
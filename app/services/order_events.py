@@ -0,0 +1,138 @@
+from collections import deque
+from typing import Any, Literal, Optional
+from pydantic import BaseModel
+from datetime import datetime
+from app.core.settings import settings
+from app.domain.order_entities import Order, OrderStatus
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+EventType = Literal["order_created", "order_status_changed"]
+
+class OrderEvent(BaseModel):
+    seq: int
+    type: EventType
+    order_id: str
+    status: OrderStatus
+    previous_status: Optional[OrderStatus] = None
+    at: datetime
+    order: dict
+
+class FeedControl(BaseModel):
+    """Mensagem de controle enviada ao assinante (não é um evento de pedido)"""
+    type: Literal["lagged", "resync"]
+    last_seq: int
+    detail: str
+
+class Subscription:
+    """Fila limitada de um assinante do feed da cozinha"""
+
+    def __init__(self, broker: "OrderEventBroker", queue_size: int):
+        self.broker = broker
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def _offer(self, item: Any) -> bool:
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def _close_with(self, control: FeedControl) -> None:
+        # Esvaziar a fila para garantir espaço à mensagem de controle
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(control)
+        self.closed = True
+
+    async def get(self, timeout: Optional[float] = None):
+        """Próximo OrderEvent/FeedControl, ou None se o timeout expirar"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+class OrderEventBroker:
+    """Broker em processo para eventos de pedidos (KDS).
+
+    Cada assinante tem uma fila limitada; um assinante que não acompanha o
+    ritmo é desconectado com uma mensagem ``lagged`` em vez de bloquear a
+    publicação. Os últimos ``history_size`` eventos ficam guardados para que
+    o cliente retome a partir da última sequência recebida.
+
+    O broker é local ao processo: com vários workers, todas as escritas de
+    pedidos e as telas da cozinha precisam passar pelo mesmo worker.
+    """
+
+    def __init__(self, queue_size: int = 100, history_size: int = 1000):
+        self.queue_size = queue_size
+        self.seq = 0
+        self.history: deque[OrderEvent] = deque(maxlen=history_size)
+        self.subscribers: set[Subscription] = set()
+
+    def publish(
+        self,
+        type: EventType,
+        order: Order,
+        previous_status: Optional[OrderStatus] = None
+    ) -> OrderEvent:
+        self.seq += 1
+        event = OrderEvent(
+            seq=self.seq,
+            type=type,
+            order_id=order.id,
+            status=order.status,
+            previous_status=previous_status,
+            at=datetime.utcnow(),
+            order=order.model_dump(mode="json"),
+        )
+        self.history.append(event)
+        for sub in list(self.subscribers):
+            if not sub._offer(event):
+                logger.warning("Assinante do feed lento desconectado na sequência %s", event.seq)
+                self.subscribers.discard(sub)
+                sub._close_with(FeedControl(
+                    type="lagged",
+                    last_seq=event.seq,
+                    detail="Fila cheia; reconecte informando a última sequência processada",
+                ))
+        return event
+
+    def subscribe(self, since: Optional[int] = None) -> Subscription:
+        """Registrar um assinante, reenviando os eventos após ``since``.
+
+        ``since`` acima da sequência atual indica que o worker reiniciou (a
+        sequência voltou a zero): o cliente precisa recarregar, senão
+        descartaria os novos eventos como repetidos.
+        """
+        sub = Subscription(self, self.queue_size)
+        if since is not None and since != self.seq:
+            oldest = self.history[0].seq if self.history else self.seq + 1
+            missed = self.seq - since
+            if since > self.seq or since + 1 < oldest or missed > self.queue_size:
+                sub._close_with(FeedControl(
+                    type="resync",
+                    last_seq=self.seq,
+                    detail="Eventos fora do histórico; recarregue os pedidos e reconecte",
+                ))
+                return sub
+            for event in self.history:
+                if event.seq > since:
+                    sub._offer(event)
+        self.subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self.subscribers.discard(sub)
+        sub.closed = True
+
+order_events = OrderEventBroker(
+    queue_size=settings.KDS_QUEUE_SIZE,
+    history_size=settings.KDS_HISTORY_SIZE,
+)
@@ -0,0 +1,89 @@
+from typing import AsyncIterator, Iterable
+from datetime import datetime
+import csv
+import io
+import json
+import zlib
+
+CSV_COLUMNS = [
+    "id", "created_at", "updated_at", "status",
+    "customer_name", "customer_phone", "customer_address",
+    "delivery_type", "payment_method", "total_price",
+    "items_count", "items", "notes",
+]
+
+def _json_default(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return str(v)
+
+def _ndjson_rows(docs: Iterable[dict]) -> str:
+    lines = []
+    for doc in docs:
+        doc.pop("_id", None)
+        lines.append(json.dumps(doc, default=_json_default, ensure_ascii=False))
+    return "\n".join(lines) + "\n"
+
+def _csv_rows(docs: Iterable[dict], header: bool) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for doc in docs:
+        items = doc.get("items") or []
+        writer.writerow([
+            doc.get("id", doc.get("_id")),
+            _json_default(doc.get("created_at")),
+            _json_default(doc.get("updated_at")),
+            doc.get("status"),
+            doc.get("customer_name"),
+            doc.get("customer_phone"),
+            doc.get("customer_address") or "",
+            doc.get("delivery_type"),
+            doc.get("payment_method"),
+            doc.get("total_price"),
+            sum(i.get("quantity", 0) for i in items),
+            ";".join(f"{i.get('product_id')}x{i.get('quantity')}" for i in items),
+            doc.get("notes") or "",
+        ])
+    return buf.getvalue()
+
+async def stream_orders(
+    docs: AsyncIterator[dict],
+    fmt: str = "ndjson",
+    gzip: bool = False,
+    chunk_size: int = 500
+) -> AsyncIterator[bytes]:
+    """Serializar documentos de pedidos em blocos de ``chunk_size`` linhas.
+
+    Apenas um bloco fica em memória por vez; com ``gzip`` a compressão é
+    incremental (um único membro gzip para todo o arquivo).
+    """
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if gzip else None
+    header = True
+    batch: list[dict] = []
+
+    def encode(rows: list[dict]) -> bytes:
+        nonlocal header
+        if fmt == "csv":
+            text = _csv_rows(rows, header)
+            header = False
+        else:
+            text = _ndjson_rows(rows)
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor else data
+
+    async for doc in docs:
+        batch.append(doc)
+        if len(batch) >= chunk_size:
+            chunk = encode(batch)
+            batch = []
+            if chunk:
+                yield chunk
+
+    if batch or (fmt == "csv" and header):
+        chunk = encode(batch)
+        if chunk:
+            yield chunk
+    if compressor:
+        yield compressor.flush()
@@ -1,26 +1,131 @@
-from app.domain.order_entities import Order, OrderStatus
-from app.infra.repos import OrderRepo
+from app.domain.order_entities import Order, OrderStatus, InvalidTransitionError, OrderNotFoundError
+from app.infra.repos import INVALID, OrderRepo
+from app.infra.pagination import ORDER_SORT, validate_cursor
+from app.services.order_events import OrderEventBroker
+from app.services.analytics_service import RollupService
+from app.services.order_counters import OrderStatusCounters
+from app.services.pricing_service import PricingService
+from collections import Counter
 from datetime import datetime
+from typing import AsyncIterator, Optional
+import logging
+
+logger = logging.getLogger(__name__)
 
 class OrderService:
-    def __init__(self, repo: OrderRepo):
+    def __init__(
+        self,
+        repo: OrderRepo,
+        events: Optional[OrderEventBroker] = None,
+        rollups: Optional[RollupService] = None,
+        counters: Optional[OrderStatusCounters] = None,
+        pricing: Optional[PricingService] = None
+    ):
         self.repo = repo
+        self.events = events
+        self.rollups = rollups
+        self.counters = counters
+        self.pricing = pricing
+
+    async def _update_counters(self, deltas: dict[OrderStatus, int]) -> None:
+        # Como nos rollups: o desvio é corrigido por scripts/reconcile_order_counters.py
+        if not self.counters or not deltas:
+            return
+        try:
+            await self.counters.apply(deltas)
+        except Exception as e:
+            logger.error("Falha ao atualizar contadores de pedidos: %s", e)
+
+    async def _update_rollups(self, created: list[Order] = (), cancelled: Optional[Order] = None) -> None:
+        # O pedido já foi gravado: uma falha aqui não desfaz a escrita, apenas
+        # deixa o rollup defasado até o próximo backfill
+        if not self.rollups:
+            return
+        try:
+            if created:
+                await self.rollups.record_created(created)
+            if cancelled is not None:
+                await self.rollups.record_cancelled(cancelled)
+        except Exception as e:
+            logger.error("Falha ao atualizar rollups de vendas: %s", e)
 
     async def create(self, o: Order) -> Order:
-        exists = await self.repo.by_id(o.id)
-        if exists:
-            raise ValueError("Pedido já existe")
+        """Criar pedido com um único insert (DuplicateError se o ID já existir).
+
+        Com ``pricing`` configurado, preços e total são conferidos com o
+        cardápio antes da gravação (PricingError se não conferirem).
+        """
+        if self.pricing:
+            await self.pricing.price(o)
         o.created_at = datetime.utcnow()
-        o.updated_at = datetime.utcnow()
-        await self.repo.save(o)
+        o.updated_at = o.created_at
+        await self.repo.insert(o)
+        await self._update_counters({o.status: 1})
+        await self._update_rollups(created=[o])
+        if self.events:
+            self.events.publish("order_created", o)
         return o
 
-    async def list_by_status(self, status: OrderStatus) -> list[Order]:
-        return await self.repo.list_by_status(status)
+    async def create_many(self, orders: list[Order]) -> dict[int, tuple[str, str]]:
+        """Criar pedidos em lote com uma única escrita; retorna as falhas por índice"""
+        failures: dict[int, tuple[str, str]] = {}
+        if self.pricing:
+            errors = await self.pricing.price_many(orders)
+            failures.update({idx: (INVALID, msg) for idx, msg in errors.items()})
+        positions = [idx for idx in range(len(orders)) if idx not in failures]
+        valid = [orders[idx] for idx in positions]
+
+        now = datetime.utcnow()
+        for o in valid:
+            o.created_at = now
+            o.updated_at = now
+        written = await self.repo.insert_many(valid) if valid else {}
+        failures.update({positions[pos]: failure for pos, failure in written.items()})
 
-    async def list_all(self) -> list[Order]:
-        return await self.repo.list_all()
+        created = [o for pos, o in enumerate(valid) if pos not in written]
+        await self._update_counters(dict(Counter(o.status for o in created)))
+        await self._update_rollups(created=created)
+        if self.events:
+            for o in created:
+                self.events.publish("order_created", o)
+        return failures
+
+    async def list_by_status(
+        self,
+        status: OrderStatus,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> list[Order]:
+        validate_cursor(cursor, ORDER_SORT)
+        return await self.repo.list_by_status(status, limit=limit, cursor=cursor)
+
+    async def list_all(self, limit: int = 10, cursor: Optional[str] = None) -> list[Order]:
+        validate_cursor(cursor, ORDER_SORT)
+        return await self.repo.list_all(limit=limit, cursor=cursor)
+
+    def export(self, start: datetime, end: datetime, batch_size: int = 500) -> AsyncIterator[dict]:
+        """Documentos de pedidos criados no intervalo, para exportação"""
+        return self.repo.iter_created_between(start, end, batch_size=batch_size)
 
     async def update_status(self, oid: str, status: OrderStatus) -> Order:
-        await self.repo.update_status(oid, status)
-        return await self.repo.by_id(oid)
\ No newline at end of file
+        """Aplicar uma transição de status em um único round-trip.
+
+        Só quando nada é atualizado o pedido é lido, para distinguir pedido
+        inexistente (OrderNotFoundError) de transição não permitida
+        (InvalidTransitionError).
+        """
+        result = await self.repo.transition_status(oid, status)
+        if result is None:
+            current = await self.repo.by_id(oid)
+            if current is None:
+                raise OrderNotFoundError(f"Pedido {oid} não encontrado")
+            raise InvalidTransitionError(
+                f"Transição de '{current.status.value}' para '{status.value}' não permitida"
+            )
+        updated, previous = result
+        await self._update_counters({previous: -1, status: 1})
+        if status == OrderStatus.CANCELADO:
+            await self._update_rollups(cancelled=updated)
+        if self.events:
+            self.events.publish("order_status_changed", updated, previous_status=previous)
+        return updated
\ No newline at end of file
@@ -0,0 +1,84 @@
+from app.domain.entities import Pizza, Product
+from app.domain.order_entities import Order, OrderItem
+from app.infra.repos import ProductRepo
+
+# Tolerância para comparar valores informados pelo cliente (meio centavo)
+PRICE_TOLERANCE = 0.005
+
+class PricingError(ValueError):
+    """Itens ou valores do pedido não conferem com o cardápio"""
+
+def _cents(value: float) -> int:
+    return round(value * 100)
+
+class PricingService:
+    """Precificação do pedido no servidor a partir do cardápio.
+
+    Todos os produtos dos pedidos são resolvidos com um único ``by_ids``
+    (uma consulta ``$in``, ou nenhuma se o cache de produtos estiver quente).
+    Cada item recebe o preço unitário do cardápio (pizzas pelo ``size_cm``)
+    e o nome cadastrado; preço de item ou total informados pelo cliente que
+    divergem do calculado são rejeitados.
+    """
+
+    def __init__(self, products: ProductRepo):
+        self.products = products
+
+    @staticmethod
+    def _unit_price(item: OrderItem, product: Product) -> float:
+        if isinstance(product, Pizza):
+            if item.size_cm is None:
+                raise PricingError(f"Informe o tamanho (size_cm) da pizza {product.id}")
+            for size in product.sizes:
+                if size.size_cm == item.size_cm:
+                    return size.price
+            available = ", ".join(str(s.size_cm) for s in product.sizes)
+            raise PricingError(
+                f"Tamanho {item.size_cm}cm indisponível para {product.id} (disponíveis: {available})"
+            )
+        if item.size_cm is not None:
+            raise PricingError(f"Produto {product.id} não tem tamanhos")
+        return product.price
+
+    def _price(self, order: Order, products: dict[str, Product]) -> None:
+        total_cents = 0
+        items = []
+        for idx, item in enumerate(order.items):
+            product = products.get(item.product_id)
+            if product is None or not product.active:
+                raise PricingError(f"items.{idx}: produto {item.product_id} não encontrado ou inativo")
+            if item.quantity < 1:
+                raise PricingError(f"items.{idx}: quantidade deve ser positiva")
+            try:
+                unit = self._unit_price(item, product)
+            except PricingError as e:
+                raise PricingError(f"items.{idx}: {e}")
+            if abs(item.price - unit) > PRICE_TOLERANCE:
+                raise PricingError(
+                    f"items.{idx}: preço informado {item.price:.2f} difere do cardápio {unit:.2f}"
+                )
+            total_cents += _cents(unit) * item.quantity
+            items.append(item.model_copy(update={"price": unit, "name": product.name}))
+
+        total = total_cents / 100
+        if abs(order.total_price - total) > PRICE_TOLERANCE:
+            raise PricingError(f"Total informado {order.total_price:.2f} difere do calculado {total:.2f}")
+        order.items = items
+        order.total_price = total
+
+    async def price(self, order: Order) -> Order:
+        """Precificar um pedido (PricingError se algo não conferir)"""
+        products = await self.products.by_ids([i.product_id for i in order.items])
+        self._price(order, products)
+        return order
+
+    async def price_many(self, orders: list[Order]) -> dict[int, str]:
+        """Precificar um lote com uma única busca; retorna os erros por índice"""
+        products = await self.products.by_ids([i.product_id for o in orders for i in o.items])
+        errors: dict[int, str] = {}
+        for idx, order in enumerate(orders):
+            try:
+                self._price(order, products)
+            except PricingError as e:
+                errors[idx] = str(e)
+        return errors
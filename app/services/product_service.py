@@ -1,16 +1,167 @@
-from app.domain.entities import Product, ProductCategory
-from app.infra.repos import ProductRepo
+from app.core.settings import settings
+from app.domain.entities import Product, ProductCategory, Pizza
+from app.infra.repos import CounterRepo, ProductRepo
+from app.infra.pagination import PRODUCT_SORT, product_cursor, validate_cursor
+from app.infra.search import MenuSearchIndex, tokenize
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, Callable, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RejectedRow(BaseModel):
+    index: int
+    id: Optional[str] = None
+    error: str
+
+class CatalogImportReport(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    rejected: list[RejectedRow] = Field(default_factory=list)
+
+def parse_catalog_payload(raw: bytes) -> list[Any]:
+    """Ler um cardápio em JSON (lista) ou NDJSON (um objeto por linha).
+
+    Linhas NDJSON malformadas são mantidas como texto para serem rejeitadas
+    individualmente na importação, sem invalidar o arquivo inteiro.
+    """
+    text = raw.decode("utf-8-sig").strip()
+    if text.startswith("["):
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError("JSON deve ser uma lista de produtos")
+        return rows
+    rows = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            rows.append(line)
+    return rows
+
+def product_from_row(row: Any) -> Product:
+    """Validar uma linha de importação (formato ProductIn ou PizzaIn)"""
+    if not isinstance(row, dict):
+        raise ValueError("Linha deve ser um objeto JSON válido")
+    if not str(row.get("id") or "").strip():
+        raise ValueError("ID do produto é obrigatório")
+    category = row.get("category", ProductCategory.PIZZA.value if "sizes" in row else None)
+    if category == ProductCategory.PIZZA.value:
+        if not row.get("sizes"):
+            raise ValueError("Pizza deve ter pelo menos um tamanho")
+        return Pizza.model_validate({**row, "category": category})
+    return Product.model_validate(row)
+
+MAX_BATCH_IDS = 100
+
+CATALOG_COUNTER = "catalog"
+
+class CatalogVersion:
+    """Versão do cardápio em memória, incrementada a cada escrita no catálogo.
+
+    Faz parte da chave das ETags em cache: uma escrita neste processo
+    invalida imediatamente as respostas condicionais já calculadas.
+
+    Com um ``CounterRepo`` (``bind``), cada escrita também incrementa o
+    documento ``counters/catalog``, compartilhado entre workers, e o job de
+    ``start`` relê esse documento a cada ``refresh_seconds``. Quando outro
+    worker escreveu, a versão local é incrementada e os callbacks de
+    ``subscribe`` descartam os caches do catálogo deste processo. As
+    escritas do próprio worker também são vistas pelo job, o que só causa
+    uma invalidação a mais.
+    """
+
+    def __init__(self, repo: Optional[CounterRepo] = None):
+        self.value = 0
+        self.repo = repo
+        self.shared: Optional[int] = None
+        self._listeners: list[Callable[[], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def bind(self, repo: CounterRepo) -> None:
+        self.repo = repo
+
+    def subscribe(self, fn: Callable[[], Any]) -> None:
+        """Chamar ``fn`` quando outro worker alterar o catálogo"""
+        self._listeners.append(fn)
+
+    def bump(self) -> int:
+        self.value += 1
+        return self.value
+
+    async def publish(self) -> None:
+        """Avisar os outros workers de uma escrita feita aqui"""
+        if self.repo is not None:
+            await self.repo.increment(CATALOG_COUNTER, {"version": 1})
+
+    async def refresh(self) -> bool:
+        """Reler a versão compartilhada; True se mudou desde a última leitura"""
+        if self.repo is None:
+            return False
+        shared = int((await self.repo.get(CATALOG_COUNTER)).get("version", 0))
+        changed = self.shared is not None and shared != self.shared
+        self.shared = shared
+        if changed:
+            self.bump()
+            for fn in self._listeners:
+                fn()
+        return changed
+
+    async def _run(self, refresh_seconds: float) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error("Falha ao ler a versão do catálogo: %s", e)
+            await asyncio.sleep(refresh_seconds)
+
+    def start(self, refresh_seconds: float = settings.CATALOG_VERSION_REFRESH_SECONDS) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(refresh_seconds))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+catalog_version = CatalogVersion()
+
+MAX_SEARCH_RESULTS = 50
 
 class ProductService:
-    def __init__(self, repo: ProductRepo):
+    def __init__(
+        self,
+        repo: ProductRepo,
+        catalog: Optional[CatalogVersion] = None,
+        index: Optional[MenuSearchIndex] = None
+    ):
         self.repo = repo
+        self.catalog = catalog or CatalogVersion()
+        self.index = index
+
+    async def _written(self, *products: Product) -> None:
+        self.catalog.bump()
+        if self.index is not None:
+            for p in products:
+                self.index.upsert(p)
+        try:
+            await self.catalog.publish()
+        except Exception as e:
+            # A escrita já foi feita: os outros workers a veem pelo TTL dos caches
+            logger.error("Falha ao publicar a versão do catálogo: %s", e)
 
     async def create(self, p: Product) -> Product:
-        """Criar um novo produto com validações"""
-        exists = await self.repo.by_id(p.id)
-        if exists:
-            raise ValueError("Produto já existe")
-        
+        """Criar um novo produto com validações (DuplicateError se o ID já existir)"""
         # Validações de negócio
         if p.price <= 0:
             raise ValueError("Preço deve ser positivo")
@@ -19,25 +170,34 @@ class ProductService:
             if not p.sizes or len(p.sizes) == 0:
                 raise ValueError("Pizza deve ter pelo menos um tamanho")
         
-        await self.repo.save(p)
+        await self.repo.insert(p)
+        await self._written(p)
         return p
 
-    async def list_active(self, skip: int = 0, limit: int = 10) -> list[Product]:
-        """Listar todos os produtos ativos com paginação"""
+    async def list_active(
+        self,
+        skip: int = 0,
+        limit: int = 10,
+        cursor: Optional[str] = None
+    ) -> list[Product]:
+        """Listar todos os produtos ativos com paginação (skip ou cursor)"""
         if skip < 0 or limit < 1 or limit > 100:
             raise ValueError("Parâmetros de paginação inválidos")
-        return await self.repo.list_active(skip=skip, limit=limit)
+        validate_cursor(cursor, PRODUCT_SORT, skip)
+        return await self.repo.list_active(skip=skip, limit=limit, cursor=cursor)
 
     async def list_by_category(
         self,
         category: ProductCategory,
         skip: int = 0,
-        limit: int = 10
+        limit: int = 10,
+        cursor: Optional[str] = None
     ) -> list[Product]:
-        """Listar produtos por categoria com paginação"""
+        """Listar produtos por categoria com paginação (skip ou cursor)"""
         if skip < 0 or limit < 1 or limit > 100:
             raise ValueError("Parâmetros de paginação inválidos")
-        return await self.repo.list_by_category(category, skip=skip, limit=limit)
+        validate_cursor(cursor, PRODUCT_SORT, skip)
+        return await self.repo.list_by_category(category, skip=skip, limit=limit, cursor=cursor)
 
     async def get_by_id(self, product_id: str) -> Product:
         """Obter um produto pelo ID"""
@@ -48,9 +208,47 @@ class ProductService:
             raise ValueError(f"Produto {product_id} não encontrado")
         return product
 
+    async def get_many(self, product_ids: list[str]) -> dict[str, Product]:
+        """Obter vários produtos em uma consulta, na ordem dos IDs (ausentes ficam de fora)"""
+        if not product_ids or len(product_ids) > MAX_BATCH_IDS:
+            raise ValueError(f"Informe de 1 a {MAX_BATCH_IDS} IDs")
+        return await self.repo.by_ids(product_ids)
+
+    async def search(self, query: str, limit: int = 10) -> list[Product]:
+        """Buscar no cardápio pelo índice em memória (tolera acentos e erros de digitação).
+
+        O banco só é lido quando o índice está vazio ou vencido.
+        """
+        if self.index is None:
+            raise ValueError("Busca no cardápio indisponível")
+        if not tokenize(query):
+            raise ValueError("Informe um termo de busca")
+        if limit < 1 or limit > MAX_SEARCH_RESULTS:
+            raise ValueError(f"limit deve estar entre 1 e {MAX_SEARCH_RESULTS}")
+        if self.index.stale():
+            async with self.index.lock:
+                if self.index.stale():
+                    version = self.catalog.value
+                    self.index.rebuild(await self._all_active())
+                    if self.catalog.value != version:
+                        # Escrita durante a carga: a lista lida pode não refleti-la
+                        self.index.expire()
+        return self.index.search(query, limit=limit)
+
+    async def _all_active(self) -> list[Product]:
+        items: list[Product] = []
+        cursor = None
+        while True:
+            page = await self.repo.list_active(limit=100, cursor=cursor)
+            items.extend(page)
+            if len(page) < 100:
+                return items
+            cursor = product_cursor(page[-1])
+
     async def update(self, product_id: str, data: dict) -> Product:
         """Atualizar um produto"""
-        product = await self.get_by_id(product_id)
+        # Trabalhar sobre uma cópia: a instância lida pode estar no cache
+        product = (await self.get_by_id(product_id)).model_copy()
         
         # Validar preço se estiver sendo atualizado
         if 'price' in data and data['price'] <= 0:
@@ -62,11 +260,45 @@ class ProductService:
                 setattr(product, key, value)
         
         await self.repo.save(product)
+        await self._written(product)
         return product
 
     async def deactivate(self, product_id: str) -> Product:
         """Desativar um produto (soft delete)"""
-        product = await self.get_by_id(product_id)
-        product.active = False
+        product = (await self.get_by_id(product_id)).model_copy(update={"active": False})
         await self.repo.save(product)
-        return product
\ No newline at end of file
+        await self._written(product)
+        return product
+
+    async def import_products(self, rows: list[Any], dry_run: bool = False) -> CatalogImportReport:
+        """Validar todas as linhas e gravar as válidas em um único lote.
+
+        Com ``dry_run`` apenas valida: as contagens de gravação ficam zeradas.
+        """
+        report = CatalogImportReport()
+        valid: dict[str, Product] = {}
+        for idx, row in enumerate(rows):
+            row_id = str(row["id"]) if isinstance(row, dict) and row.get("id") is not None else None
+            try:
+                product = product_from_row(row)
+                if product.id in valid:
+                    raise ValueError(f"ID {product.id} repetido no arquivo")
+            except ValidationError as e:
+                error = "; ".join(
+                    f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                )
+                report.rejected.append(RejectedRow(index=idx, id=row_id, error=error))
+                continue
+            except ValueError as e:
+                report.rejected.append(RejectedRow(index=idx, id=row_id, error=str(e)))
+                continue
+            valid[product.id] = product
+
+        if valid and not dry_run:
+            counts = await self.repo.bulk_upsert(list(valid.values()))
+            report.inserted = counts["inserted"]
+            report.updated = counts["updated"]
+            report.unchanged = counts["unchanged"]
+            if report.inserted or report.updated:
+                await self._written(*valid.values())
+        return report
@@ -0,0 +1,50 @@
+"""
+Script para reconstruir os rollups de vendas a partir dos pedidos
+Execute com: python scripts/backfill_rollups.py --start 2025-11-01 [--end 2025-11-30]
+
+Lê os pedidos do intervalo (dias no fuso ANALYTICS_TIMEZONE) em lotes, em
+ordem cronológica, e substitui os documentos de sales_rollups de cada dia.
+Dias do intervalo sem pedidos têm o rollup removido. Rode fora do horário de
+pico: pedidos criados durante a reconstrução de um dia podem ficar de fora.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.settings import settings
+from app.infra.repos import MongoOrderRepo, MongoRollupRepo
+from app.services.analytics_service import RollupService
+
+async def run(start: date, end: date, batch_size: int) -> None:
+    client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        db = client[settings.MONGO_DB]
+        svc = RollupService(MongoRollupRepo(db["sales_rollups"]), tz=settings.ANALYTICS_TIMEZONE)
+        lo, hi = svc.day_bounds(start, end)
+        docs = MongoOrderRepo(db["orders"]).iter_created_between(lo, hi, batch_size=batch_size)
+        report = await svc.rebuild(docs, start, end)
+    finally:
+        client.close()
+    print(json.dumps(report.model_dump(), indent=2))
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruir rollups de vendas")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="Primeiro dia (AAAA-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, default=date.today(), help="Último dia (padrão: hoje)")
+    parser.add_argument("--batch-size", type=int, default=500, help="Pedidos por lote do cursor")
+    args = parser.parse_args()
+    if args.start > args.end:
+        parser.error("--start deve ser anterior a --end")
+    asyncio.run(run(args.start, args.end, args.batch_size))
+
+if __name__ == "__main__":
+    main()
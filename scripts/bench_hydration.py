@@ -0,0 +1,99 @@
+"""
+Microbenchmark de hidratação de documentos (validação completa vs confiável)
+Execute com: python scripts/bench_hydration.py [--pages 200]
+
+Mede o custo por linha de converter páginas de 100 documentos do MongoDB
+em Product/Pizza, com e sem revalidação pelo Pydantic. Pedidos são sempre
+validados; a linha "orders" serve de referência.
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+from app.domain.order_entities import Order, OrderItem
+from app.infra.hydration import (
+    order_from_doc, order_to_doc, product_from_doc, product_to_doc,
+)
+
+PAGE_SIZE = 100
+
+def product_page() -> list[dict]:
+    docs = []
+    for i in range(PAGE_SIZE):
+        if i % 2:
+            p = Pizza(
+                id=f"pizza_{i:03d}",
+                name=f"Pizza {i}",
+                category=ProductCategory.PIZZA,
+                description="Molho, queijo e orégano",
+                price=25.0,
+                image_url="https://example.com/pizza.jpg",
+                sizes=[PizzaSize(size_cm=35, price=25.0), PizzaSize(size_cm=45, price=35.0)],
+            )
+        else:
+            p = Product(
+                id=f"bebida_{i:03d}",
+                name=f"Bebida {i}",
+                category=ProductCategory.BEBIDA,
+                price=8.5,
+                image_url="https://example.com/bebida.jpg",
+            )
+        docs.append(product_to_doc(p))
+    return docs
+
+def order_page() -> list[dict]:
+    docs = []
+    for i in range(PAGE_SIZE):
+        o = Order(
+            id=f"ORD-{i:06d}",
+            customer_name="Maria Santos",
+            customer_phone="(11) 99999-8888",
+            customer_address="Av. Principal, 456",
+            items=[
+                OrderItem(product_id="pizza_001", name="Calabresa", quantity=1, price=35.0),
+                OrderItem(product_id="bebida_001", name="Refrigerante", quantity=2, price=8.5),
+                OrderItem(product_id="esfiha_001", name="Esfiha", quantity=4, price=5.0),
+            ],
+            total_price=72.0,
+            created_at=datetime(2025, 11, 11, 18, 30),
+            updated_at=datetime(2025, 11, 11, 18, 30),
+        )
+        docs.append(order_to_doc(o))
+    return docs
+
+def per_row_us(fn, docs: list[dict], pages: int, trusted: bool) -> float:
+    samples = []
+    for _ in range(pages):
+        start = time.perf_counter()
+        for doc in docs:
+            fn(doc, trusted=trusted)
+        samples.append((time.perf_counter() - start) / len(docs) * 1e6)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de hidratação")
+    parser.add_argument("--pages", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = [
+        ("products", product_from_doc, product_page()),
+        ("orders", lambda doc, trusted: order_from_doc(doc), order_page()),
+    ]
+    print(f"Páginas de {PAGE_SIZE} documentos, mediana de {args.pages} páginas\n")
+    print(f"{'collection':<12} {'validado (µs/linha)':>20} {'confiável (µs/linha)':>21} {'ganho':>7}")
+    for name, fn, docs in cases:
+        validated = per_row_us(fn, docs, args.pages, trusted=False)
+        trusted = per_row_us(fn, docs, args.pages, trusted=True)
+        print(f"{name:<12} {validated:>20.2f} {trusted:>21.2f} {validated / trusted:>6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark do custo de logging por requisição (na thread do event loop)
+Execute com: python scripts/bench_logging.py [--requests 20000] [--sink-latency-us 50]
+
+Cada "requisição" faz o que o caminho quente de um pedido faz hoje: um
+``info`` de escrita e dois ``debug`` (descartados pelo nível). Compara:
+
+- sync-fstring: como era antes (StreamHandler síncrono, f-strings)
+- queue: QueueHandler/QueueListener com JSON e mensagens %-style
+- queue-sampled: idem, com o logger de escritas amostrado a 10%
+
+A saída é um arquivo lento (cada write espera ``--sink-latency-us``),
+simulando stdout bloqueado por um pipe/terminal/coletor de logs. Se a saída
+não acompanha, a fila enche e os excedentes são descartados (coluna
+"descartadas") em vez de travar o event loop. Num laço contínuo como este a
+thread de escrita disputa o GIL com o laço, então a coluna "queue" inclui
+parte do custo que, num servidor, acontece enquanto o loop espera I/O.
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.core.logging import dropped_records, setup_logging, shutdown_logging
+
+class SlowSink(io.TextIOBase):
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.lines = 0
+
+    def write(self, s: str) -> int:
+        # sleep solta o GIL, como um write bloqueado em um pipe
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        self.lines += s.count("\n")
+        return len(s)
+
+class Order:
+    id = "ORD-20251110-ABC123"
+    items = list(range(3))
+
+def fstring_request(log, write_log, o):
+    log.debug(f"Listados {len(o.items)} itens do pedido {o.id}")
+    write_log.info(f"Pedido criado: {o.id}")
+    log.debug(f"Cache de produtos invalidado para {o.id} ({len(o.items)} entradas)")
+
+def lazy_request(log, write_log, o):
+    log.debug("Listados %s itens do pedido %s", len(o.items), o.id)
+    write_log.info("Pedido criado: %s", o.id)
+    log.debug("Cache de produtos invalidado para %s (%s entradas)", o.id, len(o.items))
+
+def run(mode: str, n: int, latency_s: float) -> dict:
+    sink = SlowSink(latency_s)
+    root = logging.getLogger()
+    if mode == "sync-fstring":
+        shutdown_logging()
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        request = fstring_request
+    else:
+        sampling = {"app.infra.repos.writes": 0.1} if mode == "queue-sampled" else {}
+        setup_logging(level="INFO", fmt="json", sampling=sampling, stream=sink)
+        request = lazy_request
+
+    log = logging.getLogger("app.infra.repos")
+    write_log = logging.getLogger("app.infra.repos.writes")
+    order = Order()
+    start = time.perf_counter()
+    for _ in range(n):
+        request(log, write_log, order)
+    elapsed = time.perf_counter() - start
+    dropped = dropped_records()
+
+    if mode == "sync-fstring":
+        root.removeHandler(handler)
+    else:
+        shutdown_logging()
+    return {"us_per_request": elapsed / n * 1e6, "written": sink.lines, "dropped": dropped}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de logging por requisição")
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sink-latency-us", type=float, default=50.0, help="Custo de cada write na saída")
+    args = parser.parse_args()
+
+    print(f"{args.requests} requisições, saída com {args.sink_latency_us:.0f}us por write\n")
+    print(f"{'modo':<15} {'us/req':>8} {'linhas':>8} {'descartadas':>12}")
+    for mode in ("sync-fstring", "queue", "queue-sampled"):
+        r = run(mode, args.requests, args.sink_latency_us / 1e6)
+        print(f"{mode:<15} {r['us_per_request']:>8.2f} {r['written']:>8} {r['dropped']:>12}")
+
+if __name__ == "__main__":
+    main()
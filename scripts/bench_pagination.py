@@ -0,0 +1,150 @@
+"""
+Benchmark de paginação: skip/limit vs cursor (keyset)
+Execute com: python scripts/bench_pagination.py [--orders 1000000] [--mongo-uri mongodb://localhost:27017]
+
+Sem --mongo-uri usa um stand-in em memória: uma lista ordenada por
+(created_at desc, _id desc) que faz o papel do índice. O skip percorre as
+entradas descartadas (como o servidor faz ao pular chaves do índice) e o
+cursor localiza a posição por busca binária (como um seek no B-tree).
+"""
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from app.infra.pagination import ORDER_SORT, decode_cursor, encode_cursor
+
+PAGE_SIZE = 20
+DEPTHS = [0, 1_000, 10_000, 100_000, 500_000, 990_000]
+
+def _timeit(fn, repeat: int = 5) -> float:
+    """Mediana em milissegundos"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+class InMemoryOrderIndex:
+    """Índice {created_at: -1, _id: -1} simulado com uma lista ordenada"""
+
+    def __init__(self, n: int):
+        base = datetime(2025, 1, 1)
+        # Chaves negadas para manter a lista em ordem crescente
+        self.keys = [(-(i // 3), -i) for i in range(n)]
+        self.keys.sort()
+        self.base = base
+
+    def _to_doc(self, key):
+        seconds, oid = -key[0], -key[1]
+        return {"_id": f"ORD-{oid:08d}", "created_at": self.base + timedelta(seconds=seconds)}
+
+    def page_skip(self, skip: int, limit: int) -> list:
+        return [self._to_doc(k) for k in itertools.islice(self.keys, skip, skip + limit)]
+
+    def page_cursor(self, cursor: str, limit: int) -> list:
+        created_at, oid = decode_cursor(cursor, len(ORDER_SORT))
+        key = (-int((created_at - self.base).total_seconds()), -int(oid[4:]))
+        pos = bisect.bisect_right(self.keys, key)
+        return [self._to_doc(k) for k in self.keys[pos:pos + limit]]
+
+    def cursor_at(self, depth: int) -> str:
+        doc = self._to_doc(self.keys[depth - 1])
+        return encode_cursor(doc["created_at"], doc["_id"])
+
+def bench_memory(n: int) -> list[dict]:
+    print(f"Gerando {n:,} pedidos em memória...")
+    index = InMemoryOrderIndex(n)
+    rows = []
+    for depth in [d for d in DEPTHS if d < n]:
+        skip_ms = _timeit(lambda: index.page_skip(depth, PAGE_SIZE))
+        if depth:
+            cursor = index.cursor_at(depth)
+            assert index.page_cursor(cursor, PAGE_SIZE) == index.page_skip(depth, PAGE_SIZE)
+            cursor_ms = _timeit(lambda: index.page_cursor(cursor, PAGE_SIZE))
+        else:
+            cursor_ms = skip_ms
+        rows.append({"depth": depth, "skip_ms": skip_ms, "cursor_ms": cursor_ms})
+    return rows
+
+async def bench_mongo(uri: str, n: int) -> list[dict]:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from app.infra.repos import MongoOrderRepo
+    from app.infra.pagination import order_cursor
+
+    client = AsyncIOMotorClient(uri)
+    col = client["veneto_bench"]["orders"]
+    if await col.estimated_document_count() != n:
+        print(f"Populando veneto_bench.orders com {n:,} pedidos...")
+        await col.drop()
+        base = datetime(2025, 1, 1)
+        batch = []
+        for i in range(n):
+            batch.append({
+                "_id": f"ORD-{i:08d}",
+                "customer_name": "Bench",
+                "customer_phone": "0",
+                "items": [{"product_id": "p", "name": "p", "quantity": 1, "price": 1.0}],
+                "total_price": 1.0,
+                "status": "recebido",
+                "created_at": base + timedelta(seconds=i // 3),
+                "updated_at": base,
+            })
+            if len(batch) == 10_000:
+                await col.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await col.insert_many(batch, ordered=False)
+        await col.create_index([("created_at", -1), ("_id", -1)])
+
+    repo = MongoOrderRepo(col)
+
+    async def atimeit(coro_fn, repeat: int = 5) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await coro_fn()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
+
+    rows = []
+    for depth in [d for d in DEPTHS if d < n]:
+        skip_ms = await atimeit(lambda: repo.list_all(skip=depth, limit=PAGE_SIZE))
+        if depth:
+            prev = await repo.list_all(skip=depth - 1, limit=1)
+            cursor = order_cursor(prev[0])
+            cursor_ms = await atimeit(lambda: repo.list_all(limit=PAGE_SIZE, cursor=cursor))
+        else:
+            cursor_ms = skip_ms
+        rows.append({"depth": depth, "skip_ms": skip_ms, "cursor_ms": cursor_ms})
+    client.close()
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--mongo-uri", default=None, help="Usar um MongoDB local em vez do stand-in")
+    args = parser.parse_args()
+
+    if args.mongo_uri:
+        rows = asyncio.run(bench_mongo(args.mongo_uri, args.orders))
+    else:
+        rows = bench_memory(args.orders)
+
+    print(f"\n{'profundidade':>14} {'skip (ms)':>12} {'cursor (ms)':>12}")
+    for r in rows:
+        print(f"{r['depth']:>14,} {r['skip_ms']:>12.3f} {r['cursor_ms']:>12.3f}")
+
+if __name__ == "__main__":
+    main()
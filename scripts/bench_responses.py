@@ -0,0 +1,107 @@
+"""
+Benchmark de serialização de respostas (GET /products com 100 itens)
+Execute com: python scripts/bench_responses.py [--requests 2000]
+
+Compara o caminho antigo (model_dump -> ProductOut -> validação e
+serialização pelo response_model) com o atual (objetos de domínio
+serializados uma vez por um TypeAdapter em cache). O repositório é um
+stub em memória, então o resultado isola o custo da camada HTTP.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from fastapi import FastAPI, Query
+from httpx import ASGITransport, AsyncClient
+
+from app.api.deps import get_product_service
+from app.api.routers import products
+from app.api.routers.products import ProductOut
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+from app.services.product_service import ProductService
+
+PAGE_SIZE = 100
+
+def catalog() -> list[Product]:
+    items = []
+    for i in range(PAGE_SIZE):
+        if i % 2:
+            items.append(Pizza(
+                id=f"pizza_{i:03d}",
+                name=f"Pizza {i}",
+                category=ProductCategory.PIZZA,
+                description="Molho, queijo e orégano",
+                price=25.0,
+                image_url="https://example.com/pizza.jpg",
+                sizes=[PizzaSize(size_cm=35, price=25.0), PizzaSize(size_cm=45, price=35.0)],
+            ))
+        else:
+            items.append(Product(
+                id=f"bebida_{i:03d}",
+                name=f"Bebida {i}",
+                category=ProductCategory.BEBIDA,
+                price=8.5,
+                image_url="https://example.com/bebida.jpg",
+            ))
+    return items
+
+class StubRepo:
+    def __init__(self, items: list[Product]):
+        self.items = items
+
+    async def list_active(self, skip: int = 0, limit: int = 10, cursor=None):
+        return self.items[:limit]
+
+def legacy_app(svc: ProductService) -> FastAPI:
+    """Handler como era antes: três conversões por item"""
+    app = FastAPI()
+
+    @app.get("/products", response_model=list[ProductOut])
+    async def list_products(limit: int = Query(10, ge=1, le=100)):
+        items = await svc.list_active(limit=limit)
+        return [ProductOut(**i.model_dump()) for i in items]
+
+    return app
+
+def current_app(svc: ProductService) -> FastAPI:
+    from app.api.responses import ORJSONResponse
+
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(products.router)
+    app.dependency_overrides[get_product_service] = lambda: svc
+    return app
+
+async def requests_per_second(app: FastAPI, n: int) -> tuple[float, int]:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as ac:
+        r = await ac.get(f"/products?limit={PAGE_SIZE}")
+        assert r.status_code == 200 and len(r.json()) == PAGE_SIZE
+        start = time.perf_counter()
+        for _ in range(n):
+            await ac.get(f"/products?limit={PAGE_SIZE}")
+        elapsed = time.perf_counter() - start
+    return n / elapsed, len(r.content)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialização de respostas")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    svc = ProductService(StubRepo(catalog()))
+    before, size_before = await requests_per_second(legacy_app(svc), args.requests)
+    after, size_after = await requests_per_second(current_app(svc), args.requests)
+
+    print(f"GET /products?limit={PAGE_SIZE}, {args.requests} requisições sequenciais\n")
+    print(f"{'caminho':<10} {'req/s':>10} {'bytes':>8}")
+    print(f"{'antes':<10} {before:>10.0f} {size_before:>8}")
+    print(f"{'depois':<10} {after:>10.0f} {size_after:>8}")
+    print(f"\nGanho: {after / before:.2f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,42 @@
+"""
+Script para verificar/criar os índices declarados em app/infra/indexes.py
+Execute com: python scripts/ensure_indexes.py [--dry-run]
+
+Com --dry-run apenas reporta índices ausentes, extras e em conflito, sem
+alterar o banco. Retorna código de saída 1 se algo precisar de atenção.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.settings import settings
+from app.infra.indexes import ensure_indexes
+
+async def run(dry_run: bool) -> int:
+    client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        report = await ensure_indexes(client[settings.MONGO_DB], dry_run=dry_run)
+    finally:
+        client.close()
+
+    print(json.dumps(report.model_dump(), indent=2, ensure_ascii=False))
+    if dry_run:
+        return 0 if report.ok and not report.missing else 1
+    return 0 if report.ok else 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerenciar índices do MongoDB")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas reportar, sem criar índices")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.dry_run)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Script para importar o cardápio em lote (JSON ou NDJSON)
+Execute com: python scripts/import_catalog.py cardapio.ndjson [--dry-run]
+
+Cada linha segue o formato de ProductIn/PizzaIn (pizzas são reconhecidas
+pela categoria "pizza" ou pelo campo "sizes"). As linhas válidas são
+gravadas com um único bulk_write de upserts; use "-" para ler do stdin.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.settings import settings
+from app.infra.repos import MongoProductRepo
+from app.services.product_service import ProductService, parse_catalog_payload
+
+async def run(path: str, dry_run: bool) -> int:
+    raw = sys.stdin.buffer.read() if path == "-" else Path(path).read_bytes()
+    rows = parse_catalog_payload(raw)
+
+    client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        svc = ProductService(MongoProductRepo(client[settings.MONGO_DB]["products"]))
+        report = await svc.import_products(rows, dry_run=dry_run)
+    finally:
+        client.close()
+
+    print(json.dumps(report.model_dump(), indent=2, ensure_ascii=False))
+    print(
+        f"\n{len(rows)} linhas: {report.inserted} inseridas, {report.updated} atualizadas, "
+        f"{report.unchanged} sem alteração, {len(report.rejected)} rejeitadas",
+        file=sys.stderr,
+    )
+    return 1 if report.rejected else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar cardápio em lote")
+    parser.add_argument("path", help="Arquivo JSON/NDJSON ou '-' para stdin")
+    parser.add_argument("--dry-run", action="store_true", help="Apenas validar, sem gravar")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.path, args.dry_run)))
+
+if __name__ == "__main__":
+    main()
@@ -153,25 +153,22 @@ console.log("✅ Collection 'orders' criada\n");
 
 console.log("🔍 Criando índices...\n");
 
-// Índices para products
-console.log("  • Índice: products (category, active)");
-db.products.createIndex({ "category": 1, "active": 1 });
+// Índices para products (mantidos em sincronia com app/infra/indexes.py)
+console.log("  • Índice: products (category, active, name, _id)");
+db.products.createIndex({ "category": 1, "active": 1, "name": 1, "_id": 1 });
 
-console.log("  • Índice: products (active)");
-db.products.createIndex({ "active": 1 });
+console.log("  • Índice: products (active, name, _id)");
+db.products.createIndex({ "active": 1, "name": 1, "_id": 1 });
 
 console.log("  • Índice: products (name)");
 db.products.createIndex({ "name": 1 });
 
 // Índices para orders
-console.log("  • Índice: orders (status)");
-db.orders.createIndex({ "status": 1 });
+console.log("  • Índice: orders (status, created_at, _id)");
+db.orders.createIndex({ "status": 1, "created_at": -1, "_id": -1 });
 
-console.log("  • Índice: orders (created_at)");
-db.orders.createIndex({ "created_at": -1 });
-
-console.log("  • Índice: orders (status, created_at)");
-db.orders.createIndex({ "status": 1, "created_at": -1 });
+console.log("  • Índice: orders (created_at, _id)");
+db.orders.createIndex({ "created_at": -1, "_id": -1 });
 
 console.log("\n✅ Índices criados\n");
 
@@ -0,0 +1,240 @@
+"""
+Teste de carga ponta a ponta da API
+Execute com: python scripts/loadtest.py [--scenario mixed] [--concurrency 20] [--duration 10]
+
+Por padrão a aplicação de app/main.py roda no próprio processo (via
+httpx.ASGITransport, com o lifespan) sobre o backend em memória; use
+--backend mongo para o MongoDB de MONGO_URI ou --target http://host:porta
+para um servidor já em execução. Antes da medição o cardápio de teste
+(produtos "loadtest_*") é cadastrado pela própria API.
+
+Cenários:
+- browse: cardápio (listas, pizza por ID, multi-get)
+- orders: criação de pedidos com preços do cardápio
+- kitchen: pedidos avançando de status e fila da cozinha
+- mixed: os três, na proporção 70/20/10
+
+O relatório sai em JSON: vazão total e, por rota, contagem, erros, req/s e
+latências p50/p95/p99/max em ms.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import time
+from collections import defaultdict, deque
+from contextlib import AsyncExitStack
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from httpx import ASGITransport, AsyncClient
+
+ASGI = "asgi"
+PREFIX = "loadtest_"
+NEXT_STATUS = {
+    "recebido": "em_preparo",
+    "em_preparo": "pronto",
+    "pronto": "saiu_entrega",
+    "saiu_entrega": "entregue",
+}
+
+def percentile(ordered: list[float], p: float) -> float:
+    """Percentil por posição (nearest-rank) de uma lista ordenada"""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+class Run:
+    """Estado compartilhado pelos usuários virtuais e latências por rota"""
+
+    def __init__(self, client: AsyncClient, beverages: list[str], pizzas: list[str]):
+        self.client = client
+        self.beverages = beverages
+        self.pizzas = pizzas
+        self.kitchen: deque[tuple[str, str]] = deque()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.statuses: dict[int, int] = defaultdict(int)
+
+    async def request(self, route: str, method: str, url: str, **kw):
+        start = time.perf_counter()
+        try:
+            r = await self.client.request(method, url, **kw)
+        except Exception:
+            self.latencies[route].append((time.perf_counter() - start) * 1000)
+            self.errors[route] += 1
+            self.statuses[0] += 1
+            return None
+        self.latencies[route].append((time.perf_counter() - start) * 1000)
+        self.statuses[r.status_code] += 1
+        if r.status_code >= 400:
+            self.errors[route] += 1
+        return r
+
+# ============== PASSOS DOS CENÁRIOS ==============
+
+async def list_products(run: Run, rng: random.Random):
+    await run.request("GET /products", "GET", "/products?limit=20")
+
+async def list_pizzas(run: Run, rng: random.Random):
+    await run.request("GET /products/pizzas", "GET", "/products/pizzas?limit=20")
+
+async def get_pizza(run: Run, rng: random.Random):
+    pid = rng.choice(run.pizzas)
+    await run.request("GET /products/pizzas/{pizza_id}", "GET", f"/products/pizzas/{pid}")
+
+async def batch_products(run: Run, rng: random.Random):
+    ids = rng.sample(run.beverages + run.pizzas, k=min(5, len(run.beverages) + len(run.pizzas)))
+    await run.request("GET /products/batch", "GET", "/products/batch", params={"ids": ",".join(ids)})
+
+def _order_payload(run: Run, rng: random.Random) -> dict:
+    items = []
+    for pid in rng.sample(run.pizzas, k=min(2, len(run.pizzas))):
+        items.append({"product_id": pid, "name": pid, "quantity": 1, "price": 42.0, "size_cm": 45})
+    items.append({"product_id": rng.choice(run.beverages), "name": "Bebida", "quantity": 2, "price": 8.5})
+    total = round(sum(i["price"] * i["quantity"] for i in items), 2)
+    return {"customer_name": "Carga", "customer_phone": "0", "items": items, "total_price": total}
+
+async def create_order(run: Run, rng: random.Random):
+    r = await run.request("POST /orders", "POST", "/orders", json=_order_payload(run, rng))
+    if r is not None and r.status_code == 201:
+        run.kitchen.append((r.json()["id"], "recebido"))
+
+async def advance_order(run: Run, rng: random.Random):
+    if not run.kitchen:
+        await create_order(run, rng)
+        return
+    oid, status = run.kitchen.popleft()
+    target = NEXT_STATUS[status]
+    r = await run.request(
+        "PATCH /orders/{order_id}/status/{new_status}", "PATCH", f"/orders/{oid}/status/{target}"
+    )
+    if r is not None and r.status_code == 200 and target in NEXT_STATUS:
+        run.kitchen.append((oid, target))
+
+async def kitchen_queue(run: Run, rng: random.Random):
+    status = rng.choice(["recebido", "em_preparo", "pronto"])
+    await run.request("GET /orders/status/{status}", "GET", f"/orders/status/{status}?limit=20")
+
+SCENARIOS = {
+    "browse": [(30, list_products), (25, list_pizzas), (30, get_pizza), (15, batch_products)],
+    "orders": [(80, create_order), (20, batch_products)],
+    "kitchen": [(60, advance_order), (25, kitchen_queue), (15, create_order)],
+}
+SCENARIOS["mixed"] = (
+    [(w * 7, step) for w, step in SCENARIOS["browse"]]
+    + [(w * 2, step) for w, step in SCENARIOS["orders"]]
+    + [(w * 1, step) for w, step in SCENARIOS["kitchen"]]
+)
+
+# ============== EXECUÇÃO ==============
+
+async def seed(client: AsyncClient, n: int) -> tuple[list[str], list[str]]:
+    """Cadastrar o cardápio de teste (409 = já existe, reaproveitado)"""
+    beverages, pizzas = [], []
+    for i in range(n):
+        if i % 2:
+            pid = f"{PREFIX}pizza_{i:03d}"
+            r = await client.post("/products/pizzas", json={
+                "id": pid, "name": f"Pizza carga {i:03d}", "price": 30.0,
+                "sizes": [{"size_cm": 35, "price": 30.0}, {"size_cm": 45, "price": 42.0}],
+            })
+            pizzas.append(pid)
+        else:
+            pid = f"{PREFIX}bebida_{i:03d}"
+            r = await client.post("/products", json={
+                "id": pid, "name": f"Bebida carga {i:03d}", "category": "bebida", "price": 8.5,
+            })
+            beverages.append(pid)
+        if r.status_code not in (201, 409):
+            raise SystemExit(f"Falha ao cadastrar {pid}: {r.status_code} {r.text}")
+    return beverages, pizzas
+
+async def user(run: Run, scenario: list, deadline: float, rng: random.Random):
+    steps = [step for _, step in scenario]
+    weights = [w for w, _ in scenario]
+    while time.perf_counter() < deadline:
+        await rng.choices(steps, weights)[0](run, rng)
+
+def report(run: Run, args, elapsed: float) -> dict:
+    routes = {}
+    for route, samples in sorted(run.latencies.items()):
+        ordered = sorted(samples)
+        routes[route] = {
+            "count": len(ordered),
+            "errors": run.errors.get(route, 0),
+            "rps": round(len(ordered) / elapsed, 1),
+            "p50_ms": round(percentile(ordered, 50), 2),
+            "p95_ms": round(percentile(ordered, 95), 2),
+            "p99_ms": round(percentile(ordered, 99), 2),
+            "max_ms": round(ordered[-1], 2),
+        }
+    total = sum(r["count"] for r in routes.values())
+    return {
+        "target": args.target,
+        "backend": args.backend if args.target == ASGI else None,
+        "scenario": args.scenario,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(r["errors"] for r in routes.values()),
+        "throughput_rps": round(total / elapsed, 1),
+        "status_codes": {str(k): v for k, v in sorted(run.statuses.items())},
+        "routes": routes,
+    }
+
+async def main(args) -> dict:
+    async with AsyncExitStack() as stack:
+        if args.target == ASGI:
+            from app.core.settings import settings
+            settings.REPO_BACKEND = args.backend
+            from app.main import app
+            # Os logs da aplicação também vão para stdout: manter só o relatório
+            logging.getLogger().setLevel(args.log_level)
+            # ASGITransport não envia os eventos de lifespan: rodar manualmente
+            await stack.enter_async_context(app.router.lifespan_context(app))
+            client = AsyncClient(transport=ASGITransport(app=app), base_url="http://loadtest")
+        else:
+            client = AsyncClient(base_url=args.target, timeout=30)
+        await stack.enter_async_context(client)
+
+        beverages, pizzas = await seed(client, args.products)
+        run = Run(client, beverages, pizzas)
+        scenario = SCENARIOS[args.scenario]
+        start = time.perf_counter()
+        deadline = start + args.duration
+        await asyncio.gather(*(
+            user(run, scenario, deadline, random.Random(args.seed + i)) for i in range(args.concurrency)
+        ))
+        return report(run, args, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga da API")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    parser.add_argument("--target", default=ASGI, help="'asgi' (no processo) ou URL base, ex: http://localhost:8000")
+    parser.add_argument("--backend", choices=["memory", "mongo"], default="memory", help="Backend no modo asgi")
+    parser.add_argument("--concurrency", type=int, default=20, help="Usuários virtuais simultâneos")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de medição")
+    parser.add_argument("--products", type=int, default=20, help="Produtos do cardápio de teste")
+    parser.add_argument("--seed", type=int, default=42, help="Semente dos sorteios")
+    parser.add_argument("--log-level", default="ERROR", help="Nível de log da aplicação no modo asgi")
+    parser.add_argument("--output", help="Gravar o JSON neste arquivo (além da saída padrão)")
+    args = parser.parse_args()
+    if args.products < 4:
+        parser.error("--products deve ser pelo menos 4")
+    # Uma linha de log por requisição do cliente distorceria a medição
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    result = asyncio.run(main(args))
+    text = json.dumps(result, indent=2, ensure_ascii=False)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text, encoding="utf-8")
@@ -0,0 +1,52 @@
+"""
+Script para reconciliar os contadores de pedidos por status (GET /orders/stats)
+Execute com: python scripts/reconcile_order_counters.py [--attempts 3]
+
+Conta os pedidos por status na collection e aplica no documento
+counters/order_status apenas o desvio encontrado (``$inc``), sem apagar os
+incrementos feitos pelos workers. Se o documento mudar durante a contagem, a
+tentativa é descartada e repetida. Agende em um único lugar (cron/job), não
+em cada worker.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Adicionar a raiz do projeto ao path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.settings import settings
+from app.infra.repos import MongoCounterRepo, MongoOrderRepo
+from app.services.order_counters import OrderStatusCounters
+
+async def run(attempts: int, wait_seconds: float) -> int:
+    client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=5000)
+    try:
+        db = client[settings.MONGO_DB]
+        counters = OrderStatusCounters(MongoCounterRepo(db["counters"]))
+        orders = MongoOrderRepo(db["orders"])
+        for _ in range(attempts):
+            drift = await counters.reconcile(orders)
+            if drift is not None:
+                print(json.dumps({s.value: d for s, d in drift.items()}, indent=2))
+                return 0
+            await asyncio.sleep(wait_seconds)
+    finally:
+        client.close()
+    print("Contadores mudaram durante todas as tentativas; rode novamente fora do pico", file=sys.stderr)
+    return 1
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconciliar contadores de pedidos por status")
+    parser.add_argument("--attempts", type=int, default=3, help="Tentativas se houver escritas durante a contagem")
+    parser.add_argument("--wait", type=float, default=1.0, help="Segundos entre tentativas")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args.attempts, args.wait)))
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,7 @@ async def mock_order_repo():
     repo.list_all = AsyncMock(return_value=[])
     repo.list_by_status = AsyncMock(return_value=[])
     repo.update_status = AsyncMock()
+    repo.transition_status = AsyncMock(return_value=None)
     return repo
 
 @pytest.fixture
@@ -0,0 +1,76 @@
+import pytest
+from datetime import date, datetime
+from app.domain.order_entities import Order, OrderItem, OrderStatus
+from app.infra.hydration import order_to_doc
+from app.infra.memory import MemoryRollupRepo
+from app.services.analytics_service import RollupService
+
+def _order(oid, created_at, items, status=OrderStatus.RECEBIDO):
+    return Order(
+        id=oid,
+        customer_name="Maria",
+        customer_phone="0",
+        items=[OrderItem(product_id=p, name=p.title(), quantity=q, price=price) for p, q, price in items],
+        total_price=sum(q * price for _, q, price in items),
+        status=status,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+# 22h UTC de 10/11 é 19h do dia 10 em São Paulo; 02h UTC de 11/11 ainda é dia 10
+ORDERS = [
+    _order("A", datetime(2025, 11, 10, 22, 0), [("pizza.calabresa", 1, 40.0), ("bebida", 2, 8.5)]),
+    _order("B", datetime(2025, 11, 11, 2, 30), [("pizza.calabresa", 2, 40.0)]),
+    _order("C", datetime(2025, 11, 11, 15, 0), [("esfiha", 10, 5.0)]),
+]
+
+async def _incremental():
+    svc = RollupService(MemoryRollupRepo(), tz="America/Sao_Paulo")
+    await svc.record_created(ORDERS[:1])
+    await svc.record_created(ORDERS[1:])
+    await svc.record_cancelled(ORDERS[2].model_copy(update={"status": OrderStatus.CANCELADO}))
+    return svc
+
+@pytest.mark.asyncio
+async def test_rollups_daily_hourly_and_top_products():
+    """Testar rollups por dia local, por hora e por produto (com cancelamento)"""
+    svc = await _incremental()
+
+    daily = await svc.daily(date(2025, 11, 1), date(2025, 11, 30))
+    assert [(d.date.day, d.orders, d.revenue, d.cancelled_orders) for d in daily] == [
+        (10, 2, 137.0, 0), (11, 0, 0.0, 1)
+    ]
+    hourly = await svc.hourly(date(2025, 11, 10), date(2025, 11, 10))
+    assert (hourly[19].orders, hourly[23].orders) == (1, 1)
+
+    top = await svc.top_products(date(2025, 11, 10), date(2025, 11, 11))
+    assert [(p.product_id, p.quantity, p.revenue) for p in top] == [
+        ("pizza.calabresa", 3, 120.0), ("bebida", 2, 17.0)
+    ]
+
+@pytest.mark.asyncio
+async def test_rebuild_matches_incremental_rollups():
+    """Testar que o backfill produz os mesmos totais que as atualizações incrementais"""
+    incremental = await _incremental()
+
+    async def docs():
+        stored = ORDERS[:2] + [ORDERS[2].model_copy(update={"status": OrderStatus.CANCELADO})]
+        for o in stored:
+            yield order_to_doc(o)
+
+    repo = MemoryRollupRepo()
+    repo.docs["2025-11-09"] = {"_id": "2025-11-09", "orders": 99}
+    rebuilt = RollupService(repo, tz="America/Sao_Paulo")
+    report = await rebuilt.rebuild(docs(), date(2025, 11, 9), date(2025, 11, 11), batch_days=1)
+
+    assert (report.orders, report.days_written, report.days_deleted) == (3, 2, 1)
+    span = (date(2025, 11, 9), date(2025, 11, 11))
+    assert await rebuilt.daily(*span) == await incremental.daily(*span)
+    assert await rebuilt.hourly(*span) == await incremental.hourly(*span)
+    assert await rebuilt.top_products(*span) == await incremental.top_products(*span)
+
+@pytest.mark.asyncio
+async def test_rollup_range_validation():
+    svc = RollupService(MemoryRollupRepo())
+    with pytest.raises(ValueError):
+        await svc.daily(date(2025, 11, 2), date(2025, 11, 1))
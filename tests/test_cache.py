@@ -0,0 +1,123 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.infra.cache import TTLCache, CachedProductRepo
+from app.domain.entities import Product, ProductCategory
+from app.services.product_service import ProductService
+
+def _product(pid="bebida_001", category=ProductCategory.BEBIDA, **kw):
+    return Product(id=pid, name=kw.pop("name", "Refrigerante"), category=category, price=kw.pop("price", 8.50), **kw)
+
+def test_ttl_cache_lru_eviction():
+    """Testar que a entrada menos usada é removida ao atingir o limite"""
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+def test_ttl_cache_expiration(monkeypatch):
+    """Testar que entradas expiram após o TTL"""
+    now = [1000.0]
+    monkeypatch.setattr("app.infra.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=10, ttl_seconds=5)
+    cache.set("a", 1)
+    now[0] += 4
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_ttl_cache_invalidate_tags():
+    """Testar invalidação por tags"""
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    cache.set("x", 1, tags=("product:1", "category:pizza"))
+    cache.set("y", 2, tags=("category:bebida",))
+    assert cache.invalidate_tags("product:1") == 1
+    assert cache.get("x") is None
+    assert cache.get("y") == 2
+
+@pytest.mark.asyncio
+async def test_cached_repo_serves_reads_from_memory():
+    """Testar que leituras repetidas não chegam ao repositório"""
+    inner = AsyncMock()
+    inner.by_id = AsyncMock(return_value=_product())
+    inner.list_active = AsyncMock(return_value=[_product()])
+    repo = CachedProductRepo(inner, TTLCache(max_entries=10, ttl_seconds=60))
+
+    for _ in range(3):
+        assert (await repo.by_id("bebida_001")).id == "bebida_001"
+        assert len(await repo.list_active(skip=0, limit=10)) == 1
+
+    assert inner.by_id.await_count == 1
+    assert inner.list_active.await_count == 1
+
+@pytest.mark.asyncio
+async def test_cached_repo_invalidates_on_update():
+    """Testar que update não deixa leituras obsoletas no cache"""
+    stored = {"bebida_001": _product()}
+    inner = AsyncMock()
+    inner.by_id = AsyncMock(side_effect=lambda pid: stored.get(pid))
+    inner.list_by_category = AsyncMock(side_effect=lambda cat, skip, limit, cursor: list(stored.values()))
+    inner.save = AsyncMock(side_effect=lambda p: stored.__setitem__(p.id, p))
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    repo = CachedProductRepo(inner, cache)
+    cache.set(("list_by_category", "esfiha", 0, 10, None), (), tags=("category:esfiha",))
+    svc = ProductService(repo)
+
+    assert (await svc.list_by_category(ProductCategory.BEBIDA))[0].price == 8.50
+    await svc.update("bebida_001", {"price": 9.00})
+
+    assert (await svc.get_by_id("bebida_001")).price == 9.00
+    assert (await svc.list_by_category(ProductCategory.BEBIDA))[0].price == 9.00
+    # Listas de outras categorias continuam em cache
+    assert cache.peek(("list_by_category", "esfiha", 0, 10, None)) == ()
+
+@pytest.mark.asyncio
+async def test_cached_repo_invalidates_on_deactivate():
+    """Testar que deactivate remove o produto das listas em cache"""
+    stored = {"bebida_001": _product()}
+    inner = AsyncMock()
+    inner.by_id = AsyncMock(side_effect=lambda pid: stored.get(pid))
+    inner.list_active = AsyncMock(side_effect=lambda skip, limit, cursor: [p for p in stored.values() if p.active])
+    inner.save = AsyncMock(side_effect=lambda p: stored.__setitem__(p.id, p))
+    repo = CachedProductRepo(inner, TTLCache(max_entries=10, ttl_seconds=60))
+    svc = ProductService(repo)
+
+    assert len(await svc.list_active()) == 1
+    await svc.deactivate("bebida_001")
+    assert await svc.list_active() == []
+
+@pytest.mark.asyncio
+async def test_write_in_other_worker_clears_cache():
+    """Testar que a escrita de outro worker limpa o cache ao reler a versão compartilhada"""
+    from app.api import deps
+    from app.infra.memory import MemoryCounterRepo
+    from app.services.product_service import CatalogVersion
+
+    stored = {"bebida_001": _product()}
+    inner = AsyncMock()
+    inner.by_id = AsyncMock(side_effect=lambda pid: stored.get(pid))
+    inner.save = AsyncMock(side_effect=lambda p: stored.__setitem__(p.id, p))
+    counters = MemoryCounterRepo()
+    here, other = CatalogVersion(counters), CatalogVersion(counters)
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+    here.subscribe(cache.clear)
+    await here.refresh()
+    svc = ProductService(CachedProductRepo(inner, cache), catalog=here)
+
+    assert (await svc.get_by_id("bebida_001")).price == 8.50
+    # Outro worker, com seu próprio cache
+    await ProductService(CachedProductRepo(inner, TTLCache()), catalog=other).update("bebida_001", {"price": 9.00})
+    assert (await svc.get_by_id("bebida_001")).price == 8.50
+
+    await here.refresh()
+    assert (await svc.get_by_id("bebida_001")).price == 9.00
+    # Na aplicação, o cache global está inscrito na versão global
+    assert deps.product_cache.clear in deps.catalog_version._listeners
@@ -0,0 +1,28 @@
+from fastapi.testclient import TestClient
+from pymongo.errors import WaitQueueTimeoutError
+from app.main import app
+from app.api.deps import get_product_service
+from app.core.settings import settings
+from app.infra import db
+from app.services.product_service import ProductService
+
+def test_client_options_from_settings(monkeypatch):
+    """Testar que o pool é configurado a partir de Settings"""
+    monkeypatch.setattr(settings, "MONGO_MAX_POOL_SIZE", 50)
+    monkeypatch.setattr(settings, "MONGO_WAIT_QUEUE_TIMEOUT_MS", 1500)
+    monkeypatch.setattr(settings, "MONGO_COMPRESSORS", "zlib")
+    options = db.client_options()
+    assert options["maxPoolSize"] == 50
+    assert options["waitQueueTimeoutMS"] == 1500
+    assert options["compressors"] == "zlib"
+
+def test_pool_exhausted_returns_503(mock_product_repo):
+    """Testar que o pool esgotado vira 503 em vez de erro genérico"""
+    mock_product_repo.list_active.side_effect = WaitQueueTimeoutError("timed out waiting for connection")
+    app.dependency_overrides[get_product_service] = lambda: ProductService(mock_product_repo)
+    try:
+        response = TestClient(app).get("/products/")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+    finally:
+        app.dependency_overrides.clear()
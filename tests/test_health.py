@@ -1,8 +1,11 @@
+import asyncio
 import pytest
 from httpx import AsyncClient
 from fastapi.testclient import TestClient
 from app.main import app
 from httpx import ASGITransport
+from app.api.deps import get_readiness_probe
+from app.infra.health import LoopLagMonitor, PoolStats, ReadinessProbe
 
 @pytest.mark.asyncio
 async def test_health():
@@ -12,4 +15,67 @@ async def test_health():
     ) as ac:
         r = await ac.get("/health")
         assert r.status_code == 200
-        assert r.json() == {"status": "ok"}
\ No newline at end of file
+        assert r.json() == {"status": "ok"}
+
+def _probe(ping, **kw):
+    return ReadinessProbe(ping, PoolStats(), LoopLagMonitor(), **kw)
+
+@pytest.mark.asyncio
+async def test_ready_caches_ping_result():
+    """Testar que probes seguidos reutilizam o resultado do ping"""
+    calls = []
+
+    async def ping():
+        calls.append(1)
+
+    probe = _probe(ping, cache_seconds=60)
+    app.dependency_overrides[get_readiness_probe] = lambda: probe
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.get("/health/ready")
+            second = await ac.get("/health/ready")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200 and first.json()["mongo"]["ok"]
+    assert second.json()["cached"] is True
+    assert "checked_out" in first.json()["pool"]
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_ready_fails_fast_when_mongo_hangs():
+    """Testar 503 quando o ping excede o prazo"""
+    async def ping():
+        await asyncio.sleep(5)
+
+    probe = _probe(ping, timeout=0.05)
+    app.dependency_overrides[get_readiness_probe] = lambda: probe
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            r = await ac.get("/health/ready")
+            live = await ac.get("/health/live")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert r.status_code == 503
+    assert r.json()["status"] == "unavailable"
+    assert live.status_code == 200
+
+@pytest.mark.asyncio
+async def test_ready_in_memory_backend_skips_mongo(monkeypatch):
+    """Testar que com REPO_BACKEND=memory o readiness não depende do MongoDB"""
+    from app.api import deps
+
+    async def get_db():
+        raise AssertionError("cliente Motor não deveria ser criado")
+
+    monkeypatch.setattr(deps.settings, "REPO_BACKEND", "memory")
+    monkeypatch.setattr(deps, "get_db", get_db)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        r = await ac.get("/health/ready")
+        products = await ac.get("/products")
+
+    assert r.status_code == 200
+    assert r.json()["status"] == "ready"
+    assert r.json()["mongo"] is None and r.json()["pool"] is None
+    assert products.status_code == 200
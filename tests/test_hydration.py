@@ -0,0 +1,73 @@
+import pytest
+from datetime import datetime
+from pydantic import ValidationError
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+from app.domain.order_entities import Order, OrderItem, OrderStatus
+from app.infra import hydration
+from app.infra.hydration import (
+    SCHEMA_VERSION, order_from_doc, order_to_doc, product_from_doc, product_to_doc,
+)
+
+def _pizza():
+    return Pizza(
+        id="pizza_001",
+        name="Calabresa",
+        category=ProductCategory.PIZZA,
+        price=25.00,
+        image_url="https://example.com/calabresa.jpg",
+        sizes=[PizzaSize(size_cm=35, price=25.00), PizzaSize(size_cm=45, price=35.00)]
+    )
+
+def test_trusted_product_matches_validated():
+    """Testar que a hidratação confiável produz o mesmo objeto validado"""
+    doc = product_to_doc(_pizza())
+    assert doc["schema_version"] == SCHEMA_VERSION
+
+    trusted = product_from_doc(doc, trusted=True)
+    validated = product_from_doc(doc, trusted=False)
+    assert isinstance(trusted, Pizza)
+    assert trusted == validated
+    assert trusted.model_dump() == validated.model_dump()
+
+@pytest.mark.parametrize("slots", [True, False])
+def test_trusted_product_fields_set_matches_validated(monkeypatch, slots):
+    """Testar que fields_set e exclude_unset coincidem com o caminho validado (e no fallback)"""
+    if not slots:
+        monkeypatch.setattr(hydration, "_SLOTS", None)
+    for p in (_pizza(), Product(id="b1", name="Suco", category=ProductCategory.BEBIDA, price=6.0)):
+        doc = product_to_doc(p)
+        trusted = product_from_doc(doc, trusted=True)
+        validated = product_from_doc(doc, trusted=False)
+        assert trusted == validated
+        assert trusted.model_fields_set == validated.model_fields_set
+        assert trusted.model_dump(exclude_unset=True) == validated.model_dump(exclude_unset=True)
+        assert trusted.model_extra is None and validated.model_extra is None
+
+def test_orders_are_always_validated():
+    """Testar que pedidos passam pela validação mesmo com schema_version atual"""
+    order = Order(
+        id="ORD-001",
+        customer_name="Maria",
+        customer_phone="(11) 99999-8888",
+        items=[OrderItem(product_id="pizza_001", name="Calabresa", quantity=1, price=35.0)],
+        total_price=35.0,
+        status=OrderStatus.PRONTO,
+        created_at=datetime(2025, 11, 11, 18, 30),
+        updated_at=datetime(2025, 11, 11, 18, 45),
+    )
+    doc = order_to_doc(order)
+    assert order_from_doc(doc) == order
+    assert order_from_doc(doc).status is OrderStatus.PRONTO
+
+    doc["status"] = "desconhecido"
+    with pytest.raises(ValidationError):
+        order_from_doc(doc)
+
+def test_legacy_documents_are_validated():
+    """Testar que documentos sem schema_version passam pela validação"""
+    doc = product_to_doc(Product(id="b1", name="Suco", category=ProductCategory.BEBIDA, price=6.0))
+    del doc["schema_version"]
+    doc["image_url"] = "invalid-url"
+
+    with pytest.raises(ValidationError):
+        product_from_doc(doc, trusted=True)
@@ -0,0 +1,53 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.infra.indexes import IndexSpec, ensure_indexes
+
+SPECS = [
+    IndexSpec(collection="orders", keys=[("status", 1), ("created_at", -1), ("_id", -1)]),
+    IndexSpec(collection="orders", keys=[("created_at", -1), ("_id", -1)]),
+]
+
+def _fake_db(existing: dict):
+    col = MagicMock()
+    col.index_information = AsyncMock(return_value={"_id_": {"key": [("_id", 1)]}, **existing})
+    col.create_indexes = AsyncMock()
+    return {"orders": col}, col
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_creates_missing():
+    """Testar que índices ausentes são criados"""
+    db, col = _fake_db({})
+    report = await ensure_indexes(db, SPECS)
+
+    assert report.missing == ["orders.status_1_created_at_-1__id_-1", "orders.created_at_-1__id_-1"]
+    assert report.created == report.missing
+    assert report.ok
+    col.create_indexes.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_is_idempotent():
+    """Testar que nada é criado quando os índices já existem"""
+    db, col = _fake_db({
+        "status_1_created_at_-1__id_-1": {"key": [("status", 1), ("created_at", -1.0), ("_id", -1)]},
+        "created_at_-1__id_-1": {"key": [("created_at", -1), ("_id", -1)]},
+    })
+    report = await ensure_indexes(db, SPECS)
+
+    assert report.missing == [] and report.extra == [] and report.conflicting == []
+    col.create_indexes.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_reports_extra_and_conflicts():
+    """Testar detecção de índices extras e conflitantes em dry-run"""
+    db, col = _fake_db({
+        "status_1": {"key": [("status", 1)]},
+        "status_1_created_at_-1__id_-1": {"key": [("status", 1), ("created_at", -1), ("_id", -1)], "unique": True},
+        "recent": {"key": [("created_at", -1), ("_id", -1)]},
+    })
+    report = await ensure_indexes(db, SPECS, dry_run=True)
+
+    assert report.extra == ["orders.status_1"]
+    assert [c.name for c in report.conflicting] == ["status_1_created_at_-1__id_-1", "created_at_-1__id_-1"]
+    assert report.conflicting[1].actual["name"] == "recent"
+    assert not report.ok
+    col.create_indexes.assert_not_awaited()
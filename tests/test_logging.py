@@ -0,0 +1,63 @@
+import io
+import json
+import logging
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient, ASGITransport
+from app.core.logging import RequestIdMiddleware, parse_sampling, setup_logging, shutdown_logging
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    yield stream
+    # Voltar à configuração padrão da aplicação
+    setup_logging()
+
+def _lines(stream: io.StringIO) -> list[dict]:
+    shutdown_logging()  # esvazia a fila
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+def test_setup_is_idempotent_and_emits_json(log_stream):
+    setup_logging(fmt="json", sampling={}, stream=log_stream)
+    setup_logging(fmt="json", sampling={}, stream=log_stream)
+    log = logging.getLogger("app.tests")
+    log.info("Pedido %s criado", "ORD-1")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("Falhou")
+
+    lines = _lines(log_stream)
+    assert [l["msg"] for l in lines] == ["Pedido ORD-1 criado", "Falhou"]
+    assert lines[0]["level"] == "INFO" and lines[0]["logger"] == "app.tests"
+    assert "ValueError: boom" in lines[1]["exc"]
+
+def test_sampling_keeps_warnings(log_stream):
+    assert parse_sampling("app.infra.repos.writes=0.1, x=1") == {"app.infra.repos.writes": 0.1, "x": 1.0}
+    setup_logging(fmt="json", sampling={"app.infra.repos.writes": 0.25}, stream=log_stream)
+    log = logging.getLogger("app.infra.repos.writes")
+    for i in range(8):
+        log.info("Pedido criado: %s", i)
+    log.warning("Aviso")
+
+    assert [l["msg"] for l in _lines(log_stream)] == ["Pedido criado: 0", "Pedido criado: 4", "Aviso"]
+
+@pytest.mark.asyncio
+async def test_request_id_in_logs_and_response(log_stream):
+    setup_logging(fmt="json", sampling={}, stream=log_stream)
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/ping")
+    async def ping():
+        logging.getLogger("app.tests").info("ping")
+        return {}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        given = await ac.get("/ping", headers={"X-Request-ID": "abc-123"})
+        generated = await ac.get("/ping", headers={"X-Request-ID": "invalido com espaco"})
+
+    assert given.headers["X-Request-ID"] == "abc-123"
+    assert len(generated.headers["X-Request-ID"]) == 32
+    lines = [l for l in _lines(log_stream) if l["msg"] == "ping"]
+    assert [l["request_id"] for l in lines] == ["abc-123", generated.headers["X-Request-ID"]]
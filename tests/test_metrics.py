@@ -0,0 +1,56 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.api.deps import get_order_service
+from app.core.metrics import REGISTRY, Histogram, instrument_repo
+from app.services.order_service import OrderService
+
+def test_histogram_buckets_are_cumulative():
+    """Testar buckets cumulativos, soma e contagem no formato texto"""
+    h = Histogram("t_seconds", "teste", ("op",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.labels("x").observe(v)
+    lines = h.render()
+    assert 't_seconds_bucket{op="x",le="0.1"} 2' in lines
+    assert 't_seconds_bucket{op="x",le="1.0"} 3' in lines
+    assert 't_seconds_bucket{op="x",le="+Inf"} 4' in lines
+    assert 't_seconds_count{op="x"} 4' in lines
+
+@pytest.mark.asyncio
+async def test_instrument_repo_records_each_method():
+    """Testar histograma e contador de erros por método do repositório"""
+    @instrument_repo("fake")
+    class FakeRepo:
+        async def ok(self):
+            return 1
+
+        async def fail(self):
+            raise ValueError("x")
+
+    repo = FakeRepo()
+    assert await repo.ok() == 1
+    with pytest.raises(ValueError):
+        await repo.fail()
+
+    text = REGISTRY.render()
+    assert 'repo_operation_duration_seconds_count{repo="fake",method="ok"} 1' in text
+    assert 'repo_operation_errors_total{repo="fake",method="fail"} 1' in text
+
+@pytest.mark.asyncio
+async def test_metrics_labelled_by_route_template(mock_order_repo):
+    """Testar que a rota é rotulada pelo template e não pela URL"""
+    app.dependency_overrides[get_order_service] = lambda: OrderService(mock_order_repo)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            await ac.get("/orders/status/pronto")
+            await ac.get("/nao-existe")
+            r = await ac.get("/metrics")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert 'http_requests_total{method="GET",route="/orders/status/{status}",status="200"}' in r.text
+    assert 'route="unmatched",status="404"' in r.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/orders/status/{status}",status="200"}' in r.text
+    assert "http_requests_in_flight 1" in r.text
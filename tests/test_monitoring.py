@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.api.deps import get_command_monitor
+from app.infra.monitoring import CommandMonitor, redact
+
+def _run(monitor, command, ms, request_id=1, name="find"):
+    monitor.started(SimpleNamespace(
+        command_name=name, command=command, database_name="veneto",
+        connection_id=("localhost", 27017), request_id=request_id,
+    ))
+    monitor.succeeded(SimpleNamespace(
+        command_name=name, duration_micros=int(ms * 1000),
+        connection_id=("localhost", 27017), request_id=request_id,
+    ))
+
+def _find_by_status(status):
+    return {
+        "find": "orders",
+        "filter": {"status": status, "customer_phone": {"$in": ["1199", "1198"]}},
+        "sort": {"created_at": -1, "_id": -1},
+        "lsid": {"id": "x"},
+    }
+
+def test_redact_keeps_shape_only():
+    """Testar que valores do filtro são omitidos e operadores mantidos"""
+    assert redact({"a": 1, "$or": [{"b": "x"}, {"c": {"$gt": 3}}], "d": {"$in": [1, 2]}}) == {
+        "a": "?", "$or": [{"b": "?"}, {"c": {"$gt": "?"}}], "d": {"$in": ["?"]}
+    }
+
+def test_same_shape_aggregates_and_top_orders_by_slowest():
+    """Testar agregação por forma (valores diferentes, mesma forma)"""
+    monitor = CommandMonitor(slow_ms=50)
+    _run(monitor, _find_by_status("pronto"), 10, request_id=1)
+    _run(monitor, _find_by_status("recebido"), 80, request_id=2)
+    _run(monitor, {"find": "products", "filter": {"active": True}}, 5, request_id=3)
+
+    top = monitor.top(5)
+    assert [s.collection for s in top] == ["orders", "products"]
+    assert top[0].count == 2 and top[0].slow_count == 1 and top[0].max_ms == 80
+    assert top[0].filter == {"status": "?", "customer_phone": {"$in": ["?"]}}
+    assert top[0].sort == {"created_at": -1, "_id": -1}
+
+@pytest.mark.asyncio
+async def test_slow_shape_is_explained_once():
+    """Testar que o explain roda para a forma lenta e marca COLLSCAN"""
+    commands = []
+
+    class FakeDb:
+        async def command(self, cmd):
+            commands.append(cmd)
+            return {"queryPlanner": {"winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}}}
+
+    monitor = CommandMonitor(slow_ms=1, explain_slow=True)
+    monitor.bind(asyncio.get_running_loop(), {"veneto": FakeDb()})
+    _run(monitor, _find_by_status("pronto"), 20, request_id=1)
+    _run(monitor, _find_by_status("pronto"), 20, request_id=2)
+    await asyncio.sleep(0.01)
+
+    assert len(commands) == 1
+    assert "lsid" not in commands[0]["explain"]
+    shape = monitor.top(1)[0]
+    assert shape.collscan is True and shape.plan == ["SORT", "COLLSCAN"]
+
+@pytest.mark.asyncio
+async def test_admin_slow_queries_endpoint():
+    """Testar o endpoint de top-N formas lentas"""
+    monitor = CommandMonitor()
+    _run(monitor, _find_by_status("pronto"), 120)
+    app.dependency_overrides[get_command_monitor] = lambda: monitor
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            r = await ac.get("/admin/slow-queries?top=1")
+    finally:
+        app.dependency_overrides.clear()
+    assert r.status_code == 200
+    assert r.json()[0]["avg_ms"] == 120.0
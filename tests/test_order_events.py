@@ -0,0 +1,84 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api.deps import get_order_events
+from app.domain.order_entities import Order, OrderItem, OrderStatus
+from app.services.order_events import FeedControl, OrderEventBroker
+
+def _order(oid="ORD-1", status=OrderStatus.RECEBIDO):
+    return Order(
+        id=oid,
+        customer_name="Maria",
+        customer_phone="0",
+        items=[OrderItem(product_id="p1", name="P1", quantity=1, price=10.0)],
+        total_price=10.0,
+        status=status,
+    )
+
+@pytest.mark.asyncio
+async def test_broker_fans_out_to_all_subscribers():
+    """Testar que um evento chega a todos os assinantes"""
+    broker = OrderEventBroker(queue_size=10)
+    subs = [broker.subscribe() for _ in range(20)]
+    broker.publish("order_created", _order())
+
+    for sub in subs:
+        event = await sub.get(timeout=0.1)
+        assert event.seq == 1 and event.order_id == "ORD-1"
+
+@pytest.mark.asyncio
+async def test_broker_disconnects_slow_consumer():
+    """Testar que um assinante com fila cheia é desconectado sem bloquear os outros"""
+    broker = OrderEventBroker(queue_size=2)
+    slow = broker.subscribe()
+    fast = broker.subscribe()
+    for i in range(3):
+        broker.publish("order_created", _order(f"ORD-{i}"))
+        await fast.get(timeout=0.1)
+
+    control = await slow.get(timeout=0.1)
+    assert isinstance(control, FeedControl) and control.type == "lagged"
+    assert slow.closed and slow not in broker.subscribers
+    assert fast in broker.subscribers
+
+@pytest.mark.asyncio
+async def test_broker_resume_from_sequence():
+    """Testar retomada a partir da última sequência recebida"""
+    broker = OrderEventBroker(queue_size=10, history_size=5)
+    for i in range(4):
+        broker.publish("order_created", _order(f"ORD-{i}"))
+
+    sub = broker.subscribe(since=2)
+    assert [(await sub.get(timeout=0.1)).seq for _ in range(2)] == [3, 4]
+
+    for i in range(10):
+        broker.publish("order_created", _order(f"ORD-x{i}"))
+    stale = broker.subscribe(since=2)
+    control = await stale.get(timeout=0.1)
+    assert control.type == "resync" and control.last_seq == 14
+
+@pytest.mark.asyncio
+async def test_since_ahead_of_sequence_resyncs():
+    """Testar resync quando o cliente está à frente (worker reiniciado, sequência zerada)"""
+    broker = OrderEventBroker(queue_size=10, history_size=5)
+    sub = broker.subscribe(since=500)
+    control = await sub.get(timeout=0.1)
+    assert control.type == "resync" and control.last_seq == 0
+    assert sub not in broker.subscribers
+
+    broker.publish("order_created", _order("ORD-1"))
+    ahead = broker.subscribe(since=3)
+    assert (await ahead.get(timeout=0.1)).type == "resync"
+
+def test_websocket_feed():
+    """Testar o feed via WebSocket"""
+    broker = OrderEventBroker()
+    broker.publish("order_created", _order("ORD-1"))
+    app.dependency_overrides[get_order_events] = lambda: broker
+    try:
+        with TestClient(app).websocket_connect("/orders/ws?since=0") as ws:
+            msg = ws.receive_json()
+            assert msg["type"] == "order_created"
+            assert msg["order"]["id"] == "ORD-1"
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pymongo.errors import DuplicateKeyError
+from app.domain.ids import OrderIdGenerator
+from app.domain.order_entities import Order, OrderItem
+from app.infra.repos import DuplicateError, MongoOrderRepo
+from app.services.order_service import OrderService
+
+class FakeOrdersCollection:
+    """Collection mínima com _id único, como o MongoDB"""
+
+    def __init__(self):
+        self.docs = {}
+        self.calls = []
+
+    async def insert_one(self, doc):
+        self.calls.append("insert_one")
+        await asyncio.sleep(0)
+        if doc["_id"] in self.docs:
+            raise DuplicateKeyError("E11000 duplicate key error")
+        self.docs[doc["_id"]] = doc
+
+    async def find_one(self, query):
+        self.calls.append("find_one")
+        return self.docs.get(query["_id"])
+
+def _new_order(**kw):
+    return Order(
+        customer_name="Maria",
+        customer_phone="0",
+        items=[OrderItem(product_id="p1", name="P1", quantity=1, price=10.0)],
+        total_price=10.0,
+        **kw,
+    )
+
+def test_order_ids_unique_and_monotonic_across_threads():
+    """Testar IDs únicos entre threads e crescentes dentro de cada thread"""
+    gen = OrderIdGenerator()
+
+    def batch(_):
+        ids = [gen.new() for _ in range(5000)]
+        assert ids == sorted(ids)
+        return ids
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        all_ids = [i for ids in pool.map(batch, range(8)) for i in ids]
+    assert len(set(all_ids)) == len(all_ids)
+
+def test_order_ids_differ_between_generators():
+    """Testar que processos distintos (nós distintos) não colidem"""
+    a, b = OrderIdGenerator(), OrderIdGenerator()
+    assert {a.new() for _ in range(1000)}.isdisjoint({b.new() for _ in range(1000)})
+
+@pytest.mark.asyncio
+async def test_1000_concurrent_creates_single_round_trip():
+    """Testar 1.000 criações simultâneas: sem colisão e um insert por pedido"""
+    col = FakeOrdersCollection()
+    svc = OrderService(MongoOrderRepo(col))
+
+    created = await asyncio.gather(*(svc.create(_new_order()) for _ in range(1000)))
+
+    assert len({o.id for o in created}) == 1000
+    assert len(col.docs) == 1000
+    assert col.calls == ["insert_one"] * 1000
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_with_same_id():
+    """Testar que apenas um de vários creates com o mesmo ID vence"""
+    col = FakeOrdersCollection()
+    svc = OrderService(MongoOrderRepo(col))
+
+    results = await asyncio.gather(
+        *(svc.create(_new_order(id="ORD-PDV-1")) for _ in range(1000)),
+        return_exceptions=True,
+    )
+
+    assert sum(isinstance(r, Order) for r in results) == 1
+    assert sum(isinstance(r, DuplicateError) for r in results) == 999
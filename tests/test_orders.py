@@ -0,0 +1,255 @@
+import gzip
+import json
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.api.deps import get_order_service
+from app.domain.order_entities import Order, OrderItem, OrderStatus
+from app.infra.memory import MemoryCounterRepo
+from app.infra.repos import DUPLICATE, MongoOrderRepo
+from app.services.order_service import OrderService
+
+def _order_payload(**kw):
+    payload = {
+        "customer_name": "Maria Santos",
+        "customer_phone": "(11) 99999-8888",
+        "items": [
+            {"product_id": "pizza_calabresa_001", "name": "Calabresa", "quantity": 1, "price": 35.00}
+        ],
+        "total_price": 35.00,
+    }
+    payload.update(kw)
+    return payload
+
+@pytest.fixture
+def order_client(mock_order_repo):
+    app.dependency_overrides[get_order_service] = lambda: OrderService(mock_order_repo)
+    yield AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_create_orders_batch(order_client, mock_order_repo):
+    """Testar lote com pedidos criados, duplicados e inválidos em uma escrita"""
+    mock_order_repo.insert_many = AsyncMock(return_value={1: (DUPLICATE, "Pedido ORD-2 já existe")})
+    payload = [
+        _order_payload(id="ORD-1"),
+        _order_payload(id="ORD-2"),
+        _order_payload(id="ORD-3", items="não é lista"),
+        _order_payload(),
+    ]
+    async with order_client as ac:
+        r = await ac.post("/orders/batch", json=payload)
+
+    assert r.status_code == 200
+    body = r.json()
+    assert (body["created"], body["duplicates"], body["invalid"]) == (2, 1, 1)
+    assert [i["status"] for i in body["results"]] == ["created", "duplicate", "invalid", "created"]
+    assert body["results"][3]["id"].startswith("ORD-")
+    mock_order_repo.insert_many.assert_awaited_once()
+    assert len(mock_order_repo.insert_many.await_args.args[0]) == 3
+
+@pytest.mark.asyncio
+async def test_create_orders_batch_malformed_rows(order_client, mock_order_repo):
+    """Testar que ID não textual e linha que não é objeto marcam só a própria linha"""
+    mock_order_repo.insert_many = AsyncMock(return_value={})
+    payload = [_order_payload(id=5, items="não é lista"), "não é objeto", _order_payload(id="ORD-1")]
+    async with order_client as ac:
+        r = await ac.post("/orders/batch", json=payload)
+
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [i["status"] for i in results] == ["invalid", "invalid", "created"]
+    assert results[0]["id"] == "5" and results[1]["id"] is None
+
+@pytest.mark.asyncio
+async def test_create_orders_batch_write_error(order_client, mock_order_repo):
+    """Testar que falha da escrita do lote vira 400, como em POST /orders"""
+    mock_order_repo.insert_many = AsyncMock(side_effect=ValueError("Erro ao inserir pedidos"))
+    async with order_client as ac:
+        r = await ac.post("/orders/batch", json=[_order_payload(id="ORD-1")])
+
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Erro ao inserir pedidos"
+
+@pytest.mark.asyncio
+async def test_create_orders_batch_too_large(order_client):
+    """Testar limite de tamanho do lote"""
+    async with order_client as ac:
+        r = await ac.post("/orders/batch", json=[_order_payload()] * 1001)
+    assert r.status_code == 422
+
+def _stored_orders(n):
+    base = datetime(2025, 11, 1, 18, 0)
+    for i in range(n):
+        yield {
+            "_id": f"ORD-{i:03d}", "id": f"ORD-{i:03d}",
+            "customer_name": "Maria", "customer_phone": "0",
+            "items": [{"product_id": "p1", "name": "P1", "quantity": 2, "price": 5.0}],
+            "total_price": 10.0, "status": "entregue",
+            "delivery_type": "delivery", "payment_method": "pix",
+            "created_at": base + timedelta(minutes=i), "updated_at": base,
+        }
+
+@pytest.mark.asyncio
+async def test_export_orders_csv_gzip(order_client, mock_order_repo):
+    """Testar exportação em streaming com CSV comprimido"""
+    async def fake_iter(start, end, batch_size):
+        for doc in _stored_orders(120):
+            yield doc
+
+    mock_order_repo.iter_created_between = fake_iter
+    async with order_client as ac:
+        r = await ac.get("/orders/export", params={
+            "start": "2025-11-01T00:00:00", "end": "2025-12-01T00:00:00",
+            "format": "csv", "gzip": "true", "batch_size": 50,
+        })
+
+    assert r.status_code == 200
+    lines = gzip.decompress(r.content).decode().splitlines()
+    assert lines[0].startswith("id,created_at")
+    assert len(lines) == 121
+    assert lines[1].startswith("ORD-000,2025-11-01T18:00:00")
+
+@pytest.mark.asyncio
+async def test_export_orders_ndjson(order_client, mock_order_repo):
+    """Testar exportação NDJSON"""
+    async def fake_iter(start, end, batch_size):
+        for doc in _stored_orders(3):
+            yield doc
+
+    mock_order_repo.iter_created_between = fake_iter
+    async with order_client as ac:
+        r = await ac.get("/orders/export", params={"start": "2025-11-01", "end": "2025-11-02"})
+
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["id"] for row in rows] == ["ORD-000", "ORD-001", "ORD-002"]
+    assert "_id" not in rows[0]
+
+@pytest.mark.asyncio
+async def test_export_orders_mixed_timezones(order_client, mock_order_repo):
+    """Testar que limites com e sem fuso são normalizados para UTC sem tzinfo"""
+    calls = []
+
+    async def fake_iter(start, end, batch_size):
+        calls.append((start, end))
+        for doc in _stored_orders(1):
+            yield doc
+
+    mock_order_repo.iter_created_between = fake_iter
+    async with order_client as ac:
+        r = await ac.get("/orders/export", params={"start": "2025-01-01T00:00:00Z", "end": "2025-01-02"})
+        shifted = await ac.get("/orders/export", params={"start": "2025-01-01T20:00:00-03:00", "end": "2025-01-02"})
+        # 22h em -03:00 já é 01h UTC do dia 2, depois do fim
+        inverted = await ac.get("/orders/export", params={
+            "start": "2025-01-01T22:00:00-03:00", "end": "2025-01-02T00:30:00",
+        })
+
+    assert r.status_code == 200 and shifted.status_code == 200
+    assert calls == [
+        (datetime(2025, 1, 1), datetime(2025, 1, 2)),
+        (datetime(2025, 1, 1, 23), datetime(2025, 1, 2)),
+    ]
+    assert all(bound.tzinfo is None for call in calls for bound in call)
+    assert inverted.status_code == 400
+
+@pytest.mark.asyncio
+async def test_update_status_single_round_trip(order_client, mock_order_repo):
+    """Testar transição válida sem leitura extra"""
+    order = Order(
+        id="ORD-1", customer_name="Maria", customer_phone="0",
+        items=[OrderItem(product_id="p1", name="P1", quantity=1, price=10.0)],
+        total_price=10.0, status=OrderStatus.EM_PREPARO,
+    )
+    mock_order_repo.transition_status = AsyncMock(return_value=(order, OrderStatus.RECEBIDO))
+    async with order_client as ac:
+        r = await ac.patch("/orders/ORD-1/status/em_preparo")
+
+    assert r.status_code == 200
+    assert r.json()["status"] == "em_preparo"
+    mock_order_repo.by_id.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_update_status_invalid_transition(order_client, mock_order_repo):
+    """Testar 409 para transição não permitida e 404 para pedido inexistente"""
+    mock_order_repo.by_id.return_value = Order(**_order_payload(id="ORD-1", status="entregue"))
+    async with order_client as ac:
+        r = await ac.patch("/orders/ORD-1/status/recebido")
+        mock_order_repo.by_id.return_value = None
+        missing = await ac.patch("/orders/ORD-9/status/em_preparo")
+
+    assert r.status_code == 409
+    assert "entregue" in r.json()["detail"]
+    assert missing.status_code == 404
+    mock_order_repo.by_id.assert_awaited_with("ORD-9")
+
+@pytest.mark.asyncio
+async def test_transition_filter_enforces_table():
+    """Testar o filtro atômico montado pelo repositório"""
+    col = AsyncMock()
+    col.find_one_and_update = AsyncMock(return_value=None)
+
+    assert await MongoOrderRepo(col).transition_status("ORD-1", OrderStatus.PRONTO) is None
+    assert await MongoOrderRepo(col).transition_status("ORD-1", OrderStatus.RECEBIDO) is None
+
+    col.find_one_and_update.assert_awaited_once()
+    query = col.find_one_and_update.await_args.args[0]
+    assert query == {"_id": "ORD-1", "status": {"$in": ["em_preparo"]}}
+
+@pytest.mark.asyncio
+async def test_order_counters_follow_writes_and_reconcile(mock_order_repo):
+    """Testar contadores incrementais, endpoint O(1) e correção de desvio"""
+    from app.api.deps import get_order_counters
+    from app.services.order_counters import COUNTER_NAME, OrderStatusCounters
+
+    counters = OrderStatusCounters(MemoryCounterRepo())
+    svc = OrderService(mock_order_repo, counters=counters)
+    await svc.create(Order(**_order_payload(id="ORD-1")))
+    await svc.create(Order(**_order_payload(id="ORD-2")))
+    order = Order(**_order_payload(id="ORD-1"))
+    mock_order_repo.transition_status.return_value = (
+        order.model_copy(update={"status": OrderStatus.EM_PREPARO}), OrderStatus.RECEBIDO
+    )
+    await svc.update_status("ORD-1", OrderStatus.EM_PREPARO)
+
+    assert counters.repo.docs[COUNTER_NAME] == {"recebido": 1, "em_preparo": 1}
+    app.dependency_overrides[get_order_counters] = lambda: counters
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            stats = (await ac.get("/orders/stats")).json()
+    finally:
+        app.dependency_overrides.clear()
+    assert stats["counts"]["recebido"] == 1 and stats["active"] == 2
+    mock_order_repo.list_all.assert_not_awaited()
+
+    # Um pedido gravado por fora dos serviços aparece na reconciliação
+    mock_order_repo.count_by_status = AsyncMock(return_value={
+        **{s: 0 for s in OrderStatus}, OrderStatus.RECEBIDO: 2, OrderStatus.EM_PREPARO: 1
+    })
+    drift = await counters.reconcile(mock_order_repo)
+    assert drift == {OrderStatus.RECEBIDO: 1}
+    assert counters.repo.docs[COUNTER_NAME]["recebido"] == 2
+    assert counters.counts[OrderStatus.RECEBIDO] == 2
+
+@pytest.mark.asyncio
+async def test_reconcile_keeps_concurrent_increments():
+    """Testar que a reconciliação aplica só o desvio e adia se houver escritas na contagem"""
+    from app.services.order_counters import COUNTER_NAME, OrderStatusCounters
+
+    repo = MemoryCounterRepo()
+    counters = OrderStatusCounters(repo)
+    await repo.increment(COUNTER_NAME, {"recebido": 1})
+    orders = AsyncMock(spec=MongoOrderRepo)
+
+    async def count_during_write():
+        # Outro worker cria um pedido enquanto a contagem roda
+        await repo.increment(COUNTER_NAME, {"recebido": 1})
+        return {**{s: 0 for s in OrderStatus}, OrderStatus.RECEBIDO: 2}
+    orders.count_by_status = AsyncMock(side_effect=count_during_write)
+    assert await counters.reconcile(orders) is None
+    assert repo.docs[COUNTER_NAME] == {"recebido": 2}
+
+    orders.count_by_status = AsyncMock(return_value={**{s: 0 for s in OrderStatus}, OrderStatus.RECEBIDO: 3})
+    assert await counters.reconcile(orders) == {OrderStatus.RECEBIDO: 1}
+    assert repo.docs[COUNTER_NAME] == {"recebido": 3}
@@ -0,0 +1,52 @@
+import pytest
+from datetime import datetime
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.infra.pagination import (
+    ORDER_SORT, PRODUCT_SORT, InvalidCursorError,
+    decode_cursor, encode_cursor, keyset_filter, paginate_query,
+)
+
+def test_cursor_roundtrip_with_datetime():
+    """Testar que o cursor preserva datetime e id"""
+    created_at = datetime(2025, 11, 11, 18, 30, 15, 123000)
+    token = encode_cursor(created_at, "ORD-001")
+    assert decode_cursor(token, 2) == [created_at, "ORD-001"]
+
+def test_invalid_cursor():
+    """Testar que cursores malformados são rejeitados"""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("não-é-um-cursor", 2)
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor("a"), 2)
+
+def test_keyset_filter_ascending():
+    """Testar o filtro de keyset para ordenação crescente"""
+    assert keyset_filter(PRODUCT_SORT, ["Calabresa", "pizza_001"]) == {"$or": [
+        {"name": {"$gt": "Calabresa"}},
+        {"name": "Calabresa", "_id": {"$gt": "pizza_001"}},
+    ]}
+
+def test_paginate_query_descending():
+    """Testar a combinação do filtro base com o cursor de pedidos"""
+    created_at = datetime(2025, 11, 11)
+    query = paginate_query({"status": "recebido"}, ORDER_SORT, encode_cursor(created_at, "ORD-9"))
+    assert query == {"$and": [
+        {"status": "recebido"},
+        {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": "ORD-9"}},
+        ]},
+    ]}
+
+@pytest.mark.asyncio
+async def test_list_products_invalid_cursor():
+    """Testar que cursor inválido retorna 400 sem consultar o banco"""
+    async with AsyncClient(
+        transport=ASGITransport(app=app),
+        base_url="http://test"
+    ) as ac:
+        r = await ac.get("/products", params={"cursor": "xyz"})
+        assert r.status_code == 400
+        r = await ac.get("/orders", params={"cursor": "xyz"})
+        assert r.status_code == 400
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import AsyncMock
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+from app.domain.order_entities import Order, OrderItem
+from app.infra.cache import CachedProductRepo, TTLCache
+from app.infra.repos import INVALID
+from app.services.order_service import OrderService
+from app.services.pricing_service import PricingError, PricingService
+
+CATALOG = {
+    "pizza_001": Pizza(
+        id="pizza_001", name="Calabresa", category=ProductCategory.PIZZA, price=30.0,
+        sizes=[PizzaSize(size_cm=35, price=30.0), PizzaSize(size_cm=45, price=42.5)],
+    ),
+    "bebida_001": Product(id="bebida_001", name="Refrigerante", category=ProductCategory.BEBIDA, price=8.5),
+    "bebida_002": Product(id="bebida_002", name="Suco", category=ProductCategory.BEBIDA, price=6.0, active=False),
+}
+
+class FakeProductRepo:
+    def __init__(self):
+        self.calls = []
+
+    async def by_ids(self, pids):
+        self.calls.append(list(pids))
+        return {pid: CATALOG[pid] for pid in pids if pid in CATALOG}
+
+def _order(items, total, oid="ORD-1"):
+    return Order(
+        id=oid,
+        customer_name="Maria",
+        customer_phone="0",
+        items=[OrderItem(**i) for i in items],
+        total_price=total,
+    )
+
+def _pizza(size, price, qty=1):
+    return {"product_id": "pizza_001", "name": "x", "quantity": qty, "price": price, "size_cm": size}
+
+def _drink(qty=1, price=8.5):
+    return {"product_id": "bebida_001", "name": "x", "quantity": qty, "price": price}
+
+@pytest.mark.asyncio
+async def test_30_item_order_priced_with_one_lookup():
+    """Testar pedido de 30 itens precificado com uma única consulta"""
+    repo = FakeProductRepo()
+    items = [_pizza(45, 42.5) for _ in range(15)] + [_drink(2) for _ in range(15)]
+    order = await PricingService(repo).price(_order(items, 15 * 42.5 + 15 * 17.0))
+
+    assert len(repo.calls) == 1
+    assert order.total_price == 892.5
+    assert order.items[0].name == "Calabresa"
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("items,total,message", [
+    ([_pizza(45, 30.0)], 30.0, "difere do cardápio"),
+    ([_pizza(None, 30.0)], 30.0, "size_cm"),
+    ([_pizza(40, 30.0)], 30.0, "indisponível"),
+    ([_drink(), _pizza(35, 30.0)], 30.0, "Total informado"),
+    ([{"product_id": "bebida_002", "name": "Suco", "quantity": 1, "price": 6.0}], 6.0, "inativo"),
+    ([{"product_id": "nao_existe", "name": "?", "quantity": 1, "price": 1.0}], 1.0, "não encontrado"),
+])
+async def test_pricing_rejects_mismatches(items, total, message):
+    with pytest.raises(PricingError, match=message):
+        await PricingService(FakeProductRepo()).price(_order(items, total))
+
+@pytest.mark.asyncio
+async def test_cached_repo_by_ids_fetches_only_missing():
+    """Testar que o cache de produtos atende o que puder e busca o resto em lote"""
+    inner = AsyncMock()
+    inner.by_ids = AsyncMock(side_effect=lambda pids: {p: CATALOG[p] for p in pids if p in CATALOG})
+    repo = CachedProductRepo(inner, TTLCache())
+    await repo.by_ids(["pizza_001"])
+    found = await repo.by_ids(["pizza_001", "bebida_001", "pizza_001"])
+
+    assert set(found) == {"pizza_001", "bebida_001"}
+    assert inner.by_ids.await_args_list[1].args[0] == ["bebida_001"]
+
+@pytest.mark.asyncio
+async def test_create_many_reports_pricing_failures(mock_order_repo):
+    """Testar lote com um pedido mal precificado: os demais são gravados"""
+    mock_order_repo.insert_many = AsyncMock(return_value={})
+    svc = OrderService(mock_order_repo, pricing=PricingService(FakeProductRepo()))
+    orders = [
+        _order([_drink()], 8.5, oid="A"),
+        _order([_drink()], 1.0, oid="B"),
+        _order([_pizza(35, 30.0)], 30.0, oid="C"),
+    ]
+    failures = await svc.create_many(orders)
+
+    assert list(failures) == [1] and failures[1][0] == INVALID
+    assert [o.id for o in mock_order_repo.insert_many.await_args.args[0]] == ["A", "C"]
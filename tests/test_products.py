@@ -164,4 +164,215 @@ async def test_pizza_price_validation():
 async def test_pizza_negative_price_validation():
     """Testar validação de preço negativo em pizza"""
     with pytest.raises(ValueError):
-        PizzaSize(size_cm=35, price=-10.00)
\ No newline at end of file
+        PizzaSize(size_cm=35, price=-10.00)
+
+@pytest.mark.asyncio
+async def test_import_products_validates_and_batches():
+    """Testar importação em lote: uma escrita, linhas inválidas rejeitadas"""
+    from unittest.mock import AsyncMock
+    from app.services.product_service import ProductService, parse_catalog_payload
+
+    raw = b"\n".join([
+        b'{"id": "bebida_010", "name": "Suco", "category": "bebida", "price": 6.0}',
+        b'{"id": "pizza_010", "name": "Marguerita", "price": 30.0, "sizes": [{"size_cm": 35, "price": 30.0}]}',
+        b'{"id": "pizza_011", "name": "Sem tamanho", "category": "pizza", "price": 30.0}',
+        b'{isto nao e json',
+        b'{"id": "bebida_010", "name": "Suco repetido", "category": "bebida", "price": 6.0}',
+    ])
+    repo = AsyncMock()
+    repo.bulk_upsert = AsyncMock(return_value={"inserted": 1, "updated": 1, "unchanged": 0})
+
+    report = await ProductService(repo).import_products(parse_catalog_payload(raw))
+
+    repo.bulk_upsert.assert_awaited_once()
+    saved = repo.bulk_upsert.await_args.args[0]
+    assert [p.id for p in saved] == ["bebida_010", "pizza_010"]
+    assert isinstance(saved[1], Pizza)
+    assert (report.inserted, report.updated) == (1, 1)
+    assert [r.index for r in report.rejected] == [2, 3, 4]
+
+@pytest.mark.asyncio
+async def test_list_responses_match_output_models(mock_product_repo):
+    """Testar que a serialização direta do domínio segue ProductOut/PizzaOut"""
+    from app.api.deps import get_product_service
+    from app.api.routers.products import PizzaOut, ProductOut
+    from app.services.product_service import ProductService
+
+    pizza = Pizza(
+        id="pizza_001", name="Calabresa", category=ProductCategory.PIZZA, price=30.0,
+        sizes=[PizzaSize(size_cm=35, price=30.0)],
+    )
+    mock_product_repo.list_active.return_value = [pizza]
+    mock_product_repo.list_by_category.return_value = [pizza]
+    app.dependency_overrides[get_product_service] = lambda: ProductService(mock_product_repo)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            products = (await ac.get("/products?limit=1")).json()
+            pizzas = (await ac.get("/products/pizzas")).json()
+    finally:
+        app.dependency_overrides.clear()
+
+    assert list(products[0]) == list(ProductOut.model_fields)
+    assert list(pizzas[0]) == list(PizzaOut.model_fields)
+    assert ProductOut.model_validate(products[0]) == ProductOut(**pizza.model_dump())
+
+@pytest.mark.asyncio
+async def test_catalog_etag_not_modified(mock_product_repo):
+    """Testar 304 sem consultar o repositório até a próxima escrita no catálogo"""
+    from app.api.deps import get_catalog_responses, get_product_service
+    from app.api.responses import ConditionalCatalog
+    from app.infra.cache import TTLCache
+    from app.services.product_service import CatalogVersion, ProductService
+
+    mock_product_repo.list_active.return_value = [
+        Product(id="bebida_001", name="Suco", category=ProductCategory.BEBIDA, price=6.0)
+    ]
+    svc = ProductService(mock_product_repo, catalog=CatalogVersion())
+    conditional = ConditionalCatalog(TTLCache())
+    app.dependency_overrides[get_product_service] = lambda: svc
+    app.dependency_overrides[get_catalog_responses] = lambda: conditional
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.get("/products")
+            etag = first.headers["ETag"]
+            second = await ac.get("/products", headers={"If-None-Match": etag})
+            assert second.status_code == 304 and second.headers["ETag"] == etag
+            assert mock_product_repo.list_active.await_count == 1
+
+            await svc.create(Product(id="bebida_002", name="Água", category=ProductCategory.BEBIDA, price=3.0))
+            third = await ac.get("/products", headers={"If-None-Match": etag})
+    finally:
+        app.dependency_overrides.clear()
+
+    # Após a escrita a versão muda: consulta de novo; mesmo conteúdo ainda dá 304
+    assert mock_product_repo.list_active.await_count == 2
+    assert third.status_code == 304
+
+@pytest.mark.asyncio
+async def test_catalog_write_in_other_worker_changes_etag(mock_product_repo):
+    """Testar que a escrita de outro worker invalida as ETags via contador compartilhado"""
+    from app.api.deps import get_catalog_responses, get_product_service
+    from app.api.responses import ConditionalCatalog
+    from app.infra.cache import TTLCache
+    from app.infra.memory import MemoryCounterRepo
+    from app.services.product_service import CatalogVersion, ProductService
+
+    suco = Product(id="bebida_001", name="Suco", category=ProductCategory.BEBIDA, price=6.0)
+    mock_product_repo.list_active.return_value = [suco]
+    mock_product_repo.by_id.return_value = suco
+    counters = MemoryCounterRepo()
+    here, other = CatalogVersion(counters), CatalogVersion(counters)
+    expired = []
+    here.subscribe(lambda: expired.append(True))
+    await here.refresh()
+
+    svc = ProductService(mock_product_repo, catalog=here)
+    conditional = ConditionalCatalog(TTLCache())
+    app.dependency_overrides[get_product_service] = lambda: svc
+    app.dependency_overrides[get_catalog_responses] = lambda: conditional
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            etag = (await ac.get("/products")).headers["ETag"]
+
+            # Outro worker edita o produto
+            await ProductService(mock_product_repo, catalog=other).update("bebida_001", {"price": 7.0})
+            mock_product_repo.list_active.return_value = [suco.model_copy(update={"price": 7.0})]
+            stale = await ac.get("/products", headers={"If-None-Match": etag})
+            assert await here.refresh() is True
+            fresh = await ac.get("/products", headers={"If-None-Match": etag})
+    finally:
+        app.dependency_overrides.clear()
+
+    # Antes do refresh a versão local não mudou (janela de CATALOG_VERSION_REFRESH_SECONDS)
+    assert stale.status_code == 304
+    assert fresh.status_code == 200 and fresh.headers["ETag"] != etag
+    assert expired == [True]
+
+@pytest.mark.asyncio
+async def test_products_batch_preserves_order(mock_product_repo):
+    """Testar /products/batch: ordem dos IDs, pizzas com tamanhos e IDs ausentes"""
+    from app.api.deps import get_product_service
+    from app.infra.loader import ProductLoader
+    from app.services.product_service import ProductService
+
+    pizza = Pizza(
+        id="pizza_001", name="Calabresa", category=ProductCategory.PIZZA, price=30.0,
+        sizes=[PizzaSize(size_cm=35, price=30.0)],
+    )
+    suco = Product(id="bebida_001", name="Suco", category=ProductCategory.BEBIDA, price=6.0)
+    mock_product_repo.by_ids.return_value = {"bebida_001": suco, "pizza_001": pizza}
+    app.dependency_overrides[get_product_service] = lambda: ProductService(ProductLoader(mock_product_repo))
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.get("/products/batch?ids=bebida_001,nada&ids=pizza_001&ids=bebida_001")
+            too_many = await ac.get("/products/batch", params={"ids": ",".join(f"p{i}" for i in range(101))})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert resp.status_code == 200
+    assert [p["id"] for p in resp.json()] == ["bebida_001", "pizza_001"]
+    assert resp.json()[1]["sizes"] == [{"size_cm": 35, "price": 30.0}]
+    assert resp.headers["X-Missing-Ids"] == "nada"
+    mock_product_repo.by_ids.assert_awaited_once_with(["bebida_001", "nada", "pizza_001"])
+    assert too_many.status_code == 400
+
+@pytest.mark.asyncio
+async def test_loader_coalesces_concurrent_by_id(mock_product_repo):
+    """Testar que by_id concorrentes viram um único by_ids e ficam memorizados"""
+    import asyncio
+    from app.infra.loader import ProductLoader
+
+    suco = Product(id="bebida_001", name="Suco", category=ProductCategory.BEBIDA, price=6.0)
+    mock_product_repo.by_ids.return_value = {"bebida_001": suco}
+    loader = ProductLoader(mock_product_repo)
+
+    results = await asyncio.gather(loader.by_id("bebida_001"), loader.by_id("nada"), loader.by_id("bebida_001"))
+    assert results == [suco, None, suco]
+    mock_product_repo.by_ids.assert_awaited_once_with(["bebida_001", "nada"])
+
+    assert await loader.by_id("bebida_001") is suco
+    assert await loader.by_ids(["nada", "bebida_001"]) == {"bebida_001": suco}
+    assert loader.batches == 1 and mock_product_repo.by_ids.await_count == 1
+
+@pytest.mark.asyncio
+async def test_loaders_of_concurrent_requests_share_one_query():
+    """Testar que loaders de requisições concorrentes dividem a mesma consulta"""
+    import asyncio
+    from unittest.mock import AsyncMock
+    from app.infra.cache import CachedProductRepo, TTLCache
+    from app.infra.loader import ProductLoader
+    from app.infra.repos import MongoProductRepo
+    from app.infra.singleflight import PRODUCT_READS, PRODUCT_WRITES, SingleFlight, SingleFlightRepo
+
+    suco = Product(id="bebida_001", name="Suco", category=ProductCategory.BEBIDA, price=6.0)
+    release = asyncio.Event()
+    inner = AsyncMock(spec=MongoProductRepo)
+
+    async def by_ids(pids):
+        await release.wait()
+        return {"bebida_001": suco}
+    inner.by_ids = AsyncMock(side_effect=by_ids)
+    repo = CachedProductRepo(
+        SingleFlightRepo(inner, SingleFlight("test"), PRODUCT_READS, PRODUCT_WRITES), TTLCache(max_entries=10, ttl_seconds=60)
+    )
+
+    # Um loader por requisição, como em deps.get_product_loader
+    tasks = [asyncio.create_task(ProductLoader(repo).by_id("bebida_001")) for _ in range(10)]
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == [suco] * 10
+    inner.by_ids.assert_awaited_once_with(["bebida_001"])
+
+@pytest.mark.asyncio
+async def test_loader_batch_failure_reaches_waiters(mock_product_repo):
+    """Testar que o erro do lote chega a todos os chamadores e a task é liberada"""
+    import asyncio
+    from app.infra.loader import ProductLoader
+
+    mock_product_repo.by_ids.side_effect = ValueError("falhou")
+    loader = ProductLoader(mock_product_repo)
+
+    results = await asyncio.gather(loader.by_id("a"), loader.by_id("b"), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert not loader._tasks
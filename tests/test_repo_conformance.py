@@ -0,0 +1,151 @@
+"""Conformidade dos backends de repositório (MongoDB e memória).
+
+Os mesmos testes rodam nos dois backends; o MongoDB usa um banco temporário
+em MONGO_URI e é pulado se não estiver acessível.
+"""
+
+import pytest
+import uuid
+from datetime import datetime, timedelta
+from motor.motor_asyncio import AsyncIOMotorClient
+from app.core.settings import settings
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+from app.domain.order_entities import Order, OrderItem, OrderStatus
+from app.infra.indexes import ensure_indexes
+from app.infra.memory import MemoryOrderRepo, MemoryProductRepo
+from app.infra.pagination import order_cursor, product_cursor
+from app.infra.repos import DUPLICATE, INVALID, DuplicateError, MongoOrderRepo, MongoProductRepo
+
+@pytest.fixture(params=["memory", "mongo"])
+async def repos(request):
+    if request.param == "memory":
+        yield MemoryProductRepo(), MemoryOrderRepo()
+        return
+    client = AsyncIOMotorClient(settings.MONGO_URI, serverSelectionTimeoutMS=300)
+    try:
+        await client.admin.command("ping")
+    except Exception:
+        client.close()
+        pytest.skip("MongoDB indisponível")
+    db = client[f"{settings.MONGO_DB}_conformance_{uuid.uuid4().hex[:8]}"]
+    await ensure_indexes(db)
+    try:
+        yield MongoProductRepo(db["products"]), MongoOrderRepo(db["orders"])
+    finally:
+        await client.drop_database(db.name)
+        client.close()
+
+def _product(pid, name, category=ProductCategory.BEBIDA, **kw):
+    return Product(id=pid, name=name, category=category, price=kw.pop("price", 5.0), **kw)
+
+def _pizza(pid, name):
+    return Pizza(
+        id=pid, name=name, category=ProductCategory.PIZZA, price=30.0,
+        sizes=[PizzaSize(size_cm=35, price=30.0), PizzaSize(size_cm=45, price=42.0)],
+    )
+
+BASE = datetime(2025, 11, 10, 12, 0, 0, 123000)
+
+def _order(oid, minutes=0, status=OrderStatus.RECEBIDO):
+    created = BASE + timedelta(minutes=minutes)
+    return Order(
+        id=oid, customer_name="Maria", customer_phone="0",
+        items=[OrderItem(product_id="p1", name="Suco", quantity=1, price=5.0)],
+        total_price=5.0, status=status, created_at=created, updated_at=created,
+    )
+
+async def _pages(list_page, limit, make_cursor):
+    """Percorrer todas as páginas com cursor"""
+    seen, cursor = [], None
+    while True:
+        page = await list_page(limit=limit, cursor=cursor)
+        seen.extend(page)
+        if len(page) < limit:
+            return seen
+        cursor = make_cursor(page[-1])
+
+@pytest.mark.asyncio
+async def test_product_lists_sort_and_paginate(repos):
+    products, _ = repos
+    catalog = [
+        _product("b3", "Suco"), _product("b1", "Água"), _product("b2", "Suco"),
+        _product("b4", "Cerveja", active=False), _pizza("z1", "Calabresa"), _pizza("z2", "Atum"),
+    ]
+    for p in catalog:
+        await products.insert(p)
+
+    active = await _pages(products.list_active, 2, product_cursor)
+    assert [p.id for p in active] == ["z2", "z1", "b2", "b3", "b1"]
+    assert [p.id for p in await products.list_active(skip=1, limit=2)] == ["z1", "b2"]
+    pizzas = await products.list_by_category(ProductCategory.PIZZA)
+    assert [p.id for p in pizzas] == ["z2", "z1"]
+    assert pizzas[0] == catalog[5]
+
+    with pytest.raises(ValueError):
+        await products.list_active(limit=0)
+    with pytest.raises(ValueError):
+        await products.list_active(skip=1, cursor=product_cursor(active[0]))
+
+@pytest.mark.asyncio
+async def test_product_writes(repos):
+    products, _ = repos
+    await products.insert(_product("b1", "Água"))
+    await products.insert(_product("b2", "Suco"))
+    with pytest.raises(DuplicateError):
+        await products.insert(_product("b1", "Outro"))
+
+    # Mudar de categoria e desativar tira o produto das listas antigas
+    await products.save(_product("b1", "Água", category=ProductCategory.ESFIHA))
+    assert [p.id for p in await products.list_by_category(ProductCategory.BEBIDA)] == ["b2"]
+    await products.save(_product("b2", "Suco", active=False))
+    assert [p.id for p in await products.list_active()] == ["b1"]
+
+    found = await products.by_ids(["b2", "nada", "b1", "b2"])
+    assert list(found) == ["b2", "b1"]
+    assert await products.by_id("nada") is None
+
+    counts = await products.bulk_upsert([
+        _product("b1", "Água", category=ProductCategory.ESFIHA),
+        _product("b2", "Suco", price=7.0),
+        _product("b5", "Chá"),
+    ])
+    assert counts == {"inserted": 1, "updated": 1, "unchanged": 1}
+    assert (await products.by_id("b2")).price == 7.0
+
+@pytest.mark.asyncio
+async def test_order_lists_sort_and_paginate(repos):
+    _, orders = repos
+    # Dois pedidos no mesmo instante: desempate por _id decrescente
+    batch = [_order("o1", 0), _order("o2", 5), _order("o3", 5), _order("o4", 10, OrderStatus.PRONTO)]
+    failures = await orders.insert_many(batch + [_order("o1", 20), _order("o5", 20).model_copy(update={"items": []})])
+    assert failures == {4: (DUPLICATE, failures[4][1]), 5: (INVALID, failures[5][1])}
+
+    everything = await _pages(orders.list_all, 3, order_cursor)
+    assert [o.id for o in everything] == ["o4", "o3", "o2", "o1"]
+    received = await _pages(lambda **kw: orders.list_by_status(OrderStatus.RECEBIDO, **kw), 1, order_cursor)
+    assert [o.id for o in received] == ["o3", "o2", "o1"]
+    assert (await orders.by_id("o4")).created_at == batch[3].created_at
+
+    docs = [d async for d in orders.iter_created_between(BASE + timedelta(minutes=5), BASE + timedelta(minutes=10))]
+    assert [d["_id"] for d in docs] == ["o2", "o3"]
+    assert "schema_version" not in docs[0]
+
+@pytest.mark.asyncio
+async def test_order_status_transitions(repos):
+    _, orders = repos
+    await orders.insert(_order("o1"))
+    with pytest.raises(DuplicateError):
+        await orders.insert(_order("o1"))
+
+    updated, previous = await orders.transition_status("o1", OrderStatus.EM_PREPARO)
+    assert (updated.status, previous) == (OrderStatus.EM_PREPARO, OrderStatus.RECEBIDO)
+    assert await orders.transition_status("o1", OrderStatus.EM_PREPARO) is None
+    assert await orders.transition_status("nada", OrderStatus.PRONTO) is None
+    assert [o.id for o in await orders.list_by_status(OrderStatus.EM_PREPARO)] == ["o1"]
+    assert await orders.list_by_status(OrderStatus.RECEBIDO) == []
+
+    await orders.update_status("o1", OrderStatus.CANCELADO)
+    counts = await orders.count_by_status()
+    assert counts[OrderStatus.CANCELADO] == 1 and sum(counts.values()) == 1
+    with pytest.raises(ValueError):
+        await orders.update_status("nada", OrderStatus.PRONTO)
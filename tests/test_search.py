@@ -0,0 +1,80 @@
+import pytest
+from httpx import AsyncClient, ASGITransport
+from app.main import app
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+from app.infra.search import MenuSearchIndex, edit_distance, fold
+from app.services.product_service import CatalogVersion, ProductService
+
+def _pizza(pid, name, description=None):
+    return Pizza(
+        id=pid, name=name, category=ProductCategory.PIZZA, price=30.0, description=description,
+        sizes=[PizzaSize(size_cm=35, price=30.0)],
+    )
+
+MENU = [
+    _pizza("pizza_001", "Calabresa", "Calabresa fatiada, cebola e azeitonas"),
+    _pizza("pizza_002", "Portuguesa", "Presunto, ovos, cebola e ervilha"),
+    _pizza("pizza_003", "Frango com Catupiry", "Frango desfiado e catupiry"),
+    Product(id="bebida_001", name="Açaí na tigela", category=ProductCategory.BEBIDA, price=15.0),
+    Product(id="esfiha_001", name="Esfiha de calabresa", category=ProductCategory.ESFIHA, price=6.0),
+]
+
+def _ids(products):
+    return [p.id for p in products]
+
+def test_fold_and_edit_distance():
+    assert fold("Açaí São João") == "acai sao joao"
+    assert edit_distance("portugesa", "portuguesa", 2) == 1
+    assert edit_distance("calabersa", "calabresa", 2) == 1  # transposição
+    assert edit_distance("frango", "calabresa", 2) == 3
+
+def test_search_prefix_accents_and_typos():
+    """Testar prefixo, acentos, erros de digitação e todos os termos obrigatórios"""
+    index = MenuSearchIndex()
+    index.rebuild(MENU)
+
+    # Nome pesa mais que descrição
+    assert _ids(index.search("calab")) == ["pizza_001", "esfiha_001"]
+    assert _ids(index.search("portugesa")) == ["pizza_002"]
+    assert _ids(index.search("ACAI")) == ["bebida_001"]
+    assert _ids(index.search("frango catupiri")) == ["pizza_003"]
+    assert _ids(index.search("cebola")) == ["pizza_001", "pizza_002"]
+    assert index.search("cebola frango") == []
+    assert index.search("xyz") == []
+
+def test_search_index_follows_writes():
+    index = MenuSearchIndex()
+    index.rebuild(MENU)
+
+    index.upsert(MENU[1].model_copy(update={"name": "Marguerita"}))
+    assert index.search("portuguesa") == []
+    assert _ids(index.search("marguer")) == ["pizza_002"]
+
+    index.upsert(MENU[0].model_copy(update={"active": False}))
+    assert _ids(index.search("calabresa")) == ["esfiha_001"]
+    assert len(index) == 4
+
+@pytest.mark.asyncio
+async def test_search_endpoint_loads_index_once(mock_product_repo):
+    """Testar que a busca carrega o índice uma vez e acompanha as escritas"""
+    from app.api.deps import get_product_service
+
+    mock_product_repo.list_active.return_value = MENU
+    svc = ProductService(mock_product_repo, catalog=CatalogVersion(), index=MenuSearchIndex())
+    app.dependency_overrides[get_product_service] = lambda: svc
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = await ac.get("/products/search", params={"q": "calab"})
+            await ac.get("/products/search", params={"q": "portugesa"})
+            await svc.create(_pizza("pizza_004", "Calabresa Especial"))
+            after_write = await ac.get("/products/search", params={"q": "calab", "limit": 5})
+            empty = await ac.get("/products/search", params={"q": "!!"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert [p["id"] for p in first.json()] == ["pizza_001", "esfiha_001"]
+    assert first.json()[0]["sizes"] == [{"size_cm": 35, "price": 30.0}]
+    assert [p["id"] for p in after_write.json()] == ["pizza_001", "pizza_004", "esfiha_001"]
+    assert mock_product_repo.list_active.await_count == 1
+    assert empty.status_code == 400
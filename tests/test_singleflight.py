@@ -0,0 +1,166 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from httpx import AsyncClient, ASGITransport
+from app.infra.repos import MongoProductRepo
+from app.infra.singleflight import PRODUCT_READS, PRODUCT_WRITES, SingleFlight, SingleFlightRepo
+from app.domain.entities import Pizza, PizzaSize, Product, ProductCategory
+
+def _product(pid="bebida_001"):
+    return Product(id=pid, name="Suco", category=ProductCategory.BEBIDA, price=6.0)
+
+def _slow(result=None, error=None):
+    """Leitura que só termina quando o evento for liberado"""
+    release = asyncio.Event()
+    calls = []
+
+    async def read(*args, **kwargs):
+        calls.append((args, kwargs))
+        await release.wait()
+        if error:
+            raise error
+        return result
+    return read, release, calls
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_query():
+    """Testar que chamadas iguais e concorrentes executam uma única leitura"""
+    repo = AsyncMock(spec=MongoProductRepo)
+    read, release, calls = _slow(result=[_product()])
+    repo.list_active = read
+    sf = SingleFlightRepo(repo, SingleFlight("test"), PRODUCT_READS, PRODUCT_WRITES)
+
+    tasks = [asyncio.create_task(sf.list_active(limit=10)) for _ in range(50)]
+    other = asyncio.create_task(sf.list_active(limit=20))
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, other)
+
+    assert len(calls) == 2
+    assert all(r == [_product()] for r in results)
+    # Cada chamador recebe sua própria lista
+    results[0].clear()
+    assert results[1] == [_product()]
+    assert len(sf.flight) == 0
+
+@pytest.mark.asyncio
+async def test_errors_propagate_to_all_waiters():
+    """Testar que a exceção da leitura compartilhada chega a todos os chamadores"""
+    flight = SingleFlight("test")
+    read, release, calls = _slow(error=ValueError("falhou"))
+
+    tasks = [asyncio.create_task(flight.do("k", read)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(flight) == 0
+
+@pytest.mark.asyncio
+async def test_cancellation_only_stops_query_when_last_waiter_leaves():
+    """Testar que cancelar um chamador não afeta os demais"""
+    flight = SingleFlight("test")
+    read, release, calls = _slow(result="ok")
+
+    first = asyncio.create_task(flight.do("k", read))
+    second = asyncio.create_task(flight.do("k", read))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == "ok"
+    assert first.cancelled()
+    assert len(calls) == 1
+
+    release.clear()
+    lone = asyncio.create_task(flight.do("k", read))
+    await asyncio.sleep(0)
+    shared = next(iter(flight._calls.values())).task
+    lone.cancel()
+    await asyncio.gather(lone, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert shared.cancelled()
+    assert len(flight) == 0
+
+@pytest.mark.asyncio
+async def test_write_stops_sharing_in_flight_reads():
+    """Testar que leituras iniciadas após uma escrita não reaproveitam a anterior"""
+    repo = AsyncMock(spec=MongoProductRepo)
+    read, release, calls = _slow(result=_product())
+    repo.by_id = read
+    sf = SingleFlightRepo(repo, SingleFlight("test"), PRODUCT_READS, PRODUCT_WRITES)
+
+    before = asyncio.create_task(sf.by_id("bebida_001"))
+    await asyncio.sleep(0)
+    await sf.save(_product())
+    after = asyncio.create_task(sf.by_id("bebida_001"))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(before, after)
+
+    repo.save.assert_awaited_once()
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_by_ids_shared_regardless_of_order():
+    """Testar que by_ids com os mesmos IDs é coalescido e não descarta outras leituras"""
+    repo = AsyncMock(spec=MongoProductRepo)
+    read, release, calls = _slow(result={"bebida_001": _product()})
+    repo.by_ids = read
+    list_read, list_release, list_calls = _slow(result=[_product()])
+    repo.list_active = list_read
+    sf = SingleFlightRepo(repo, SingleFlight("test"), PRODUCT_READS, PRODUCT_WRITES)
+
+    lists = [asyncio.create_task(sf.list_active(limit=10))]
+    batches = [asyncio.create_task(sf.by_ids(["bebida_001", "nada"])) for _ in range(5)]
+    batches.append(asyncio.create_task(sf.by_ids(["nada", "bebida_001"])))
+    await asyncio.sleep(0)
+    lists.append(asyncio.create_task(sf.list_active(limit=10)))
+    await asyncio.sleep(0)
+    release.set()
+    list_release.set()
+    results = await asyncio.gather(*batches, *lists)
+
+    assert len(calls) == 1 and len(list_calls) == 1
+    assert results[0] == {"bebida_001": _product()} and results[0] is not results[1]
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_product_read(monkeypatch):
+    """Testar pela cadeia real de dependências que GETs concorrentes fazem uma consulta"""
+    from app.api import deps
+    from app.infra.cache import product_cache
+    from app.main import app
+
+    pizza = Pizza(
+        id="pizza_001", name="Calabresa", category=ProductCategory.PIZZA, price=30.0,
+        sizes=[PizzaSize(size_cm=35, price=30.0)],
+    )
+    repo = AsyncMock(spec=MongoProductRepo)
+    read, release, calls = _slow(result={"pizza_001": pizza})
+    repo.by_ids = read
+    list_read, list_release, list_calls = _slow(result=[pizza])
+    repo.list_active = list_read
+    monkeypatch.setattr(deps, "MongoProductRepo", lambda col: repo)
+    monkeypatch.setattr(deps.settings, "REPO_BACKEND", "mongo")
+    app.dependency_overrides[deps.get_repo_db] = lambda: {"products": None}
+    product_cache.clear()
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            gets = [asyncio.create_task(ac.get("/products/pizzas/pizza_001")) for _ in range(20)]
+            lists = [asyncio.create_task(ac.get("/products")) for _ in range(5)]
+            while len(calls) + len(list_calls) < 2:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+            release.set()
+            list_release.set()
+            responses = await asyncio.gather(*gets, *lists)
+    finally:
+        app.dependency_overrides.clear()
+        product_cache.clear()
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len(calls) == 1
+    assert len(list_calls) == 1